@@ -0,0 +1,184 @@
+"""
+Known Email Filter
+
+An in-memory Bloom filter of every user's email, so verify_user can
+answer "definitely not a user" without querying the database. Bots
+spraying random addresses at /api/accounts/verify/ are then turned away
+from memory; only emails that might exist reach User.objects.get().
+
+1. Answers:
+   - Not in the filter: no user has this email (case-insensitively)
+   - In the filter: probably a user (false positives at about
+     ERROR_RATE), so the caller still queries the database
+
+2. Updates:
+   - Built lazily on first use, per process
+   - Users saved in this process are added at once (signals.py)
+   - Every EMAIL_FILTER_REFRESH_SECONDS the first lookup adds users
+     created since, which covers other workers and bulk_create (e.g.
+     seed_school) with one indexed query: pk above the highest seen, or
+     date_joined within COMMIT_MARGIN of the previous read. The margin
+     catches rows whose transactions committed out of pk order, which
+     a pk-only scan would skip until the next rebuild
+   - Every EMAIL_FILTER_REBUILD_SECONDS it is rebuilt from scratch,
+     dropping deleted users and picking up emails changed in other
+     processes. Until then such emails are the only ones that can be
+     wrongly reported as unknown
+   - If the database can't be read the filter answers "maybe" for
+     everything, falling back to the query
+
+Related:
+   - signals.py: Adds saved users
+   - backend/accounts/api/views.py: verify_user
+   - management/commands/benchmark_email_filter.py
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+ERROR_RATE = 0.01
+# Room for growth between rebuilds; a full filter is rebuilt early
+MIN_CAPACITY = 1024
+# How long a transaction creating users may take to commit and still be
+# caught up before the next rebuild
+COMMIT_MARGIN = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings"""
+
+    def __init__(self, capacity, error_rate=ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+def normalize(email):
+    return str(email).strip().lower()
+
+
+class KnownEmails:
+    """The per-process filter of user emails, kept up to date as described above"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._max_pk = 0
+        # Database time of the last read, for the date_joined overlap
+        self._read_at = None
+        self._built_at = 0.0
+        self._refreshed_at = 0.0
+
+    def might_exist(self, email):
+        """False only if no user has ``email``"""
+        self._refresh()
+        bloom = self._filter
+        return bloom is None or normalize(email) in bloom
+
+    def add(self, email):
+        with self._lock:
+            if self._filter is None or not email:
+                return
+            self._filter.add(normalize(email))
+
+    def clear(self):
+        """Drop the filter; the next lookup rebuilds it"""
+        with self._lock:
+            self._filter = None
+
+    def stats(self):
+        bloom = self._filter
+        if bloom is None:
+            return {'built': False}
+        return {
+            'built': True,
+            'emails': bloom.count,
+            'capacity': bloom.capacity,
+            'bytes': len(bloom.bits),
+            'hashes': bloom.hashes,
+            'age_seconds': time.monotonic() - self._built_at,
+        }
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._filter is not None and now - self._refreshed_at < settings.EMAIL_FILTER_REFRESH_SECONDS:
+            return
+        # Only the first build makes lookups wait; later refreshes are
+        # done by whichever thread gets the lock while others carry on
+        if not self._lock.acquire(blocking=self._filter is None):
+            return
+        try:
+            if self._filter is not None and now - self._refreshed_at < settings.EMAIL_FILTER_REFRESH_SECONDS:
+                return
+            if (
+                self._filter is None
+                or now - self._built_at >= settings.EMAIL_FILTER_REBUILD_SECONDS
+                or self._filter.count >= self._filter.capacity
+            ):
+                self._build(now)
+            else:
+                self._catch_up()
+            self._refreshed_at = now
+        except DatabaseError:
+            logger.exception('Failed to refresh the known email filter')
+        finally:
+            self._lock.release()
+
+    def _build(self, now):
+        read_at = timezone.now()
+        rows = list(User.objects.values_list('pk', 'email'))
+        bloom = BloomFilter(max(MIN_CAPACITY, 2 * len(rows)))
+        for _, email in rows:
+            if email:
+                bloom.add(normalize(email))
+        self._filter = bloom
+        self._max_pk = max((pk for pk, _ in rows), default=0)
+        self._read_at = read_at
+        self._built_at = now
+
+    def _catch_up(self):
+        read_at = timezone.now()
+        recent = User.objects.filter(
+            Q(pk__gt=self._max_pk) | Q(date_joined__gte=self._read_at - COMMIT_MARGIN)
+        )
+        for pk, email in recent.values_list('pk', 'email'):
+            # The overlap re-reads users already added
+            if email and normalize(email) not in self._filter:
+                self._filter.add(normalize(email))
+            self._max_pk = max(self._max_pk, pk)
+        self._read_at = read_at
+
+
+known_emails = KnownEmails()
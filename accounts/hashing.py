@@ -0,0 +1,153 @@
+"""
+Password Hashing Pool
+
+Runs PBKDF2 on a small, bounded pool of threads instead of the request
+thread. At the morning bell hundreds of logins arrive at once; without
+a limit every one of them hashes at the same time and the cheap read
+requests queue behind them for CPU.
+
+1. Hasher (PooledPBKDF2PasswordHasher):
+   - The default pbkdf2_sha256 format, so existing hashes still verify
+   - Every hash (login, set_password, and the dummy hash for unknown
+     usernames) is computed on the pool
+   - PASSWORD_HASH_ITERATIONS raises Django's iteration count but
+     never lowers it, and stored hashes are only ever re-encoded at a
+     higher count on the next login, so a setting can't weaken them.
+     benchmark_hasher shows what a count costs on this hardware
+
+2. Pool (HashingPool):
+   - PASSWORD_HASH_WORKERS threads per process. hashlib releases the
+     GIL while hashing, so threads run in parallel; leave at least one
+     core per process free for other requests
+   - At most PASSWORD_HASH_QUEUE_SIZE hashes wait for a thread. Beyond
+     that HashingBusy is raised at once and login_view answers 503, so
+     a burst is shed instead of tying up every request thread
+
+3. Metrics:
+   - Hashes run, rejected, in flight and waiting, plus average and
+     maximum time spent waiting in the queue and hashing, per process
+
+Usage:
+    GET /api/hash-pool/   (staff only)
+
+Related:
+   - settings.py: PASSWORD_HASHERS and PASSWORD_HASH_* settings
+   - views.py: login_view
+   - management/commands/benchmark_hasher.py
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, must_update_salt
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+class HashingPool:
+    """Bounded thread pool for password hashes, with queue-time stats"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._pending = 0
+        self._running = 0
+        self._counters = {
+            'completed': 0, 'rejected': 0,
+            'wait_ms': 0.0, 'max_wait_ms': 0.0, 'hash_ms': 0.0,
+        }
+
+    def run(self, func, *args, **kwargs):
+        """Run ``func`` on the pool and wait for its result"""
+        workers = settings.PASSWORD_HASH_WORKERS
+        with self._lock:
+            if self._pending >= workers + settings.PASSWORD_HASH_QUEUE_SIZE:
+                self._counters['rejected'] += 1
+                raise HashingBusy('Too many password hashes queued')
+            self._pending += 1
+            # Created lazily, and again after a fork (gunicorn --preload)
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(workers, thread_name_prefix='password-hash')
+            executor = self._executor
+
+        queued = time.perf_counter()
+        try:
+            return executor.submit(self._timed, queued, func, args, kwargs).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _timed(self, queued, func, args, kwargs):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            finished = time.perf_counter()
+            wait_ms = (started - queued) * 1000
+            with self._lock:
+                self._running -= 1
+                self._counters['completed'] += 1
+                self._counters['wait_ms'] += wait_ms
+                self._counters['max_wait_ms'] = max(self._counters['max_wait_ms'], wait_ms)
+                self._counters['hash_ms'] += (finished - started) * 1000
+
+    def stats(self):
+        """Hashing stats for this process"""
+        with self._lock:
+            counters = dict(self._counters)
+            pending, running = self._pending, self._running
+        completed = counters['completed']
+        return {
+            'pid': os.getpid(),
+            'workers': settings.PASSWORD_HASH_WORKERS,
+            'queue_size': settings.PASSWORD_HASH_QUEUE_SIZE,
+            'in_flight': running,
+            'waiting': pending - running,
+            'completed': completed,
+            'rejected': counters['rejected'],
+            'avg_wait_ms': counters['wait_ms'] / completed if completed else 0.0,
+            'max_wait_ms': counters['max_wait_ms'],
+            'avg_hash_ms': counters['hash_ms'] / completed if completed else 0.0,
+        }
+
+
+pool = HashingPool()
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 computed on the hashing pool"""
+
+    @property
+    def iterations(self):
+        return max(settings.PASSWORD_HASH_ITERATIONS, PBKDF2PasswordHasher.iterations)
+
+    def must_update(self, encoded):
+        # Upgrade weaker hashes only; one stored at a higher count (e.g.
+        # before PASSWORD_HASH_ITERATIONS was lowered) is left alone
+        decoded = self.decode(encoded)
+        return (
+            decoded['iterations'] < self.iterations
+            or must_update_salt(decoded['salt'], self.salt_entropy)
+        )
+
+    def encode(self, password, salt, iterations=None):
+        # verify() and harden_runtime() hash through encode() too
+        return pool.run(super().encode, password, salt, iterations)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def hash_pool_stats_view(request):
+    """API endpoint for this worker's password hashing stats"""
+    return Response(pool.stats())
@@ -0,0 +1,84 @@
+import logging
+import time
+import uuid
+from contextlib import nullcontext
+from unittest import mock
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+from accounts.email_filter import known_emails
+from accounts.models import User
+from backend.accounts.api.views import verify_user
+from backend.benchmarking import counting_queries, rolled_back
+
+
+class Command(BaseCommand):
+    help = (
+        'Flood verify_user with unknown emails, with and without the known '
+        'email filter, and report time and queries per probe'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=5000,
+            help='Users to create (in a transaction that is rolled back)'
+        )
+        parser.add_argument(
+            '--probes', type=int, default=5000,
+            help='Unknown emails to send per run'
+        )
+
+    def handle(self, *args, **options):
+        # The auth log is written the same way in both runs; keep it out
+        # of the timings (and out of logs/auth.log)
+        auth_logger = logging.getLogger('auth')
+        disabled, auth_logger.disabled = auth_logger.disabled, True
+        try:
+            with rolled_back():
+                self._benchmark(options['users'], options['probes'])
+        finally:
+            auth_logger.disabled = disabled
+            known_emails.clear()
+
+    def _benchmark(self, users, probes):
+        User.objects.bulk_create([
+            User(username=f'bench.filter{i}', email=f'bench.filter{i}@inst.hcpss.org')
+            for i in range(users)
+        ], batch_size=1000)
+
+        known_emails.clear()
+        start = time.perf_counter()
+        known_emails.might_exist('warm@example.com')
+        build = time.perf_counter() - start
+        stats = known_emails.stats()
+        self.stdout.write(
+            f"Filter of {stats['emails']} emails: {stats['bytes']:,} bytes, "
+            f"{stats['hashes']} hashes, built in {build * 1000:.1f}ms"
+        )
+
+        factory = APIRequestFactory()
+        emails = [f'{uuid.uuid4().hex}@probe.example.com' for _ in range(probes)]
+        self.stdout.write(f"\n{'filter':<8} {'us/probe':>9} {'queries/probe':>14} {'404s':>6}")
+        for label, filtering in [
+            # Off: every email might exist, so every probe is queried
+            ('off', mock.patch.object(known_emails, 'might_exist', return_value=True)),
+            ('on', nullcontext()),
+        ]:
+            with filtering, counting_queries([]) as queries:
+                start = time.perf_counter()
+                not_found = sum(
+                    verify_user(
+                        factory.post('/api/accounts/verify/', {'email': email}, format='json')
+                    ).status_code == 404
+                    for email in emails
+                )
+                elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{label:<8} {elapsed / probes * 1e6:>9.1f} {len(queries) / probes:>14.3f} "
+                f"{not_found:>6}"
+            )
+
+        false_positives = sum(known_emails.might_exist(email) for email in emails)
+        self.stdout.write(self.style.SUCCESS(
+            f"\nFalse positive rate: {false_positives / probes:.2%} "
+            f"({false_positives} of {probes} unknown emails queried)"
+        ))
\ No newline at end of file
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand
+
+PROBE_ITERATIONS = 100_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Time PBKDF2-SHA256 on this machine and recommend PASSWORD_HASH_ITERATIONS '
+        'for a target login latency (never below Django\'s default), with the '
+        'hashing pool throughput it gives'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target-ms', type=float, default=250,
+            help='Time one password check may take, in milliseconds'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.PASSWORD_HASH_WORKERS,
+            help='Hashing pool threads to measure throughput with'
+        )
+        parser.add_argument(
+            '--burst', type=int, default=500,
+            help='Logins arriving at once (e.g. the morning bell), to estimate drain time'
+        )
+        parser.add_argument(
+            '--samples', type=int, default=5,
+            help='Hashes to time per measurement'
+        )
+
+    def handle(self, *args, **options):
+        samples = options['samples']
+        workers = options['workers']
+
+        single = self._time_hashes(PROBE_ITERATIONS, samples, 1)
+        per_ms = PROBE_ITERATIONS / single
+        # How much faster `workers` threads are than one (hashlib releases the GIL)
+        parallel = self._time_hashes(PROBE_ITERATIONS, samples * workers, workers)
+        speedup = single / parallel
+
+        self.stdout.write(
+            f"{per_ms:,.0f} iterations/ms on one thread; {workers} threads run "
+            f"{speedup:.1f}x as fast ({os.cpu_count()} CPUs)"
+        )
+
+        # The hasher never goes below Django's default, so neither does this
+        minimum = PBKDF2PasswordHasher.iterations
+        on_target = int(per_ms * options['target_ms']) // 10_000 * 10_000
+        recommended = max(minimum, on_target)
+        current = max(settings.PASSWORD_HASH_ITERATIONS, minimum)
+        candidates = sorted({minimum, current, recommended})
+
+        self.stdout.write(
+            f"\n{'iterations':>11} {'ms/login':>9} {'logins/s':>9} "
+            f"{'burst drain s':>14}"
+        )
+        for iterations in candidates:
+            latency = iterations / per_ms
+            throughput = 1000 / latency * speedup
+            notes = []
+            if iterations == recommended:
+                notes.append('recommended')
+            if iterations == current:
+                notes.append('current')
+            if iterations == minimum:
+                notes.append('Django default')
+            self.stdout.write(
+                f"{iterations:>11,} {latency:>9.1f} {throughput:>9.1f} "
+                f"{options['burst'] / throughput:>14.1f}  {', '.join(notes)}"
+            )
+
+        if on_target < minimum:
+            self.stdout.write(self.style.WARNING(
+                f"\nA {options['target_ms']:.0f}ms password check would mean "
+                f"{on_target:,} iterations, below Django's default of {minimum:,}. "
+                f"Keep the default and add hashing workers or CPUs instead"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"\nPASSWORD_HASH_ITERATIONS={recommended} keeps a password check "
+                f"near {options['target_ms']:.0f}ms"
+            ))
+
+    @staticmethod
+    def _time_hashes(iterations, count, workers):
+        """Wall time in ms per hash, for ``count`` hashes on ``workers`` threads"""
+        def work(_):
+            hashlib.pbkdf2_hmac('sha256', b'benchmark-password', os.urandom(16), iterations)
+
+        with ThreadPoolExecutor(workers) as executor:
+            start = time.perf_counter()
+            list(executor.map(work, range(count)))
+            return (time.perf_counter() - start) * 1000 / count
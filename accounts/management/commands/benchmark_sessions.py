@@ -0,0 +1,73 @@
+import time
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from backend import sessions
+from backend.benchmarking import counting_queries, rolled_back
+
+
+ENGINES = [
+    ('db', 'django.contrib.sessions.backends.db'),
+    ('cached + write-behind', 'backend.sessions'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare per-request session overhead of the database session engine '
+        'against the cached write-behind engine (backend.sessions)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Requests to time per engine and request type'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'engine':<22} {'request':<14} {'us/request':>11} {'queries/request':>16}"
+        )
+        # Sessions are created in a transaction that is rolled back
+        with rolled_back():
+            for label, engine in ENGINES:
+                self._benchmark(label, engine, options['requests'])
+
+    def _benchmark(self, label, engine, count):
+        # Flushed by hand below, inside the transaction, and counted in the time
+        with override_settings(SESSION_ENGINE=engine, SESSION_WRITE_BEHIND_SECONDS=3600):
+            for kind, modify in [('read', False), ('read + write', True)]:
+                middleware = SessionMiddleware(self._view(modify))
+                store = middleware.SessionStore()
+                store.update({
+                    SESSION_KEY: '1', BACKEND_SESSION_KEY: 'bench', HASH_SESSION_KEY: 'bench',
+                })
+                store.create()
+                factory = RequestFactory()
+
+                with counting_queries([]) as queries:
+                    start = time.perf_counter()
+                    for _ in range(count):
+                        request = factory.get('/api/students/')
+                        request.COOKIES[settings.SESSION_COOKIE_NAME] = store.session_key
+                        middleware(request)
+                    sessions.buffer.flush()
+                    elapsed = time.perf_counter() - start
+
+                self.stdout.write(
+                    f"{label:<22} {kind:<14} {elapsed / count * 1e6:>11.1f} "
+                    f"{len(queries) / count:>16.2f}"
+                )
+
+    @staticmethod
+    def _view(modify):
+        def view(request):
+            # What every authenticated request does (AuthenticationMiddleware)
+            request.session.get(SESSION_KEY)
+            if modify:
+                request.session['last_seen'] = time.time()
+            return HttpResponse()
+        return view
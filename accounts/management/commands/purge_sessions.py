@@ -0,0 +1,51 @@
+import time
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired sessions in small batches, one short transaction each, '
+        'skipping rows other transactions have locked'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Sessions to delete per transaction'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0.0,
+            help='Seconds to pause between batches, to leave room for other writes'
+        )
+
+    def handle(self, *args, **options):
+        # Fixed up front so sessions expiring mid-run are left for next time
+        now = timezone.now()
+        skip_locked = connection.features.has_select_for_update_skip_locked
+
+        start = time.perf_counter()
+        deleted = batches = 0
+        while True:
+            with transaction.atomic():
+                expired = Session.objects.filter(expire_date__lt=now)
+                if skip_locked:
+                    expired = expired.select_for_update(skip_locked=True)
+                keys = list(
+                    expired.order_by('expire_date')
+                    .values_list('session_key', flat=True)[:options['batch_size']]
+                )
+                if not keys:
+                    break
+                count, _ = Session.objects.filter(session_key__in=keys).delete()
+            deleted += count
+            batches += 1
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} expired sessions in {batches} batches ({elapsed:.1f}s)"
+        ))
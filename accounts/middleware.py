@@ -0,0 +1,126 @@
+"""
+Cached Authentication
+
+Replaces AuthenticationMiddleware. The stock middleware loads the
+accounts.User row on every authenticated request, although role, names
+and is_active rarely change. This one keeps the loaded user in the
+'users' cache, keyed by session:
+
+1. Lookup:
+   - One cache round trip per request fetches the session's entry and
+     the user's current version together
+   - The entry is used if it was stored under the current version and
+     for the same session auth hash; otherwise the user is loaded (and
+     the session verified) by django.contrib.auth as usual and cached
+   - Anonymous requests never touch the cache
+
+2. Invalidation:
+   - Every User save or delete bumps that user's version (signals.py,
+     backend/versioned_cache.py), now and again on commit, so every
+     cached copy is dropped at once.
+     That covers password changes, is_active flips, role changes and
+     the failed_login_attempts writes of the lockout in views.py
+   - A changed password changes the session auth hash, so the reload
+     after the bump logs out the user's other sessions, as before
+   - QuerySet.update() fires no signals; call invalidate_user() after
+     bulk updates to users
+
+Backends:
+   Uses the 'users' cache alias (USER_CACHE_URL), and only when it is a
+   backend every worker shares (CACHE_AUTHENTICATED_USERS). With a
+   per-worker local-memory cache a deactivation in one worker would
+   reach the others only when their entries expired, so with the
+   default every request loads the user row, as the stock middleware
+   does.
+
+Related:
+   - signals.py: Invalidation receivers
+   - settings.py: MIDDLEWARE and USER_CACHE_URL
+"""
+
+from functools import partial
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import caches
+from django.utils.functional import SimpleLazyObject
+
+from backend.versioned_cache import bump_on_commit, bump_version, start_version
+
+CACHE_ALIAS = 'users'
+KEY_PREFIX = 'users'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def invalidate_user(*user_ids):
+    """Drop every cached copy of the given users"""
+    def bump():
+        for user_id in set(user_ids):
+            bump_version(get_cache(), _version_key(user_id))
+
+    bump_on_commit(bump)
+
+
+def get_user(request):
+    """request.user, from the cache when the session's entry is current"""
+    if not hasattr(request, '_cached_user'):
+        if settings.CACHE_AUTHENTICATED_USERS:
+            request._cached_user = _load_user(request)
+        else:
+            request._cached_user = auth.get_user(request)
+    return request._cached_user
+
+
+async def aget_user(request):
+    if not hasattr(request, '_acached_user'):
+        request._acached_user = await sync_to_async(get_user)(request)
+    return request._acached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware that serves request.user from the user cache"""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+        request.auser = partial(aget_user, request)
+
+
+def _load_user(request):
+    session = request.session
+    user_id = session.get(SESSION_KEY)
+    session_hash = session.get(HASH_SESSION_KEY)
+    if user_id is None or session.session_key is None:
+        return auth.get_user(request)
+
+    cache = get_cache()
+    entry_key = f'{KEY_PREFIX}:session:{session.session_key}'
+    version_key = _version_key(user_id)
+    found = cache.get_many([entry_key, version_key])
+    version = found.get(version_key)
+    entry = found.get(entry_key)
+    if entry is not None and version is not None and entry[:2] == (version, session_hash):
+        return entry[2]
+
+    # Read the version before the row, so a save in between makes this
+    # entry stale rather than current
+    if version is None:
+        version = start_version(cache, version_key)
+    user = auth.get_user(request)
+    if (
+        user.is_authenticated
+        and str(user.pk) == str(user_id)
+        and session.get(HASH_SESSION_KEY) == session_hash
+    ):
+        cache.set(entry_key, (version, session_hash, user))
+    return user
+
+
+def _version_key(user_id):
+    return f'{KEY_PREFIX}:version:{user_id}'
+
@@ -0,0 +1,17 @@
+# Index for the known email filter's catch-up query (accounts/email_filter.py)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["date_joined"], name="user_date_joined_idx"),
+        ),
+    ]
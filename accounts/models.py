@@ -56,6 +56,10 @@ class User(AbstractUser):
     class Meta:
         verbose_name = _('user')
         verbose_name_plural = _('users')
+        indexes = [
+            # Catching up the known email filter (email_filter.py)
+            models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ]
         
     def __str__(self):
         return f"{self.get_full_name()} ({self.role})"
@@ -0,0 +1,37 @@
+"""
+Signals
+
+Model signal receivers for the accounts app. Connected when the app is
+ready (see apps.py).
+
+1. User Cache:
+   - Drops a user's cached copies (middleware.py) whenever the user is
+     saved or deleted, so password changes, deactivation and lockout
+     apply on the next request
+
+2. Known Email Filter:
+   - Adds a saved user's email to the filter verify_user checks, so a
+     new or changed email is known in this process at once
+
+Related:
+   - middleware.py: Cached authentication
+   - email_filter.py: Known email filter
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .email_filter import known_emails
+from .middleware import invalidate_user
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def add_known_email(sender, instance, **kwargs):
+    known_emails.add(instance.email)
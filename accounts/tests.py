@@ -1,11 +1,26 @@
-from django.test import TestCase, Client
+import threading
+import time
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
+from rest_framework.test import APIRequestFactory
+from backend.accounts.api.views import verify_user
+from . import hashing, throttling
+from .email_filter import BloomFilter, known_emails
+from .hashing import HashingBusy, HashingPool
+from .middleware import invalidate_user
 from .models import User
 
 class AuthenticationTests(TestCase):
     def setUp(self):
+        caches['throttle'].clear()
         self.client = Client()
         self.user = User.objects.create_user(
             username='testuser',
@@ -35,9 +50,11 @@ class AuthenticationTests(TestCase):
                 content_type='application/json'
             )
             self.assertEqual(response.status_code, 401)
+        self.assertIn('2 attempts remaining', response.json()['error'])
         
+        # Counted in the throttle cache; the row is only written on lockout
         user = User.objects.get(username='testuser')
-        self.assertEqual(user.failed_login_attempts, 3)
+        self.assertEqual(user.failed_login_attempts, 0)
         
     def test_account_lockout(self):
         # Create 5 failed attempts
@@ -67,16 +84,360 @@ class AuthenticationTests(TestCase):
         
         # Set last attempt to 6 minutes ago
         user = User.objects.get(username='testuser')
+        self.assertEqual(user.failed_login_attempts, 5)
         user.last_login_attempt = timezone.now() - timedelta(minutes=6)
         user.save()
         
         # Should be able to login now
+        later = time.time() + settings.LOCKOUT_DURATION + 1
+        with mock.patch('accounts.throttling.time.time', return_value=later):
+            response = self.client.post(
+                self.login_url,
+                {'username': 'testuser', 'password': 'testpass123'},
+                content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 200)
+        
+        user.refresh_from_db()
+        self.assertEqual(user.failed_login_attempts, 0)
+
+    def test_lock_ends_with_full_attempts(self):
+        """Test one failure after a lock expires doesn't lock the account again"""
+        # Locked at the start of a window, so the next window still weighs
+        # almost all of this one's failures when the lock ends
+        start = (time.time() // settings.LOCKOUT_DURATION) * settings.LOCKOUT_DURATION + 1
+        with mock.patch('accounts.throttling.time.time', return_value=start):
+            for i in range(5):
+                self.client.post(
+                    self.login_url,
+                    {'username': 'testuser', 'password': 'wrongpass'},
+                    content_type='application/json'
+                )
+        User.objects.filter(pk=self.user.pk).update(
+            last_login_attempt=timezone.now() - timedelta(minutes=6)
+        )
+
+        later = start + settings.LOCKOUT_DURATION + 1
+        with mock.patch('accounts.throttling.time.time', return_value=later):
+            response = self.client.post(
+                self.login_url,
+                {'username': 'testuser', 'password': 'wrongpass'},
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 401)
+            self.assertIn('4 attempts remaining', response.json()['error'])
+            response = self.client.post(
+                self.login_url,
+                {'username': 'testuser', 'password': 'testpass123'},
+                content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_failures_do_not_write_user(self):
+        """Test failed logins below the limit don't update the user row"""
+        with CaptureQueriesContext(connection) as queries:
+            for i in range(4):
+                self.client.post(
+                    self.login_url,
+                    {'username': 'testuser', 'password': 'wrongpass'},
+                    content_type='application/json'
+                )
+        self.assertFalse([q for q in queries if q['sql'].startswith('UPDATE')])
+
+    def test_stored_lock_survives_cache_clear(self):
+        """Test a lock written to the row holds after the throttle cache is lost"""
+        for i in range(5):
+            self.client.post(
+                self.login_url,
+                {'username': 'testuser', 'password': 'wrongpass'},
+                content_type='application/json'
+            )
+        caches['throttle'].clear()
+        response = self.client.post(
+            self.login_url,
+            {'username': 'testuser', 'password': 'testpass123'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_lock_from_other_worker_applies(self):
+        """Test a lock another worker stored on the row refuses logins here before the password"""
+        User.objects.filter(pk=self.user.pk).update(
+            failed_login_attempts=5, last_login_attempt=timezone.now()
+        )
+        with mock.patch('accounts.views.authenticate') as authenticate:
+            response = self.client.post(
+                self.login_url,
+                {'username': 'testuser', 'password': 'wrongpass'},
+                content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 403)
+        authenticate.assert_not_called()
+
+    @override_settings(LOGIN_IP_MAX_ATTEMPTS=3)
+    def test_ip_throttled_across_usernames(self):
+        """Test one IP trying many usernames is refused with 429"""
+        for i in range(3):
+            self.client.post(
+                self.login_url,
+                {'username': f'guess{i}', 'password': 'wrongpass'},
+                content_type='application/json'
+            )
         response = self.client.post(
             self.login_url,
             {'username': 'testuser', 'password': 'testpass123'},
             content_type='application/json'
         )
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+
+    @override_settings(LOGIN_IP_MAX_ATTEMPTS=0)
+    def test_ip_limit_off_at_zero(self):
+        """Test failures from one IP never lock it out with the limit off (the default)"""
+        for i in range(60):
+            throttling.record_failure(f'guess{i}', '10.0.0.1')
+        self.assertEqual(throttling.locked_scope('testuser', '10.0.0.1'), (None, 0))
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_client_ip_through_trusted_proxies(self):
+        """Test the client IP is the first X-Forwarded-For hop not in TRUSTED_PROXIES"""
+        factory = RequestFactory()
+        cases = [
+            # Forged hops from a client that isn't a proxy are ignored
+            ('203.0.113.5', '198.51.100.1', '203.0.113.5'),
+            ('10.0.0.2', '198.51.100.1, 203.0.113.7', '203.0.113.7'),
+            ('10.0.0.2', '203.0.113.7, 10.1.1.1', '203.0.113.7'),
+            ('10.0.0.2', '', '10.0.0.2'),
+        ]
+        for remote, forwarded, expected in cases:
+            with self.subTest(remote=remote, forwarded=forwarded):
+                request = factory.post(
+                    self.login_url, REMOTE_ADDR=remote, HTTP_X_FORWARDED_FOR=forwarded
+                )
+                self.assertEqual(throttling.client_ip(request), expected)
+
+    @override_settings(LOGIN_IP_MAX_ATTEMPTS=3, TRUSTED_PROXIES=['127.0.0.1'])
+    def test_clients_behind_proxy_throttled_separately(self):
+        """Test failures from one client behind the proxy don't lock out another"""
+        for i in range(3):
+            self.client.post(
+                self.login_url,
+                {'username': f'guess{i}', 'password': 'wrongpass'},
+                content_type='application/json',
+                HTTP_X_FORWARDED_FOR='203.0.113.9'
+            )
+        response = self.client.post(
+            self.login_url,
+            {'username': 'testuser', 'password': 'testpass123'},
+            content_type='application/json',
+            HTTP_X_FORWARDED_FOR='203.0.113.10'
+        )
         self.assertEqual(response.status_code, 200)
-        
-        user.refresh_from_db()
-        self.assertEqual(user.failed_login_attempts, 0)
+
+
+@override_settings(CACHE_AUTHENTICATED_USERS=True)
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        caches['users'].clear()
+        self.user = User.objects.create_user(
+            username='cacheduser',
+            email='cacheduser@inst.hcpss.org',
+            password='testpass123',
+            role=User.Role.TEACHER
+        )
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('attendance:announcement_list_api')
+
+    def user_queries(self):
+        """Queries against the user table made by one request"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [q for q in queries if User._meta.db_table in q['sql']]
+
+    def test_user_served_from_cache(self):
+        """Test only the first request loads the user row"""
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+
+    def test_deactivation_applies_immediately(self):
+        """Test a deactivated user is refused on the next request"""
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_password_change_ends_session(self):
+        """Test changing the password logs out existing sessions"""
+        self.client.get(self.url)
+        self.user.set_password('newpass456')
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_save_reloads_user(self):
+        """Test other changes (e.g. role) are seen on the next request"""
+        self.client.get(self.url)
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(len(self.user_queries()), 1)
+
+    @override_settings(CACHE_AUTHENTICATED_USERS=False)
+    def test_process_local_cache_not_used(self):
+        """Test every request loads the user when the user cache isn't shared"""
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(len(self.user_queries()), 1)
+
+    def test_bulk_update_needs_invalidate(self):
+        """Test invalidate_user drops the cache after a QuerySet.update()"""
+        self.client.get(self.url)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        invalidate_user(self.user.pk)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class HashingPoolTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='hashuser',
+            email='hashuser@inst.hcpss.org',
+            password='testpass123'
+        )
+
+    def test_password_check_runs_on_pool(self):
+        """Test checking a password hashes on the pool, not the request thread"""
+        before = hashing.pool.stats()['completed']
+        self.assertTrue(self.user.check_password('testpass123'))
+        self.assertEqual(hashing.pool.stats()['completed'], before + 1)
+
+    @override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE_SIZE=0)
+    def test_full_queue_rejected(self):
+        """Test hashes beyond the workers and queue are refused at once"""
+        pool = HashingPool()
+        started, release = threading.Event(), threading.Event()
+
+        def slow_hash():
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=pool.run, args=(slow_hash,))
+        thread.start()
+        started.wait(5)
+        try:
+            with self.assertRaises(HashingBusy):
+                pool.run(lambda: None)
+        finally:
+            release.set()
+            thread.join()
+
+        stats = pool.stats()
+        self.assertEqual((stats['completed'], stats['rejected']), (1, 1))
+        self.assertEqual((stats['in_flight'], stats['waiting']), (0, 0))
+
+    def test_login_busy_returns_503(self):
+        """Test login answers 503 when the hashing queue is full"""
+        caches['throttle'].clear()
+        with mock.patch.object(hashing.pool, 'run', side_effect=HashingBusy):
+            response = Client().post(
+                reverse('login'),
+                {'username': 'hashuser', 'password': 'testpass123'},
+                content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+    def test_weaker_hashes_rehashed(self):
+        """Test hashes stored at a lower count move up on the next check"""
+        hasher = hashing.PooledPBKDF2PasswordHasher()
+        self.user.password = hasher.encode('testpass123', hasher.salt(), 1000)
+        self.user.save()
+
+        self.assertTrue(self.user.check_password('testpass123'))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith(
+            f'pbkdf2_sha256${PBKDF2PasswordHasher.iterations}$'
+        ))
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_iterations_never_lowered(self):
+        """Test PASSWORD_HASH_ITERATIONS below Django's count doesn't weaken hashes"""
+        hasher = hashing.PooledPBKDF2PasswordHasher()
+        self.assertEqual(hasher.iterations, PBKDF2PasswordHasher.iterations)
+
+        stored = self.user.password
+        self.assertTrue(self.user.check_password('testpass123'))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, stored)
+
+        stronger = f'pbkdf2_sha256${hasher.iterations * 2}${hasher.salt()}$hash'
+        self.assertFalse(hasher.must_update(stronger))
+
+
+class KnownEmailFilterTests(TestCase):
+    def setUp(self):
+        known_emails.clear()
+        self.user = User.objects.create_user(
+            username='filteruser',
+            email='filteruser@inst.hcpss.org',
+            password='testpass123'
+        )
+        self.factory = APIRequestFactory()
+
+    def verify(self, email):
+        return verify_user(
+            self.factory.post('/api/accounts/verify/', {'email': email}, format='json')
+        )
+
+    def test_unknown_email_skips_database(self):
+        """Test an email not in the filter is rejected without a query"""
+        self.verify('warmup@example.com')
+        with self.assertNumQueries(0):
+            response = self.verify('nobody@example.com')
+        self.assertEqual(response.status_code, 404)
+
+    def test_new_user_known_at_once(self):
+        """Test a user created after the filter is built is found"""
+        self.verify('warmup@example.com')
+        User.objects.create_user(
+            username='newfilteruser', email='newfilteruser@inst.hcpss.org',
+            password='testpass123', first_name='New', last_name='Filter'
+        )
+        response = self.verify('newfilteruser@inst.hcpss.org')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['name'], 'New Filter')
+
+    @override_settings(EMAIL_FILTER_REFRESH_SECONDS=0)
+    def test_bulk_created_user_caught_up(self):
+        """Test users created without signals are added on the next refresh"""
+        self.verify('warmup@example.com')
+        User.objects.bulk_create([
+            User(username='bulkfilteruser', email='bulkfilteruser@inst.hcpss.org')
+        ])
+        self.assertEqual(self.verify('bulkfilteruser@inst.hcpss.org').status_code, 200)
+
+    @override_settings(EMAIL_FILTER_REFRESH_SECONDS=0)
+    def test_late_commit_caught_up(self):
+        """Test a user committed after a higher pk was seen is still added"""
+        User.objects.bulk_create([
+            User(id=1000, username='highpkuser', email='highpkuser@inst.hcpss.org')
+        ])
+        self.verify('warmup@example.com')
+        # Inserted before pk 1000 but committed after the filter read it
+        User.objects.bulk_create([
+            User(id=999, username='latecommituser', email='latecommituser@inst.hcpss.org')
+        ])
+        self.assertEqual(self.verify('latecommituser@inst.hcpss.org').status_code, 200)
+
+    def test_case_insensitive(self):
+        """Test a differently cased email still reaches the database"""
+        self.verify('warmup@example.com')
+        self.assertTrue(known_emails.might_exist('FilterUser@Inst.HCPSS.org'))
+
+    def test_bloom_filter_error_rate(self):
+        """Test the filter never misses an added value and rarely claims others"""
+        bloom = BloomFilter(1000)
+        for i in range(1000):
+            bloom.add(f'member{i}@example.com')
+        self.assertTrue(all(f'member{i}@example.com' in bloom for i in range(1000)))
+        false_positives = sum(f'other{i}@example.com' in bloom for i in range(10000))
+        self.assertLess(false_positives / 10000, 0.03)
@@ -0,0 +1,201 @@
+"""
+Login Throttling
+
+Counts failed logins in the 'throttle' cache instead of writing
+failed_login_attempts to the user row on every attempt, so a burst of
+bad passwords costs cache increments rather than auth_user writes.
+
+1. Counters:
+   - One per username (case-insensitive) and one per client IP
+   - Sliding window of LOCKOUT_DURATION seconds, estimated from the
+     current and previous fixed windows, so each check or increment
+     touches two keys regardless of how many attempts were made
+
+2. Locks:
+   - A username reaching MAX_LOGIN_ATTEMPTS failures in the window is
+     locked for LOCKOUT_DURATION; login_view refuses it with 403 before
+     checking the password
+   - Locking clears the failures counted so far, so the lock ends with
+     a full set of attempts (as the row counter reset used to)
+   - An IP reaching LOGIN_IP_MAX_ATTEMPTS failures (across usernames,
+     e.g. credential stuffing) is refused with 429 for LOCKOUT_DURATION.
+     Off (0) by default: a school's NAT puts every student behind one
+     address, and a few dozen mistyped passwords at the bell would lock
+     out the whole building
+
+3. Client IP (client_ip):
+   - REMOTE_ADDR, unless it is one of TRUSTED_PROXIES (addresses or
+     networks); then X-Forwarded-For is read from the right, skipping
+     trusted hops, and the first other address is the client
+   - Hops left of the first untrusted one can be forged by the client
+     and are never used
+
+4. Persistence:
+   - The user row is only written when its lock state changes: when the
+     username is locked (failed_login_attempts, last_login_attempt) and
+     on the first successful login after that (reset to 0)
+   - login_view checks the row for a stored lock before the password
+     (one indexed read), so a lock set by any worker applies on all of
+     them and survives the cache being cleared or restarted
+
+Backends:
+   Uses the 'throttle' cache alias (THROTTLE_CACHE_URL). This is
+   local-memory by default, so each worker counts failures separately
+   until one of them locks the username; point THROTTLE_CACHE_URL at a
+   shared backend when running several workers so the count is global.
+
+Related:
+   - views.py: login_view
+   - middleware.py: invalidate_user() after the row is updated
+   - backend/versioned_cache.py: Counter helper
+"""
+
+import hashlib
+import ipaddress
+import time
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from backend.versioned_cache import increment
+
+from .middleware import invalidate_user
+from .models import User
+
+CACHE_ALIAS = 'throttle'
+KEY_PREFIX = 'login'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def client_ip(request):
+    """The client's address, looking through TRUSTED_PROXIES"""
+    address = request.META.get('REMOTE_ADDR')
+    if not _trusted(address):
+        return address
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+    for hop in reversed(hops):
+        address = hop
+        if not _trusted(hop):
+            break
+    return address
+
+
+def locked_scope(username, ip_address):
+    """
+    'user' or 'ip' if this attempt is locked out, otherwise None, with
+    the seconds until the lock ends.
+    """
+    keys = {_key('lock', 'user', username): 'user', _key('lock', 'ip', ip_address): 'ip'}
+    now = time.time()
+    for key, until in get_cache().get_many(list(keys)).items():
+        if until > now:
+            return keys[key], int(until - now) + 1
+    return None, 0
+
+
+def record_failure(username, ip_address):
+    """
+    Count a failed login. Returns the attempts left for the username,
+    0 once it is locked.
+    """
+    attempts = _increment('user', username)
+    ip_limit = settings.LOGIN_IP_MAX_ATTEMPTS
+    if ip_limit and _increment('ip', ip_address) >= ip_limit:
+        _lock('ip', ip_address)
+
+    if attempts < settings.MAX_LOGIN_ATTEMPTS:
+        return settings.MAX_LOGIN_ATTEMPTS - attempts
+    _lock('user', username)
+    _persist(
+        User.objects.filter(username__iexact=username),
+        failed_login_attempts=attempts, last_login_attempt=timezone.now()
+    )
+    return 0
+
+
+def record_success(user):
+    """Clear the username's failures, and the row's lock if one was stored"""
+    _reset('user', user.username)
+    if user.failed_login_attempts:
+        _persist(User.objects.filter(pk=user.pk), failed_login_attempts=0)
+        user.failed_login_attempts = 0
+
+
+def stored_lock_active(username):
+    """Whether a lock stored on the user row (by any worker) is still in force"""
+    return User.objects.filter(
+        username=username,
+        failed_login_attempts__gte=settings.MAX_LOGIN_ATTEMPTS,
+        last_login_attempt__gt=timezone.now() - timedelta(seconds=settings.LOCKOUT_DURATION),
+    ).exists()
+
+
+def _trusted(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_networks(tuple(settings.TRUSTED_PROXIES)))
+
+
+@lru_cache(maxsize=4)
+def _trusted_networks(proxies):
+    return [ipaddress.ip_network(proxy, strict=False) for proxy in proxies]
+
+
+def _key(kind, scope, value, bucket=None):
+    # Hashed: usernames and IPv6 addresses aren't safe in memcached keys
+    digest = hashlib.md5(str(value).lower().encode(), usedforsecurity=False).hexdigest()
+    key = f'{KEY_PREFIX}:{kind}:{scope}:{digest}'
+    return key if bucket is None else f'{key}:{bucket}'
+
+
+def _bucket(now):
+    return int(now // settings.LOCKOUT_DURATION)
+
+
+def _increment(scope, value):
+    """Add one failure and return the sliding-window estimate"""
+    cache = get_cache()
+    now = time.time()
+    bucket = _bucket(now)
+    # Kept for two windows: the next window still weighs this one
+    current = increment(
+        cache, _key('count', scope, value, bucket), timeout=2 * settings.LOCKOUT_DURATION
+    )
+    previous = cache.get(_key('count', scope, value, bucket - 1), 0)
+    elapsed = (now % settings.LOCKOUT_DURATION) / settings.LOCKOUT_DURATION
+    return current + int(previous * (1 - elapsed))
+
+
+def _reset(scope, value):
+    """Drop the failures counted in the sliding window"""
+    bucket = _bucket(time.time())
+    get_cache().delete_many([
+        _key('count', scope, value, bucket),
+        _key('count', scope, value, bucket - 1),
+    ])
+
+
+def _lock(scope, value):
+    get_cache().set(
+        _key('lock', scope, value), time.time() + settings.LOCKOUT_DURATION,
+        timeout=settings.LOCKOUT_DURATION
+    )
+    # Otherwise the window still holds these failures when the lock ends
+    _reset(scope, value)
+
+
+def _persist(users, **fields):
+    """Update users without loading or saving the whole row"""
+    user_ids = list(users.values_list('pk', flat=True))
+    if user_ids:
+        User.objects.filter(pk__in=user_ids).update(**fields)
+        invalidate_user(*user_ids)
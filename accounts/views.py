@@ -7,8 +7,9 @@ and teachers.
 Implements secure login with:
 - Session-based authentication
 - CSRF protection
-- Account lockout after failed attempts
+- Account lockout after failed attempts (throttling.py)
 - Password validation
+- Password hashing on a bounded pool (hashing.py)
 - Role-based access control
 
 The authentication system is critical for:
@@ -19,25 +20,26 @@ The authentication system is critical for:
 
 Key Components:
 - login_view: Handles user authentication with attempt tracking
+  (per username and per IP, in the throttle cache)
 - logout_view: Manages secure user logout
 - User model: Custom user model with role-based permissions
 
 Related:
 - models.py: Defines the User model
+- throttling.py: Failed login counters and locks
 - serializers.py: Handles data serialization
 - urls.py: Maps URLs to these views
 """
 
 from django.contrib.auth import authenticate, login, logout
-from django.utils import timezone
-from django.conf import settings
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 import json
 
-from .models import User
+from . import throttling
+from .hashing import HashingBusy
 
 # Create your views here.
 
@@ -56,12 +58,38 @@ def login_view(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        user = authenticate(request, username=username, password=password)
+        ip_address = throttling.client_ip(request)
+        scope, retry_after = throttling.locked_scope(username, ip_address)
+        if scope == 'user':
+            return Response(
+                {'error': 'Account is locked. Please try again later.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if scope == 'ip':
+            return Response(
+                {'error': 'Too many login attempts. Please try again later.'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(retry_after)}
+            )
+        # Lock stored on the row by any worker, or before the cache was cleared
+        if throttling.stored_lock_active(username):
+            return Response(
+                {'error': 'Account is locked. Please try again later.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            user = authenticate(request, username=username, password=password)
+        except HashingBusy:
+            return Response(
+                {'error': 'Too many logins right now. Please try again.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '1'}
+            )
         
         if user is not None:
             # Reset failed attempts on successful login
-            user.failed_login_attempts = 0
-            user.save()
+            throttling.record_success(user)
             
             # Create session
             login(request, user)
@@ -78,42 +106,18 @@ def login_view(request):
                 }
             })
         else:
-            # Handle failed login attempt
-            try:
-                user = User.objects.get(username=username)
-                
-                # Check if account is locked
-                if user.failed_login_attempts >= settings.MAX_LOGIN_ATTEMPTS:
-                    lockout_duration = timezone.now() - user.last_login_attempt
-                    if lockout_duration.total_seconds() < settings.LOCKOUT_DURATION:
-                        return Response(
-                            {'error': 'Account is locked. Please try again later.'},
-                            status=status.HTTP_403_FORBIDDEN
-                        )
-                    else:
-                        # Reset attempts if lockout period is over
-                        user.failed_login_attempts = 0
-                
-                # Increment failed attempts
-                user.failed_login_attempts += 1
-                user.last_login_attempt = timezone.now()
-                user.save()
-                
-                remaining_attempts = settings.MAX_LOGIN_ATTEMPTS - user.failed_login_attempts
-                if remaining_attempts > 0:
-                    message = f'Invalid password. {remaining_attempts} attempts remaining.'
-                else:
-                    message = 'Account locked due to too many failed attempts.'
-                
-                return Response(
-                    {'error': message},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-            except User.DoesNotExist:
-                return Response(
-                    {'error': 'Invalid username or password'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
+            # Handle failed login attempt (counted in the throttle cache;
+            # the user row is only written when it becomes locked)
+            remaining_attempts = throttling.record_failure(username, ip_address)
+            if remaining_attempts > 0:
+                message = f'Invalid username or password. {remaining_attempts} attempts remaining.'
+            else:
+                message = 'Account locked due to too many failed attempts.'
+            
+            return Response(
+                {'error': message},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
     except json.JSONDecodeError:
         return Response(
             {'error': 'Invalid JSON format'},
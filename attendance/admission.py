@@ -0,0 +1,137 @@
+"""
+Admission Queue
+
+Bounds how many sign-up writes (reservations and waitlist changes) a
+worker process runs at once. At the bell a whole grade hits the same
+few rooms; without a bound every request goes straight to the database
+and contends for the same rows, so everyone gets slower and clients
+retry on top. With it:
+
+   - At most SIGNUP_MAX_ACTIVE requests per process run at a time
+   - Up to SIGNUP_MAX_WAITING more wait their turn, roughly in arrival
+     order, for at most SIGNUP_QUEUE_TIMEOUT seconds
+   - Anything beyond that is turned away at once with 503 and a
+     Retry-After estimated from the queue length and recent service
+     times, so clients back off instead of hammering
+
+Reads are never queued. The limits are per process; the database sees
+at most SIGNUP_MAX_ACTIVE x worker processes concurrent sign-ups.
+
+Usage:
+    @api_view(['POST', 'DELETE'])
+    @permission_classes([IsAuthenticated])
+    @admission_controlled
+    def class_period_reservation(request, class_id):
+        ...
+
+Related:
+   - reservations.py: Seat claims
+   - waitlist.py: Waitlists
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+
+class Overloaded(Exception):
+    """The queue is full or the wait timed out"""
+
+    def __init__(self, retry_after):
+        super().__init__('Sign-ups are busy, please retry shortly.')
+        self.retry_after = retry_after
+
+
+class AdmissionQueue:
+    """A semaphore with a bounded, timed waiting line"""
+
+    def __init__(self, max_active, max_waiting, timeout):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_active)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        # Moving average of seconds per admitted request
+        self._service_time = 0.05
+
+    @contextmanager
+    def admit(self):
+        """Hold a slot for the duration of the block, or raise Overloaded"""
+        if not self._slots.acquire(blocking=False):
+            self._wait_for_slot()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+            self._slots.release()
+
+    def _wait_for_slot(self):
+        with self._lock:
+            if self._waiting >= self.max_waiting:
+                raise Overloaded(self.retry_after())
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        if not acquired:
+            raise Overloaded(self.retry_after())
+
+    def retry_after(self):
+        """Whole seconds for the current line to drain, at least 1"""
+        drain = self._waiting * self._service_time / self.max_active
+        return max(1, math.ceil(drain))
+
+    @property
+    def waiting(self):
+        return self._waiting
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_signup_queue():
+    """Return the process-wide sign-up queue"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = AdmissionQueue(
+                    max_active=settings.SIGNUP_MAX_ACTIVE,
+                    max_waiting=settings.SIGNUP_MAX_WAITING,
+                    timeout=settings.SIGNUP_QUEUE_TIMEOUT
+                )
+    return _queue
+
+
+def admission_controlled(view):
+    """Run a view's writes through the sign-up queue"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return view(request, *args, **kwargs)
+        try:
+            with get_signup_queue().admit():
+                return view(request, *args, **kwargs)
+        except Overloaded as e:
+            response = Response(
+                {'error': str(e), 'retry_after': e.retry_after},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+            response['Retry-After'] = str(e.retry_after)
+            return response
+    return wrapper
@@ -0,0 +1,330 @@
+"""
+Async Views
+
+Views that run natively on the event loop when the project is served
+through backend/asgi.py (e.g. uvicorn or daphne). They are plain Django
+async views rather than DRF views, since DRF's @api_view is sync-only,
+so they check authentication themselves with request.auser().
+
+1. Read Endpoints:
+   - Async twins of student_list, student_detail, announcement_list,
+     class_period_list and class_period_detail in views.py, with the
+     same URLs, query params, ETags and response bodies
+   - Used in place of the sync views when ASYNC_READ_VIEWS is set (see
+     urls.py); a slow query then waits on the event loop instead of
+     holding a whole worker
+   - Rows are fetched with the async ORM. student_detail loads the
+     student and their teacher's announcements at the same time with
+     concurrently(), since the async ORM runs a request's queries one
+     after another on a single thread
+   - announcement_list and the announcement half of student_detail go
+     through the sync cache helpers (cache.py) off the event loop
+   - @async_api_view stands in for @api_view/@permission_classes:
+     GET only, login required, DRF-style error bodies, rendered with
+     whichever REST_FRAMEWORK renderer DRF's content negotiation picks
+     (JSON, MessagePack, ...). The browsable API needs a DRF view to
+     render, so those requests are handed to the sync twin
+
+2. Event Stream (Server-Sent Events):
+   - GET /api/stream/?topics=seats,announcements
+   - Pushes seat-count changes and new announcements as they happen,
+     so the frontend doesn't have to poll class_period_list and
+     announcement_list during sign-up windows
+   - Sends a keep-alive comment every PUSH_HEARTBEAT_SECONDS
+   - Requires an ASGI server. Under WSGI the stream would be collected
+     into a list before anything is sent, and since it never ends the
+     worker would be stuck for good, so the endpoint answers 501 with
+     the URLs to poll instead
+
+Related:
+   - views.py: The sync views and the helpers shared with them
+   - broker.py: Event fan-out
+   - signals.py: Event sources
+"""
+
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections, connection
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from rest_framework.exceptions import APIException, NotAcceptable, NotAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import views
+from .broker import TOPICS, get_broker
+from .conditional import conditional
+from .models import Student, ClassPeriod
+from .pagination import apaginate, is_cursor_request
+from .query_planner import optimize_queryset, with_columns
+from .serializers import StudentSerializer, ClassPeriodSerializer
+from .views import (
+    STUDENT_ORDERING, CLASS_PERIOD_ORDERING, get_fieldset,
+    filter_students, filter_class_periods, teacher_announcements
+)
+
+
+def negotiate(request):
+    """
+    The (renderer, media type) DRF's content negotiation picks for
+    ``request``, from the REST_FRAMEWORK renderers.
+
+    Raises NotAcceptable when none of them match the Accept header; as
+    in DRF, the error itself is then rendered with the first renderer.
+    """
+    if not hasattr(request, '_accepted_renderer'):
+        renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+        negotiator = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS()
+        try:
+            request._accepted_renderer = negotiator.select_renderer(
+                Request(request), renderers
+            )
+        except NotAcceptable:
+            request._accepted_renderer = (renderers[0], renderers[0].media_type)
+            raise
+    return request._accepted_renderer
+
+
+def render(request, data, status=200):
+    """Render ``data`` with the negotiated renderer, as DRF's Response would"""
+    renderer, media_type = negotiate(request)
+    content_type = media_type
+    if renderer.charset:
+        content_type = f'{media_type}; charset={renderer.charset}'
+    response = HttpResponse(
+        renderer.render(data, media_type, {'request': request}),
+        status=status, content_type=content_type
+    )
+    if len(api_settings.DEFAULT_RENDERER_CLASSES) > 1:
+        patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def async_api_view(sync_view):
+    """
+    Decorator giving an async read view what @api_view and
+    @permission_classes([IsAuthenticated]) give its sync twin.
+
+    The sync twin is kept on the view as ``sync_view`` for callers that
+    need a sync callable, such as the batch endpoint.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                renderer, media_type = negotiate(request)
+            except NotAcceptable as exc:
+                return render(request, {'detail': exc.detail}, status=exc.status_code)
+            if media_type == 'text/html':
+                # The browsable API renders from the DRF view and request
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+            
+            if request.method not in ('GET', 'HEAD'):
+                response = render(
+                    request, {'detail': f'Method "{request.method}" not allowed.'}, status=405
+                )
+                response['Allow'] = 'GET, HEAD'
+                return response
+            
+            user = await request.auser()
+            if not user.is_authenticated:
+                # Session auth has no WWW-Authenticate challenge, so DRF sends 403
+                return render(request, {'detail': NotAuthenticated.default_detail}, status=403)
+            
+            try:
+                return await view(request, *args, **kwargs)
+            except Http404:
+                return render(request, {'detail': 'Not found.'}, status=404)
+            except APIException as exc:
+                detail = exc.detail
+                if not isinstance(detail, (list, dict)):
+                    detail = {'detail': detail}
+                return render(request, detail, status=exc.status_code)
+        
+        wrapper.sync_view = sync_view
+        return wrapper
+    return decorator
+
+
+async def concurrently(*funcs):
+    """
+    Run independent sync query functions at the same time.
+
+    Each function gets its own worker thread and database connection.
+    Inside a transaction (e.g. tests) they run one after another on the
+    request's connection instead, the only one that can see its
+    uncommitted data.
+    """
+    if await sync_to_async(lambda: connection.in_atomic_block)():
+        return [await sync_to_async(func)() for func in funcs]
+    return await asyncio.gather(*(
+        sync_to_async(_on_own_connection, thread_sensitive=False)(func)
+        for func in funcs
+    ))
+
+
+def _on_own_connection(func):
+    # Same connection housekeeping Django does around a normal request
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+@async_api_view(views.student_list)
+async def student_list(request):
+    """Async API endpoint for listing students"""
+    fieldset = get_fieldset(request)
+    students = optimize_queryset(
+        Student.objects.all(), StudentSerializer(**fieldset)
+    )
+    students = filter_students(
+        request, students, ranked=not is_cursor_request(request)
+    )
+    students, pagination = await apaginate(request, students, STUDENT_ORDERING, 25)
+    
+    return render(request, {
+        'results': StudentSerializer(students, many=True, **fieldset).data,
+        **pagination
+    })
+
+
+@async_api_view(views.student_detail)
+@conditional(views.student_detail_version)
+async def student_detail(request, student_id):
+    """Async API endpoint for student details"""
+    fieldset = get_fieldset(request)
+    students = with_columns(
+        optimize_queryset(Student.objects.all(), StudentSerializer(**fieldset)),
+        'teacher'
+    )
+    
+    def load_student():
+        return students.filter(pk=student_id).first()
+    
+    def load_announcements():
+        # @conditional has already loaded the student's teacher_id
+        version = request._data_version
+        if version is None:
+            return None
+        return teacher_announcements(version[1][0]['teacher_id'])
+    
+    student, announcements = await concurrently(load_student, load_announcements)
+    if student is None:
+        raise Http404
+    
+    return render(request, {
+        'student': StudentSerializer(student, **fieldset).data,
+        'announcements': announcements
+    })
+
+
+@async_api_view(views.announcement_list)
+@conditional(views.announcement_list_version)
+async def announcement_list(request):
+    """Async API endpoint for listing announcements"""
+    page = await sync_to_async(views.announcement_page)(request, get_fieldset(request))
+    return render(request, page)
+
+
+@async_api_view(views.class_period_list)
+@conditional(views.class_period_list_version)
+async def class_period_list(request):
+    """Async API endpoint for listing class periods"""
+    fieldset = get_fieldset(request)
+    class_periods = optimize_queryset(
+        ClassPeriod.objects.all(), ClassPeriodSerializer(**fieldset)
+    )
+    class_periods = filter_class_periods(request, class_periods).order_by('room_number')
+    class_periods, pagination = await apaginate(
+        request, class_periods, CLASS_PERIOD_ORDERING, 25
+    )
+    
+    return render(request, {
+        'results': ClassPeriodSerializer(class_periods, many=True, **fieldset).data,
+        **pagination
+    })
+
+
+@async_api_view(views.class_period_detail)
+async def class_period_detail(request, class_id):
+    """Async API endpoint for class period details"""
+    class_period = await aget_object_or_404(
+        optimize_queryset(ClassPeriod.objects.all(), ClassPeriodSerializer),
+        pk=class_id
+    )
+    students = optimize_queryset(
+        Student.objects.filter(teacher_period2_id=class_period.teacher_id),
+        StudentSerializer
+    )
+    
+    return render(request, {
+        'class_period': ClassPeriodSerializer(class_period).data,
+        'students': StudentSerializer([s async for s in students], many=True).data,
+        'available_seats': class_period.capacity - class_period.current_enrollment
+    })
+
+
+async def event_stream(request):
+    """Server-Sent Events endpoint for seat counts and announcements"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=401
+        )
+    
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {
+                'error': 'The event stream needs the ASGI server. Poll these instead.',
+                'poll': {
+                    'seats': reverse('attendance:class_period_list_api'),
+                    'announcements': reverse('attendance:announcement_list_api'),
+                },
+            },
+            status=501
+        )
+
+    requested = request.GET.get('topics')
+    topics = set(requested.split(',')) & TOPICS if requested else set(TOPICS)
+    if not topics:
+        return JsonResponse(
+            {'error': f"Unknown topics. Choose from: {', '.join(sorted(TOPICS))}"},
+            status=400
+        )
+    
+    response = StreamingHttpResponse(
+        _stream(get_broker(), topics), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer events
+    return response
+
+
+async def _stream(broker, topics):
+    subscription = broker.subscribe(topics)
+    try:
+        # Tell EventSource how long to wait before reconnecting
+        yield b'retry: 5000\n\n'
+        while True:
+            try:
+                frame = await asyncio.wait_for(
+                    subscription.queue.get(), settings.PUSH_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield b': keep-alive\n\n'
+                continue
+            if frame is None:
+                # Fell too far behind; the client will reconnect
+                break
+            yield frame
+    finally:
+        broker.unsubscribe(subscription)
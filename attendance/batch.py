@@ -0,0 +1,175 @@
+"""
+Batch Requests
+
+Lets the frontend collapse several attendance reads into one round trip:
+
+    POST /api/batch/
+    {
+        "requests": [
+            {"path": "/api/class-periods/?available=true"},
+            {"path": "/api/students/?teacher=12"},
+            {"path": "/api/announcements/"}
+        ]
+    }
+
+Returns the sub-responses in the same order:
+
+    {"responses": [{"status": 200, "body": {...}}, ...]}
+
+How it works:
+   - The batch request is authenticated once (session + CSRF); each
+     sub-request reuses the already-loaded user and session, so the
+     sub-views don't hit the session or user tables again
+   - Only GET sub-requests against the attendance API are allowed;
+     streaming endpoints (export, event stream) are rejected
+   - Sub-requests run concurrently on a small shared thread pool
+     (BATCH_MAX_WORKERS), since reads are independent of each other.
+     Inside a transaction (e.g. ATOMIC_REQUESTS or tests) they run in
+     order on the request's own connection instead, because other
+     threads couldn't see its uncommitted data
+
+Related:
+   - urls.py: The attendance URL patterns sub-requests are resolved against
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+logger = logging.getLogger('django.request')
+
+MAX_BATCH_SIZE = 20
+
+# Streaming endpoints, and the batch endpoint itself
+UNBATCHABLE = {'student_export_api', 'event_stream_api', 'batch_api'}
+
+# Headers that belong to the batch request itself, not its sub-requests
+EXCLUDED_META = {
+    'CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_IF_NONE_MATCH',
+    'HTTP_IF_MODIFIED_SINCE', 'wsgi.input',
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch(request):
+    """API endpoint for running several attendance reads in one request"""
+    sub_requests = request.data.get('requests')
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return Response(
+            {'error': 'requests must be a non-empty list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(sub_requests) > MAX_BATCH_SIZE:
+        return Response(
+            {'error': f'A batch can hold at most {MAX_BATCH_SIZE} requests'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    calls = [_prepare(request, sub_request) for sub_request in sub_requests]
+    return Response({'responses': _run_all(calls)})
+
+
+def _prepare(request, sub_request):
+    """Return a zero-argument callable producing one sub-response"""
+    if not isinstance(sub_request, dict) or not isinstance(sub_request.get('path'), str):
+        return _error(status.HTTP_400_BAD_REQUEST, 'Each request needs a path')
+    method = sub_request.get('method', 'GET')
+    if not isinstance(method, str):
+        return _error(status.HTTP_400_BAD_REQUEST, 'A request method must be a string')
+    if method.upper() != 'GET':
+        return _error(status.HTTP_405_METHOD_NOT_ALLOWED, 'Only GET requests can be batched')
+
+    url = urlsplit(sub_request['path'])
+    try:
+        match = resolve(url.path)
+    except Resolver404:
+        return _error(status.HTTP_404_NOT_FOUND, 'Not found')
+    # Async read views carry their sync twin, which can run on a thread
+    view = getattr(match.func, 'sync_view', match.func)
+    if match.namespace != 'attendance' or match.url_name in UNBATCHABLE or \
+            asyncio.iscoroutinefunction(view):
+        return _error(status.HTTP_400_BAD_REQUEST, 'This endpoint cannot be batched')
+
+    sub = _build_subrequest(request, url.path, url.query)
+
+    def call():
+        try:
+            response = view(sub, *match.args, **match.kwargs)
+        except Exception:
+            logger.exception('Batch sub-request to %s failed', url.path)
+            return {'status': status.HTTP_500_INTERNAL_SERVER_ERROR, 'body': None}
+        result = {'status': response.status_code, 'body': getattr(response, 'data', None)}
+        if response.has_header('ETag'):
+            result['etag'] = response['ETag']
+        return result
+    return call
+
+
+def _build_subrequest(request, path, query):
+    sub = HttpRequest()
+    sub.method = 'GET'
+    sub.path = sub.path_info = path
+    sub.META = {
+        key: value for key, value in request.META.items() if key not in EXCLUDED_META
+    }
+    sub.META.update(REQUEST_METHOD='GET', PATH_INFO=path, QUERY_STRING=query)
+    sub.GET = QueryDict(query)
+    sub.COOKIES = request.COOKIES
+    # Reuse the authenticated user and session from the batch request
+    sub.user = request.user
+    sub.session = request.session
+    sub._dont_enforce_csrf_checks = True
+    return sub
+
+
+def _error(status_code, message):
+    return lambda: {'status': status_code, 'body': {'error': message}}
+
+
+def _run_all(calls):
+    if len(calls) == 1 or settings.BATCH_MAX_WORKERS <= 1 or connection.in_atomic_block:
+        return [call() for call in calls]
+
+    executor = _get_executor()
+    futures = [
+        executor.submit(contextvars.copy_context().run, _run_in_worker, call)
+        for call in calls
+    ]
+    return [future.result() for future in futures]
+
+
+def _run_in_worker(call):
+    # Same connection housekeeping Django does around a normal request
+    close_old_connections()
+    try:
+        return call()
+    finally:
+        close_old_connections()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.BATCH_MAX_WORKERS,
+                    thread_name_prefix='batch'
+                )
+    return _executor
@@ -0,0 +1,121 @@
+"""
+Push Broker
+
+Fans out real-time events to clients connected to the event stream
+(see async_views.event_stream). Each event is encoded into a
+Server-Sent Events frame exactly once and the same bytes are handed to
+every subscriber, so the cost of an event doesn't grow with the number
+of clients beyond a queue put each.
+
+Topics:
+   - seats: Seat count changes for a ClassPeriod
+   - announcements: New announcements
+
+InProcessBroker:
+   - Subscribers live in the current process, so this suits single-node
+     deployments running one ASGI process
+   - publish() is thread-safe and can be called from sync code (signal
+     receivers, WSGI threads); delivery is scheduled on each
+     subscriber's event loop
+   - Each subscriber has a bounded queue; a client too slow to keep up
+     is disconnected rather than buffering without limit, and its
+     EventSource reconnects
+
+The broker class can be swapped with the PUSH_BROKER setting.
+
+Related:
+   - async_views.py: event_stream endpoint
+   - signals.py: Publishes seat and announcement events
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+TOPICS = frozenset({'seats', 'announcements'})
+
+
+class Subscription:
+    """One connected client's topics and pending frames"""
+
+    def __init__(self, topics, max_queue):
+        self.topics = frozenset(topics)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+
+    def deliver(self, frame):
+        """Queue a frame; runs on the subscriber's event loop"""
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop everything and tell the stream to end
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class InProcessBroker:
+    """Publish/subscribe within a single process"""
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, topics):
+        """Register a subscriber; must be called from a running event loop"""
+        subscription = Subscription(topics, self.max_queue)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, topic, data):
+        """Encode an event once and deliver it to every matching subscriber"""
+        with self._lock:
+            subscribers = [s for s in self._subscriptions if topic in s.topics]
+            event_id = next(self._ids)
+        if not subscribers:
+            return 0
+
+        frame = encode_event(topic, data, event_id)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, frame)
+            except RuntimeError:
+                # The client's event loop has already closed
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscriptions)
+
+
+def encode_event(topic, data, event_id):
+    """Build a Server-Sent Events frame"""
+    payload = json.dumps(data, separators=(',', ':'), default=str)
+    return f'id: {event_id}\nevent: {topic}\ndata: {payload}\n\n'.encode()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the process-wide broker configured by PUSH_BROKER"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.PUSH_BROKER)()
+    return _broker
@@ -0,0 +1,112 @@
+"""
+Announcement Cache
+
+Caches serialized announcement data, which is the most-read data in the
+system and changes only a few times a day:
+
+1. Feed Pages:
+   - The announcement_list response body for a given set of query
+     params (page, page_size, cursor, ...)
+
+2. Teacher Lists:
+   - The announcements part of student_detail, per teacher
+
+Invalidation:
+   Keys embed a generation number (backend/versioned_cache.py). The
+   post_save/post_delete receivers in signals.py bump the feed
+   generation and the affected teacher's generation, now and again on
+   commit, so stale entries are never read again and simply expire.
+   Entries also expire after ANNOUNCEMENT_CACHE_TIMEOUT as a backstop
+   for changes that don't fire signals (e.g. a teacher's name changing).
+
+Backends:
+   Uses the 'announcements' cache alias. This is local-memory by default,
+   which is only coherent within one process; set ANNOUNCEMENT_CACHE_URL
+   to a shared backend (e.g. redis://...) when running several workers.
+
+Hit/miss counters are kept in the same cache so they add up across
+workers on a shared backend. See cache_stats().
+
+Related:
+   - signals.py: Invalidation receivers
+   - views.py: announcement_list and student_detail
+   - backend/versioned_cache.py: Generation and counter helpers
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+from backend.versioned_cache import bump_on_commit, bump_version, increment, start_version
+
+CACHE_ALIAS = 'announcements'
+KEY_PREFIX = 'announcements'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def cached_feed_page(request, build):
+    """Return the announcement_list body for this request, building on a miss"""
+    params = sorted(
+        (key, value) for key, values in request.GET.lists() for value in values
+    )
+    digest = hashlib.md5(repr(params).encode(), usedforsecurity=False).hexdigest()
+    key = f'{KEY_PREFIX}:feed:{_generation("feed")}:{digest}'
+    return _get_or_build(key, build)
+
+
+def cached_teacher_announcements(teacher_id, build):
+    """Return the serialized announcements for one teacher, building on a miss"""
+    key = f'{KEY_PREFIX}:teacher:{teacher_id}:{_generation(f"teacher:{teacher_id}")}'
+    return _get_or_build(key, build)
+
+
+def invalidate_announcements(*teacher_ids):
+    """Drop the feed and the given teachers' lists"""
+    def bump():
+        _bump_generation('feed')
+        for teacher_id in set(teacher_ids):
+            _bump_generation(f'teacher:{teacher_id}')
+
+    bump_on_commit(bump)
+
+
+def cache_stats():
+    """Return hit/miss counters for the announcement cache"""
+    cache = get_cache()
+    hits = cache.get(f'{KEY_PREFIX}:stats:hits', 0)
+    misses = cache.get(f'{KEY_PREFIX}:stats:misses', 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+    }
+
+
+def _get_or_build(key, build):
+    cache = get_cache()
+    value = cache.get(key)
+    if value is not None:
+        _count('hits')
+        return value
+
+    _count('misses')
+    value = build()
+    cache.set(key, value, settings.ANNOUNCEMENT_CACHE_TIMEOUT)
+    return value
+
+
+def _generation(name):
+    return start_version(get_cache(), f'{KEY_PREFIX}:gen:{name}')
+
+
+def _bump_generation(name):
+    bump_version(get_cache(), f'{KEY_PREFIX}:gen:{name}')
+
+
+def _count(name):
+    increment(get_cache(), f'{KEY_PREFIX}:stats:{name}')
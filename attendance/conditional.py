@@ -0,0 +1,96 @@
+"""
+Conditional GET
+
+Adds ETag and Last-Modified headers to read endpoints so clients that
+poll can send If-None-Match/If-Modified-Since and get a 304 back without
+the view querying or serializing anything.
+
+Each endpoint supplies a version function that returns a cheap summary
+of the data behind the response, typically one aggregate query such as
+max(timestamp) plus a row count. The ETag is a hash of that summary
+together with the request path, query params and Accept header, so
+different pages, filters and renderers never share an ETag.
+
+Limitations:
+   - Deleting rows lowers the count but not max(timestamp), so only the
+     ETag notices deletes; clients should prefer If-None-Match
+   - Nested teacher details are not part of the version
+
+Usage:
+    @api_view(['GET'])
+    @permission_classes([IsAuthenticated])
+    @conditional(announcement_list_version)
+    def announcement_list(request):
+        ...
+
+Async views can be decorated the same way; the version function is
+still sync and runs through sync_to_async before Django's checks.
+
+Related:
+   - views.py: Version functions for each endpoint
+   - async_views.py: Async read endpoints
+"""
+
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.views.decorators.http import condition
+
+
+def conditional(version_func):
+    """
+    Decorator adding ETag/Last-Modified computed by ``version_func``.
+
+    ``version_func(request, *args, **kwargs)`` returns a tuple of
+    (last_modified datetime or None, fingerprint) or None when there is
+    nothing to version (e.g. the object doesn't exist).
+    """
+    def etag(request, *args, **kwargs):
+        version = _get_version(request, version_func, args, kwargs)
+        if version is None:
+            return None
+        return make_etag(request, version[1])
+
+    def last_modified(request, *args, **kwargs):
+        version = _get_version(request, version_func, args, kwargs)
+        if version is None:
+            return None
+        return version[0]
+
+    def decorator(view):
+        wrapped = condition(etag_func=etag, last_modified_func=last_modified)(view)
+        if not iscoroutinefunction(view):
+            return wrapped
+
+        @wraps(view)
+        async def async_view(request, *args, **kwargs):
+            # condition() calls etag/last_modified synchronously, so load
+            # the version off the event loop first; they then reuse it
+            await sync_to_async(_get_version)(request, version_func, args, kwargs)
+            return await wrapped(request, *args, **kwargs)
+        return async_view
+
+    return decorator
+
+
+def make_etag(request, fingerprint):
+    """Hash a data fingerprint with everything else that shapes the response"""
+    params = sorted(
+        (key, value) for key, values in request.GET.lists() for value in values
+    )
+    raw = '|'.join([
+        request.path,
+        repr(params),
+        request.META.get('HTTP_ACCEPT', ''),
+        repr(fingerprint),
+    ])
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def _get_version(request, version_func, args, kwargs):
+    # The ETag and Last-Modified callbacks share one version lookup
+    if not hasattr(request, '_data_version'):
+        request._data_version = version_func(request, *args, **kwargs)
+    return request._data_version
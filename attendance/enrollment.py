@@ -0,0 +1,96 @@
+"""
+Enrollment Counts
+
+Keeps ClassPeriod.current_enrollment equal to the real roster. The
+counter is denormalized so list views and seat claims can read it
+without counting rows, and this module recomputes it from the source
+tables in the database.
+
+What counts as enrolled:
+   - Second period (ClassPeriod.ROSTER_PERIOD): students whose teacher_period2 is
+     the period's teacher (the imported roster). reservations.py
+     refuses seats in it, since every student already has one
+   - Any other period: seats claimed through reservations.py
+
+How it is kept in sync:
+   - reserve_seat()/release_seat() adjust the counter in the same
+     transaction as the Reservation row
+   - Moving a student to another period 2 teacher, or deleting a
+     student, recomputes just the periods involved (signals.py)
+   - Bulk loads (import_period2_data) write students without signals
+     and recompute once at the end
+   - The reconcile_enrollment command recomputes every period, for
+     drift from raw SQL or older imports
+   - Every recount then gives seats it freed to waiting students
+     (reservations.fill_from_waitlists), so nobody waits next to a
+     free seat
+
+Recomputing is one UPDATE whatever the number of periods:
+
+    UPDATE attendance_classperiod SET current_enrollment =
+        CASE WHEN period = '2' THEN (SELECT count(*) FROM students
+                                     WHERE teacher_period2_id = teacher_id)
+             ELSE (SELECT count(*) FROM attendance_reservation
+                   WHERE class_period_id = attendance_classperiod.id) END
+    WHERE current_enrollment <> <the same expression>
+
+Only rows whose count is wrong are written, so correct periods keep
+their updated_at (and their clients' ETags).
+
+Related:
+   - reservations.py: Seat claims
+   - signals.py: Student change receivers
+   - management/commands/reconcile_enrollment.py
+"""
+
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Now
+
+from .models import ClassPeriod, Reservation, Student
+from .reservations import fill_from_waitlists
+
+
+def actual_enrollment():
+    """Expression for a ClassPeriod's real enrollment, for annotate()/update()"""
+    roster = Student.objects.filter(
+        teacher_period2_id=OuterRef('teacher_id')
+    ).order_by().values('teacher_period2_id').annotate(count=Count('pk')).values('count')
+    reserved = Reservation.objects.filter(
+        class_period_id=OuterRef('pk')
+    ).order_by().values('class_period_id').annotate(count=Count('pk')).values('count')
+
+    return Case(
+        When(period=ClassPeriod.ROSTER_PERIOD, then=Coalesce(Subquery(roster), Value(0))),
+        default=Coalesce(Subquery(reserved), Value(0))
+    )
+
+
+def reconcile_enrollment(class_periods=None):
+    """
+    Recompute current_enrollment in a single UPDATE, then promote
+    waiting students into any seats that are free.
+
+    ``class_periods`` optionally narrows it to a ClassPeriod queryset.
+    Returns the number of periods that were corrected.
+    """
+    if class_periods is None:
+        class_periods = ClassPeriod.objects.all()
+    corrected = class_periods.annotate(
+        actual=actual_enrollment()
+    ).exclude(
+        current_enrollment=F('actual')
+    ).update(
+        current_enrollment=actual_enrollment(),
+        updated_at=Now()
+    )
+    fill_from_waitlists(class_periods)
+    return corrected
+
+
+def reconcile_teachers(*teacher_ids):
+    """Recompute the second period counts for these teachers"""
+    teacher_ids = {teacher_id for teacher_id in teacher_ids if teacher_id is not None}
+    if teacher_ids:
+        reconcile_enrollment(
+            ClassPeriod.objects.filter(period=ClassPeriod.ROSTER_PERIOD, teacher_id__in=teacher_ids)
+        )
@@ -0,0 +1,79 @@
+"""
+Roster Exports
+
+Streams the student roster as CSV or NDJSON without holding it in
+memory. Rows are read with QuerySet.iterator(chunk_size=...), which
+uses a server-side cursor on PostgreSQL, and each row is encoded and
+handed to StreamingHttpResponse as soon as it is fetched, so memory
+stays flat whether the export is 500 or 500k rows.
+
+Formats:
+   - csv: Header row followed by one line per student
+   - ndjson: One JSON object per line (application/x-ndjson)
+
+Related:
+   - views.py: student_export endpoint
+"""
+
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (column name in the export, ORM lookup)
+EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('grade', 'grade'),
+    ('hcpss_email', 'hcpss_email'),
+    ('account_email', 'account_email'),
+    ('phone_num', 'phone_num'),
+    ('receive_notif', 'receive_notif'),
+    ('teacher', 'teacher__username'),
+    ('teacher_period2', 'teacher_period2__username'),
+    ('theme', 'theme'),
+    ('temp_teacher', 'temp_teacher'),
+)
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """File-like object that hands written lines back instead of storing them"""
+
+    def write(self, value):
+        return value
+
+
+def stream_students(students, output):
+    """Return a StreamingHttpResponse exporting the given students"""
+    headers = [name for name, _ in EXPORT_COLUMNS]
+    rows = students.order_by('id').values_list(
+        *[lookup for _, lookup in EXPORT_COLUMNS]
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    if output == 'ndjson':
+        content = _ndjson_lines(headers, rows)
+    else:
+        content = _csv_lines(headers, rows)
+
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[output])
+    response['Content-Disposition'] = f'attachment; filename="students.{output}"'
+    return response
+
+
+def _csv_lines(headers, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _ndjson_lines(headers, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(headers, row)), separators=(',', ':')) + '\n'
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from attendance.cache import cache_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Show announcement cache hit/miss counters. Counters are only shared '
+        'with the web workers when ANNOUNCEMENT_CACHE_URL is a shared backend.'
+    )
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        self.stdout.write(f"Hits:     {stats['hits']}")
+        self.stdout.write(f"Misses:   {stats['misses']}")
+        self.stdout.write(f"Hit rate: {stats['hit_rate']:.1%}")
@@ -0,0 +1,79 @@
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from attendance.models import Student, Announcement, ClassPeriod
+from backend.benchmarking import rolled_back
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Measure bytes and CPU saved by conditional GET for polling clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--polls', type=int, default=200,
+            help='Number of polls per endpoint'
+        )
+        parser.add_argument(
+            '--announcements', type=int, default=200,
+            help='Number of announcements to create'
+        )
+
+    def handle(self, *args, **options):
+        # Test data lives in a transaction that is rolled back at the end
+        with rolled_back():
+            self._run(options['polls'], options['announcements'])
+
+    def _run(self, polls, announcement_count):
+        teacher = User.objects.create_user(
+            username='bench.poll.teacher', email='bench.poll.teacher@example.com',
+            first_name='Bench', last_name='Teacher', role='TEACHER'
+        )
+        student = Student.objects.create(
+            name='Bench Student', grade=9,
+            hcpss_email='bench.poll.student@inst.hcpss.org', teacher=teacher
+        )
+        for i in range(25):
+            ClassPeriod.objects.create(
+                teacher=User.objects.create_user(
+                    username=f'bench.poll.rt{i}', email=f'bench.poll.rt{i}@example.com',
+                    role='TEACHER'
+                ),
+                period='RT', room_number=f'R{i:03d}', subject='Raider Time'
+            )
+        Announcement.objects.bulk_create([
+            Announcement(title=f'Announcement {i}', body='Body ' * 40, teacher=teacher)
+            for i in range(announcement_count)
+        ])
+
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(teacher)
+        endpoints = [
+            ('announcement_list', reverse('attendance:announcement_list_api'), {}),
+            ('class_period_list', reverse('attendance:class_period_list_api'),
+             {'available': 'true'}),
+            ('student_detail', reverse(
+                'attendance:student_detail_api', kwargs={'student_id': student.id}
+            ), {}),
+        ]
+
+        self.stdout.write(
+            f"{'endpoint':<20} {'mode':<12} {'bytes/poll':>11} {'cpu ms/poll':>12} {'status':>7}"
+        )
+        for name, url, params in endpoints:
+            first = client.get(url, params, secure=True)
+            etag = first['ETag']
+            for mode, headers in (('full', {}), ('conditional', {'HTTP_IF_NONE_MATCH': etag})):
+                total_bytes = 0
+                start = time.process_time()
+                for _ in range(polls):
+                    response = client.get(url, params, secure=True, **headers)
+                    total_bytes += len(response.content)
+                cpu = (time.process_time() - start) / polls
+                self.stdout.write(
+                    f"{name:<20} {mode:<12} {total_bytes / polls:>11.0f} "
+                    f"{cpu * 1000:>12.3f} {response.status_code:>7}"
+                )
@@ -0,0 +1,106 @@
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from attendance.models import Student, ClassPeriod, Announcement
+from attendance.serializers import (
+    StudentSerializer, ClassPeriodSerializer, AnnouncementSerializer
+)
+from attendance.query_planner import optimize_queryset
+from backend import renderers
+from backend.benchmarking import rolled_back
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare render time and payload size of the stock JSON renderer '
+        'against the orjson and MessagePack renderers'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[25, 250, 2500],
+            help='Page sizes (rows) to render'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Renders to time per page'
+        )
+
+    def handle(self, *args, **options):
+        candidates = [('stock json', JSONRenderer())]
+        if renderers.orjson is not None:
+            candidates.append(('orjson', renderers.FastJSONRenderer()))
+        else:
+            self.stdout.write('orjson not installed; skipping FastJSONRenderer')
+        if renderers.msgpack is not None:
+            candidates.append(('msgpack', renderers.MessagePackRenderer()))
+        else:
+            self.stdout.write('msgpack not installed; skipping MessagePackRenderer')
+
+        # All rows are created in a transaction that is rolled back
+        with rolled_back():
+            self._create_data(max(options['sizes']))
+            for name, model, serializer in [
+                ('students', Student, StudentSerializer),
+                ('class periods', ClassPeriod, ClassPeriodSerializer),
+                ('announcements', Announcement, AnnouncementSerializer),
+            ]:
+                self._benchmark(name, model, serializer, candidates, options)
+
+    def _create_data(self, size):
+        # One teacher per class period (a teacher has one room per period)
+        User.objects.bulk_create([
+            User(
+                username=f'bench.render{i}', email=f'bench.render{i}@example.com',
+                first_name='Bench', last_name=f'Teacher {i}', role='TEACHER'
+            )
+            for i in range(size)
+        ], batch_size=1000)
+        teachers = list(User.objects.filter(username__startswith='bench.render'))
+        Student.objects.bulk_create([
+            Student(
+                name=f'Render Student {i}', grade=9 + i % 4,
+                hcpss_email=f'bench.render{i}@inst.hcpss.org',
+                account_email=f'render{i}@example.com', phone_num='4105550100',
+                teacher=teachers[i % 20], teacher_period2=teachers[(i + 1) % 20]
+            )
+            for i in range(size)
+        ], batch_size=1000)
+        ClassPeriod.objects.bulk_create([
+            ClassPeriod(
+                teacher=teachers[i], period='RT', room_number=f'R{i:04d}',
+                subject='Raider Time'
+            )
+            for i in range(size)
+        ], batch_size=1000)
+        Announcement.objects.bulk_create([
+            Announcement(
+                title=f'Announcement {i}', body='Bring your laptop. ' * 10,
+                teacher=teachers[i % 20]
+            )
+            for i in range(size)
+        ], batch_size=1000)
+
+    def _benchmark(self, name, model, serializer, candidates, options):
+        self.stdout.write(f"\n{name}")
+        self.stdout.write(
+            f"{'rows':>6} {'serialize ms':>13} "
+            + ' '.join(f"{label + ' ms':>14} {'bytes':>9}" for label, _ in candidates)
+        )
+        for size in options['sizes']:
+            rows = list(optimize_queryset(model.objects.all(), serializer)[:size])
+            start = time.perf_counter()
+            data = {'results': serializer(rows, many=True).data}
+            serialize = time.perf_counter() - start
+
+            columns = []
+            for _, renderer in candidates:
+                start = time.perf_counter()
+                for _ in range(options['repeat']):
+                    body = renderer.render(data, renderer.media_type, {})
+                elapsed = (time.perf_counter() - start) / options['repeat']
+                columns.append(f"{elapsed * 1000:>14.3f} {len(body):>9}")
+            self.stdout.write(f"{size:>6} {serialize * 1000:>13.2f} " + ' '.join(columns))
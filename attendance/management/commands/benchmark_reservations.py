@@ -0,0 +1,123 @@
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from attendance.models import Student, ClassPeriod, Reservation
+from attendance.reservations import reserve_seat, ReservationError
+
+User = get_user_model()
+
+PREFIX = 'bench.rt'
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulate a whole grade signing up for Raider Time at once and check '
+        'that no room is oversold. Meant for PostgreSQL; SQLite serializes '
+        'writers and will report lock errors under concurrency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=450)
+        parser.add_argument('--rooms', type=int, default=12)
+        parser.add_argument('--capacity', type=int, default=30)
+        parser.add_argument('--workers', type=int, default=32)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        self._cleanup()
+        students, rooms = self._create_data(options)
+
+        # Popular rooms get picked more often, like real sign-ups
+        weights = [1 / (i + 1) for i in range(len(rooms))]
+        choices = [rng.choices(rooms, weights)[0] for _ in students]
+
+        self.stdout.write(
+            f"{len(students)} students, {len(rooms)} rooms x {options['capacity']} seats, "
+            f"{options['workers']} workers ({connection.vendor})"
+        )
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(self._attempt, students, choices))
+        elapsed = time.perf_counter() - start
+
+        try:
+            self._report(results, elapsed, rooms)
+        finally:
+            self._cleanup()
+
+    def _create_data(self, options):
+        rooms = []
+        for i in range(options['rooms']):
+            teacher = User.objects.create_user(
+                username=f'{PREFIX}.teacher{i}', email=f'{PREFIX}.teacher{i}@example.com',
+                role='TEACHER'
+            )
+            rooms.append(ClassPeriod.objects.create(
+                teacher=teacher, period='RT', room_number=f'RT{i:03d}',
+                subject='Raider Time', capacity=options['capacity']
+            ).id)
+        Student.objects.bulk_create([
+            Student(
+                name=f'Bench Student {i}', grade=10,
+                hcpss_email=f'{PREFIX}.student{i}@inst.hcpss.org'
+            )
+            for i in range(options['students'])
+        ], batch_size=1000)
+        students = list(Student.objects.filter(hcpss_email__startswith=PREFIX))
+        return students, rooms
+
+    def _attempt(self, student, room_id):
+        start = time.perf_counter()
+        try:
+            reserve_seat(student, room_id)
+            outcome = 'reserved'
+        except ReservationError as e:
+            outcome = type(e).__name__
+        except Exception as e:
+            outcome = f'error: {type(e).__name__}'
+        finally:
+            connection.close()
+        return outcome, time.perf_counter() - start
+
+    def _report(self, results, elapsed, rooms):
+        latencies = sorted(latency for _, latency in results)
+        outcomes = {}
+        for outcome, _ in results:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+        self.stdout.write(f"Elapsed: {elapsed:.2f}s ({len(results) / elapsed:.0f} attempts/s)")
+        self.stdout.write(
+            f"Latency p50 {statistics.median(latencies) * 1000:.1f}ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms, "
+            f"max {latencies[-1] * 1000:.1f}ms"
+        )
+        for outcome, count in sorted(outcomes.items()):
+            self.stdout.write(f"  {outcome}: {count}")
+
+        oversold = []
+        counts = dict(
+            Reservation.objects.filter(class_period_id__in=rooms)
+            .values_list('class_period_id').annotate(Count('id'))
+        )
+        for room in ClassPeriod.objects.filter(id__in=rooms):
+            reserved = counts.get(room.id, 0)
+            if reserved > room.capacity or reserved != room.current_enrollment:
+                oversold.append(
+                    f"{room.room_number}: {reserved} reservations, "
+                    f"counter {room.current_enrollment}, capacity {room.capacity}"
+                )
+        if oversold:
+            for line in oversold:
+                self.stderr.write(self.style.ERROR(line))
+        else:
+            self.stdout.write(self.style.SUCCESS('No room oversold; counters match reservations.'))
+
+    def _cleanup(self):
+        Student.objects.filter(hcpss_email__startswith=PREFIX).delete()
+        User.objects.filter(username__startswith=PREFIX).delete()
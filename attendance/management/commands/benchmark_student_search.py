@@ -0,0 +1,96 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from attendance.models import Student
+from attendance.search import search_students
+from backend.benchmarking import rolled_back
+
+FIRST_NAMES = [
+    'Aiden', 'Amara', 'Benjamin', 'Chloe', 'Daniel', 'Elena', 'Gabriel',
+    'Hannah', 'Isaac', 'Jasmine', 'Kevin', 'Layla', 'Marcus', 'Nadia',
+    'Owen', 'Priya', 'Quinn', 'Rosa', 'Samuel', 'Tara', 'Victor', 'Zoe',
+]
+LAST_NAMES = [
+    'Adams', 'Baker', 'Chen', 'Diaz', 'Evans', 'Garcia', 'Hughes', 'Ibrahim',
+    'Johnson', 'Kim', 'Lopez', 'Martin', 'Nguyen', 'Okafor', 'Patel',
+    'Robinson', 'Singh', 'Thompson', 'Walker', 'Young',
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ranked student search against the old name__icontains filter'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[5000, 50000],
+            help='Numbers of students to benchmark with'
+        )
+        parser.add_argument(
+            '--queries', type=int, default=50,
+            help='Number of search terms to time per size'
+        )
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        terms = [self._term(rng) for _ in range(options['queries'])]
+
+        self.stdout.write(f"Database: {connection.vendor}")
+        self.stdout.write(f"{'students':>10} {'icontains ms':>14} {'search ms':>11} {'speedup':>8}")
+
+        for size in options['sizes']:
+            # All rows are created in a transaction that is rolled back
+            with rolled_back():
+                self._create_students(size, rng)
+                legacy = self._time(terms, self._legacy_search)
+                ranked = self._time(terms, self._ranked_search)
+
+            speedup = legacy / ranked if ranked else float('inf')
+            self.stdout.write(
+                f"{size:>10} {legacy * 1000:>14.2f} {ranked * 1000:>11.2f} {speedup:>7.1f}x"
+            )
+
+    def _create_students(self, size, rng):
+        students = []
+        for i in range(size):
+            first = rng.choice(FIRST_NAMES)
+            last = rng.choice(LAST_NAMES)
+            students.append(Student(
+                name=f"{first} {last}",
+                grade=rng.randint(9, 12),
+                hcpss_email=f"{first[0].lower()}{last.lower()}{i}@inst.hcpss.org",
+            ))
+        Student.objects.bulk_create(students, batch_size=5000)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE students')
+
+    def _term(self, rng):
+        name = rng.choice(FIRST_NAMES + LAST_NAMES)
+        start = rng.randint(0, max(0, len(name) - 4))
+        return name[start:start + rng.randint(3, 5)]
+
+    def _legacy_search(self, term):
+        if connection.vendor == 'postgresql':
+            # Simulate the table before the trigram indexes existed
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_bitmapscan = off')
+                cursor.execute('SET LOCAL enable_indexscan = off')
+        try:
+            return list(Student.objects.filter(name__icontains=term)[:25])
+        finally:
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_bitmapscan = on')
+                    cursor.execute('SET LOCAL enable_indexscan = on')
+
+    def _ranked_search(self, term):
+        return list(search_students(Student.objects.all(), term)[:25])
+
+    def _time(self, terms, search):
+        """Return the mean seconds per search"""
+        start = time.perf_counter()
+        for term in terms:
+            search(term)
+        return (time.perf_counter() - start) / len(terms)
@@ -2,6 +2,8 @@ import csv
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models.functions import Now
+from attendance.enrollment import reconcile_enrollment
 from attendance.models import Student, ClassPeriod
 
 User = get_user_model()
@@ -100,22 +102,23 @@ class Command(BaseCommand):
                                 }
                             )
                             
-                            # Update period 2 teacher
-                            student.teacher_period2 = teacher
-                            student.save()
-                            
-                            # Update class enrollment
-                            class_period = ClassPeriod.objects.get(
-                                teacher=teacher,
-                                period='2'
+                            # Update period 2 teacher. update() skips the
+                            # per-student enrollment signal; counts are
+                            # recomputed once below
+                            Student.objects.filter(pk=student.pk).update(
+                                teacher_period2=teacher, updated_at=Now()
                             )
-                            class_period.current_enrollment += 1
-                            class_period.save()
                             
                             self.stdout.write(f"Updated student: {student.name}")
                                 
                         except User.DoesNotExist:
                             self.stderr.write(f"Teacher not found: {teacher_name}")
+                    
+                    # Recount every second period class in one statement
+                    corrected = reconcile_enrollment(
+                        ClassPeriod.objects.filter(period='2')
+                    )
+                    self.stdout.write(f"Updated enrollment for {corrected} class periods")
                             
         except FileNotFoundError:
             self.stderr.write(f"File not found: {csv_file}")
@@ -0,0 +1,33 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from attendance.enrollment import reconcile_enrollment
+from attendance.models import ClassPeriod
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute every class period\'s current_enrollment from the period 2 '
+        'roster and reservations in one UPDATE'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--period', choices=[str(value) for value, _ in ClassPeriod.PERIOD_CHOICES],
+            help='Only reconcile class periods for this period'
+        )
+
+    def handle(self, *args, **options):
+        class_periods = ClassPeriod.objects.all()
+        if options['period']:
+            class_periods = class_periods.filter(period=options['period'])
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            corrected = reconcile_enrollment(class_periods)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Corrected {corrected} of {class_periods.count()} class periods "
+            f"in {elapsed * 1000:.1f}ms"
+        ))
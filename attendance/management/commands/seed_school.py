@@ -0,0 +1,70 @@
+import time
+from django.core.management.base import BaseCommand
+from attendance.seeding import seed_school, clear_school
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a synthetic school (teachers, class periods for every period, '
+        'students, announcements, notifications) for scale and load testing'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--teachers', type=int, default=120,
+            help='Teachers to create; each gets a class period for every period'
+        )
+        parser.add_argument(
+            '--students-per-grade', type=int, default=500,
+            help='Students to create in each of grades 9-12'
+        )
+        parser.add_argument(
+            '--announcements', type=int, default=None,
+            help='Announcements to create (default: two per teacher)'
+        )
+        parser.add_argument(
+            '--notifications', type=int, default=100,
+            help='Notifications to create'
+        )
+        parser.add_argument(
+            '--student-accounts', type=int, default=0,
+            help='Create logins for this many students (e.g. for loadgen.py)'
+        )
+        parser.add_argument(
+            '--password', default='raidertime',
+            help='Password for every seeded teacher and student account'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Random seed; the same seed builds the same school'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Rows per INSERT'
+        )
+        parser.add_argument(
+            '--flush', action='store_true',
+            help='Delete previously seeded data first'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        if options['flush']:
+            deleted = clear_school()
+            self.stdout.write(f"Deleted {deleted} seeded rows")
+
+        created = seed_school(
+            teachers=options['teachers'],
+            students_per_grade=options['students_per_grade'],
+            announcements=options['announcements'],
+            notifications=options['notifications'],
+            student_accounts=options['student_accounts'],
+            password=options['password'],
+            seed=options['seed'],
+            batch_size=options['batch_size']
+        )
+        elapsed = time.perf_counter() - start
+
+        for name, count in created.items():
+            self.stdout.write(f"  {name}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Seeded school in {elapsed:.1f}s"))
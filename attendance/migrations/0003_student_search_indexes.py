@@ -0,0 +1,34 @@
+# Trigram indexes for student search (PostgreSQL only)
+
+from django.db import migrations
+
+SEARCH_COLUMNS = ('name', 'hcpss_email', 'account_email')
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS students_{column}_trgm '
+            f'ON students USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS students_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0002_classperiod"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,85 @@
+# Waitlists for full class periods
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0005_reservation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="classperiod",
+            name="waitlist_policy",
+            field=models.CharField(
+                choices=[
+                    ("fifo", "First come, first served"),
+                    ("priority", "Priority, then first come"),
+                ],
+                default="fifo",
+                max_length=10,
+            ),
+        ),
+        migrations.CreateModel(
+            name="WaitlistEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[
+                            (1, "First Period"),
+                            (2, "Second Period"),
+                            ("RT", "Raider Time"),
+                            (3, "Third Period"),
+                            (4, "Fourth Period"),
+                        ],
+                        max_length=2,
+                    ),
+                ),
+                ("priority", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "class_period",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entries",
+                        to="attendance.classperiod",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entries",
+                        to="attendance.student",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["class_period", "-priority", "id"],
+                        name="waitlist_order_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("student", "class_period"),
+                        name="one_waitlist_entry_per_class_period",
+                    )
+                ],
+            },
+        ),
+    ]
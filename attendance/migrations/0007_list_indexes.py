@@ -0,0 +1,44 @@
+# Composite indexes for the list endpoints' filters and orderings
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0006_waitlist"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(fields=["grade", "id"], name="students_grade_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(fields=["teacher", "id"], name="students_teacher_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="classperiod",
+            index=models.Index(fields=["room_number", "id"], name="classperiod_room_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="classperiod",
+            index=models.Index(
+                fields=["period", "room_number", "id"],
+                name="classperiod_period_room_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="classperiod",
+            index=models.Index(
+                condition=models.Q(("current_enrollment__lt", models.F("capacity"))),
+                fields=["room_number", "id"],
+                name="classperiod_open_room_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="announcement",
+            index=models.Index(fields=["-timestamp", "id"], name="announcement_feed_idx"),
+        ),
+    ]
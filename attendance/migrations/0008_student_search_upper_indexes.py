@@ -0,0 +1,42 @@
+# Rebuild the student search trigram indexes on UPPER(column) (PostgreSQL only)
+#
+# icontains compiles to UPPER("column"::text) LIKE UPPER('%term%') on
+# PostgreSQL, which the bare-column indexes from 0003 can't serve
+
+from django.db import migrations
+
+SEARCH_COLUMNS = ('name', 'hcpss_email', 'account_email')
+
+
+def create_upper_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS students_{column}_trgm')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS students_{column}_upper_trgm '
+            f'ON students USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def restore_column_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS students_{column}_upper_trgm')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS students_{column}_trgm '
+            f'ON students USING gin ({column} gin_trgm_ops)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0007_list_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_upper_indexes, restore_column_indexes),
+    ]
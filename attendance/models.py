@@ -10,6 +10,8 @@ class periods, and announcements. The system is designed to handle:
    - Teacher assignments
    - Current enrollment monitoring
    - Availability checking for room assignments
+   - Seat reservations (one per student per period)
+   - Waitlists for full rooms, first come first served or by priority
 
 2. Student Management:
    - Basic student information (name, grade, email)
@@ -31,6 +33,9 @@ class periods, and announcements. The system is designed to handle:
 
 Database Structure:
    - Unique constraints on teacher-period combinations
+   - Composite indexes for the list endpoints' filters and orderings
+     (checked by tests/test_query_plans.py)
+   - updated_at/timestamp columns used to version HTTP responses
    - Default room capacity of 30 students
    - Automatic enrollment counting
    - Links between Student and User models
@@ -69,9 +74,15 @@ class Student(models.Model):
     )
     theme = models.CharField(max_length=50, blank=True)
     temp_teacher = models.CharField(max_length=100, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'students'  # Match existing table name
+        indexes = [
+            # student_list filters, in its (cursor) id order
+            models.Index(fields=['grade', 'id'], name='students_grade_idx'),
+            models.Index(fields=['teacher', 'id'], name='students_teacher_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} (Grade {self.grade})"
@@ -92,13 +103,38 @@ class ClassPeriod(models.Model):
         on_delete=models.CASCADE,
         related_name='teaching_periods'
     )
+    # Filled from the roster (Student.teacher_period2), not by reservations
+    ROSTER_PERIOD = '2'
+    WAITLIST_FIFO = 'fifo'
+    WAITLIST_PRIORITY = 'priority'
+    WAITLIST_POLICY_CHOICES = [
+        (WAITLIST_FIFO, 'First come, first served'),
+        (WAITLIST_PRIORITY, 'Priority, then first come'),
+    ]
+    
     room_number = models.CharField(max_length=10)
     capacity = models.IntegerField(default=30)
     current_enrollment = models.IntegerField(default=0)
     subject = models.CharField(max_length=100)
+    waitlist_policy = models.CharField(
+        max_length=10, choices=WAITLIST_POLICY_CHOICES, default=WAITLIST_FIFO
+    )
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ['teacher', 'period']
+        indexes = [
+            # class_period_list is ordered by room; the unique
+            # (teacher, period) index serves ?teacher=
+            models.Index(fields=['room_number', 'id'], name='classperiod_room_idx'),
+            models.Index(fields=['period', 'room_number', 'id'], name='classperiod_period_room_idx'),
+            # ?available=true: only rooms with open seats
+            models.Index(
+                fields=['room_number', 'id'],
+                condition=models.Q(current_enrollment__lt=models.F('capacity')),
+                name='classperiod_open_room_idx'
+            ),
+        ]
         
     def __str__(self):
         return f"{self.get_period_display()} - {self.subject} ({self.teacher.get_full_name()})"
@@ -107,6 +143,71 @@ class ClassPeriod(models.Model):
         """Check if the class has available space"""
         return self.current_enrollment < self.capacity
 
+class Reservation(models.Model):
+    """A student's claimed seat in a class period"""
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='reservations'
+    )
+    class_period = models.ForeignKey(
+        ClassPeriod,
+        on_delete=models.CASCADE,
+        related_name='reservations'
+    )
+    # Copied from class_period so a student can hold one seat per period
+    period = models.CharField(max_length=2, choices=ClassPeriod.PERIOD_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'period'],
+                name='one_reservation_per_period'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student.name} in {self.class_period_id} ({self.period})"
+
+class WaitlistEntry(models.Model):
+    """A student waiting for a seat in a full class period"""
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries'
+    )
+    class_period = models.ForeignKey(
+        ClassPeriod,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries'
+    )
+    # Copied from class_period so a promoted student leaves their other
+    # waitlists for the same period
+    period = models.CharField(max_length=2, choices=ClassPeriod.PERIOD_CHOICES)
+    # Higher goes first; always 0 under the FIFO policy. Ties go by id,
+    # which increases in join order
+    priority = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'class_period'],
+                name='one_waitlist_entry_per_class_period'
+            ),
+        ]
+        indexes = [
+            # Serves both the head of the line and position counts
+            models.Index(
+                fields=['class_period', '-priority', 'id'],
+                name='waitlist_order_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student.name} waiting for {self.class_period_id} ({self.period})"
+
 class Announcement(models.Model):
     """Announcement model based on existing database structure"""
     timestamp = models.DateTimeField(auto_now=True)
@@ -120,6 +221,10 @@ class Announcement(models.Model):
 
     class Meta:
         db_table = 'announcements'
+        indexes = [
+            # announcement_list order, and its Max('timestamp') version
+            models.Index(fields=['-timestamp', 'id'], name='announcement_feed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.teacher.get_full_name()}"
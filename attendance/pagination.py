@@ -0,0 +1,201 @@
+"""
+Pagination
+
+Shared pagination helpers for the attendance list endpoints. Two modes
+are supported:
+
+1. Page Numbers (default):
+   - ?page=N&page_size=M
+   - Backed by django.core.paginator.Paginator
+   - Returns total_pages, current_page, has_next, has_previous
+   - Kept for the existing frontend
+
+2. Cursors (keyset):
+   - ?cursor= (empty for the first page) or ?cursor=<opaque token>
+   - Filters on the last row's sort key instead of OFFSET, so every
+     page costs the same no matter how deep the client has paged
+   - No COUNT(*) unless the client asks for it with ?count=true
+   - Returns next_cursor and has_next
+
+Each endpoint passes a stable ordering that ends in a unique column
+(e.g. ('-timestamp', 'id')) so cursors never skip or repeat rows.
+
+Both modes have an async twin, apaginate(), which fetches rows with
+the async ORM.
+
+Related:
+   - views.py: List endpoints using these helpers
+   - async_views.py: Async list endpoints
+"""
+
+import base64
+import json
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from .query_planner import with_columns
+
+MAX_CURSOR_PAGE_SIZE = 100
+
+
+def is_cursor_request(request):
+    """Check if the client asked for cursor pagination"""
+    return 'cursor' in request.GET
+
+
+def paginate(request, queryset, ordering, default_page_size):
+    """
+    Paginate a queryset in page-number or cursor mode.
+
+    Returns a tuple of (rows, metadata) where metadata holds the
+    pagination keys to merge into the response body.
+    """
+    if is_cursor_request(request):
+        return _paginate_cursor(request, queryset, ordering, default_page_size)
+    return _paginate_pages(request, queryset, default_page_size)
+
+
+async def apaginate(request, queryset, ordering, default_page_size):
+    """Async version of paginate() for async views"""
+    if is_cursor_request(request):
+        return await _apaginate_cursor(request, queryset, ordering, default_page_size)
+    return await _apaginate_pages(request, queryset, default_page_size)
+
+
+def _paginate_pages(request, queryset, default_page_size):
+    paginator, page = _paginator(request, queryset, default_page_size)
+    rows = paginator.get_page(page)
+    return rows, _page_metadata(paginator, page, rows)
+
+
+async def _apaginate_pages(request, queryset, default_page_size):
+    paginator, page = _paginator(request, queryset, default_page_size)
+    # Count up front so get_page() doesn't query synchronously
+    paginator.count = await queryset.acount()
+    rows = paginator.get_page(page)
+    rows.object_list = [row async for row in rows.object_list]
+    return rows, _page_metadata(paginator, page, rows)
+
+
+def _paginator(request, queryset, default_page_size):
+    page_size = int(request.GET.get('page_size', default_page_size))
+    return Paginator(queryset, page_size), request.GET.get('page', 1)
+
+
+def _page_metadata(paginator, page, rows):
+    return {
+        'total_pages': paginator.num_pages,
+        'current_page': page,
+        'has_next': rows.has_next(),
+        'has_previous': rows.has_previous()
+    }
+
+
+def _paginate_cursor(request, queryset, ordering, default_page_size):
+    queryset, filtered, page_size = _cursor_queryset(
+        request, queryset, ordering, default_page_size
+    )
+    # Fetch one extra row to find out if there is a next page
+    rows = list(queryset[:page_size + 1])
+    count = filtered.count() if _wants_count(request) else None
+    return _cursor_page(rows, ordering, page_size, count)
+
+
+async def _apaginate_cursor(request, queryset, ordering, default_page_size):
+    queryset, filtered, page_size = _cursor_queryset(
+        request, queryset, ordering, default_page_size
+    )
+    rows = [row async for row in queryset[:page_size + 1]]
+    count = await filtered.acount() if _wants_count(request) else None
+    return _cursor_page(rows, ordering, page_size, count)
+
+
+def _cursor_queryset(request, queryset, ordering, default_page_size):
+    """
+    Build the cursor page query.
+
+    Returns (page query, the same query without the cursor condition for
+    ?count=true, page size).
+    """
+    page_size = _parse_page_size(request.GET.get('page_size'), default_page_size)
+    # The last row's sort key becomes the next cursor, so it can't be deferred
+    queryset = with_columns(
+        queryset.order_by(*ordering), *(field.lstrip('-') for field in ordering)
+    )
+    filtered = queryset
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, ordering)
+        queryset = queryset.filter(_keyset_filter(ordering, values))
+    return queryset, filtered, page_size
+
+
+def _cursor_page(rows, ordering, page_size, count):
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+
+    metadata = {
+        'next_cursor': encode_cursor(rows[-1], ordering) if has_next else None,
+        'has_next': has_next,
+    }
+    if count is not None:
+        metadata['count'] = count
+    return rows, metadata
+
+
+def _wants_count(request):
+    return request.GET.get('count', '').lower() == 'true'
+
+
+def _parse_page_size(value, default):
+    try:
+        page_size = int(value) if value else default
+    except ValueError:
+        raise ValidationError({'page_size': 'Must be an integer'})
+    return max(1, min(page_size, MAX_CURSOR_PAGE_SIZE))
+
+
+def _keyset_filter(ordering, values):
+    """
+    Build the "rows after this key" condition for a multi-column ordering.
+
+    For ordering (a, b, c) this is:
+        a > va OR (a = va AND b > vb) OR (a = va AND b = vb AND c > vc)
+    with > swapped for < on descending columns.
+    """
+    condition = Q()
+    equal_so_far = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal_so_far & Q(**{f'{name}__{lookup}': value})
+        equal_so_far &= Q(**{name: value})
+    return condition
+
+
+def encode_cursor(obj, ordering):
+    """Encode the sort key of a row into an opaque cursor string"""
+    values = []
+    for field in ordering:
+        value = getattr(obj, field.lstrip('-'))
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, ordering):
+    """Decode a cursor string back into typed sort key values"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError('Cursor does not match ordering')
+        return [
+            model._meta.get_field(field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, values)
+        ]
+    except Exception:
+        raise ValidationError({'cursor': 'Invalid cursor'})
@@ -0,0 +1,179 @@
+"""
+Query Planner
+
+Builds select_related/prefetch_related/only() calls from a serializer's
+declared fields so views fetch exactly what the serializer will read,
+in a constant number of queries regardless of page size.
+
+How fields are planned:
+   - Plain model fields: added to only()
+   - Nested serializers on a forward FK/OneToOne: select_related, with
+     the nested serializer's fields planned under the relation prefix
+   - Nested serializers with many=True: prefetch_related using a
+     Prefetch whose queryset is planned from the child serializer
+   - Related fields (e.g. PrimaryKeyRelatedField): the FK column only
+   - SerializerMethodField: columns listed in the serializer's
+     Meta.method_field_dependencies, e.g.
+         method_field_dependencies = {
+             'available_seats': ('capacity', 'current_enrollment'),
+         }
+
+Anything the planner can't map to a concrete column (source='*',
+properties, undeclared method fields) turns off only() for the whole
+query so nothing is ever lazily loaded one row at a time.
+
+Usage:
+    students = optimize_queryset(Student.objects.all(), StudentSerializer)
+
+Related:
+   - serializers.py: Serializers being planned
+   - views.py: Views applying the planned querysets
+"""
+
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def optimize_queryset(queryset, serializer):
+    """
+    Apply the joins and column list a serializer needs to a queryset.
+
+    ``serializer`` may be a serializer class or instance. For instances,
+    the already-built ``fields`` are used, so per-request field pruning
+    is reflected in the plan.
+    """
+    plan = QueryPlan()
+    plan.add_serializer(queryset.model, _get_fields(serializer), prefix='')
+
+    if plan.select_related:
+        queryset = queryset.select_related(*sorted(plan.select_related))
+    if plan.prefetch_related:
+        queryset = queryset.prefetch_related(*plan.prefetch_related)
+    if plan.only is not None:
+        queryset = queryset.only(*sorted(plan.only))
+    return queryset
+
+
+class QueryPlan:
+    """Accumulates the related lookups and columns a serializer reads"""
+
+    def __init__(self):
+        self.select_related = set()
+        self.prefetch_related = []
+        # None means "load every column"; a set restricts with only()
+        self.only = set()
+
+    def add_serializer(self, model, fields, prefix):
+        pk_name = model._meta.pk.name
+        self._add_column(prefix + pk_name)
+
+        for field in fields.values():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                self._add_method_field(model, field, prefix)
+            elif field.source == '*':
+                self._unrestrict()
+            elif isinstance(field, serializers.ListSerializer):
+                self._add_many(model, field, prefix)
+            elif isinstance(field, serializers.BaseSerializer):
+                self._add_nested(model, field, prefix)
+            elif isinstance(field, serializers.ManyRelatedField):
+                self.prefetch_related.append(prefix + field.source)
+            else:
+                self._add_source(model, field.source_attrs, prefix)
+
+    def _add_nested(self, model, field, prefix):
+        model_field = _get_model_field(model, field.source)
+        if model_field is None or not model_field.is_relation:
+            self._unrestrict()
+            return
+        if model_field.many_to_many or model_field.one_to_many:
+            self._add_many(model, field, prefix, child=field)
+            return
+
+        self._add_column(prefix + model_field.name)
+        lookup = prefix + model_field.name
+        self.select_related.add(lookup)
+        self.add_serializer(
+            model_field.related_model, _get_fields(field), prefix=lookup + '__'
+        )
+
+    def _add_many(self, model, field, prefix, child=None):
+        child = child or field.child
+        model_field = _get_model_field(model, field.source)
+        if model_field is None or not model_field.is_relation:
+            self._unrestrict()
+            return
+
+        related_queryset = optimize_queryset(
+            model_field.related_model._default_manager.all(), child
+        )
+        if model_field.one_to_many:
+            # The reverse FK must be loaded for Django to match rows back up
+            related_queryset = with_columns(
+                related_queryset, model_field.field.attname
+            )
+        self.prefetch_related.append(
+            Prefetch(prefix + field.source, queryset=related_queryset)
+        )
+
+    def _add_method_field(self, model, field, prefix):
+        meta = getattr(field.parent, 'Meta', None)
+        dependencies = getattr(meta, 'method_field_dependencies', {})
+        if field.field_name not in dependencies:
+            self._unrestrict()
+            return
+        for source in dependencies[field.field_name]:
+            self._add_source(model, source.split('.'), prefix)
+
+    def _add_source(self, model, source_attrs, prefix):
+        """Plan a (possibly dotted) source like 'teacher.email'"""
+        for attr in source_attrs[:-1]:
+            model_field = _get_model_field(model, attr)
+            if model_field is None or not model_field.is_relation or \
+                    model_field.many_to_many or model_field.one_to_many:
+                self._unrestrict()
+                return
+            self._add_column(prefix + model_field.name)
+            prefix = f'{prefix}{model_field.name}__'
+            self.select_related.add(prefix[:-2])
+            self._add_column(prefix + model_field.related_model._meta.pk.name)
+            model = model_field.related_model
+
+        model_field = _get_model_field(model, source_attrs[-1])
+        if model_field is None or not model_field.concrete:
+            self._unrestrict()
+            return
+        self._add_column(prefix + model_field.name)
+
+    def _add_column(self, path):
+        if self.only is not None:
+            self.only.add(path)
+
+    def _unrestrict(self):
+        """Give up on only() when a field can't be mapped to columns"""
+        self.only = None
+
+
+def _get_fields(serializer):
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    if isinstance(serializer, type):
+        serializer = serializer()
+    return serializer.fields
+
+
+def _get_model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except Exception:
+        return None
+
+
+def with_columns(queryset, *names):
+    """Make sure columns are loaded even if only() left them out"""
+    deferred, defer = queryset.query.deferred_loading
+    if defer:
+        return queryset
+    return queryset.only(*deferred, *names)
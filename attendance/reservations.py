@@ -0,0 +1,200 @@
+"""
+Seat Reservations
+
+Claims and releases seats in class periods. Built for sign-up bursts,
+when a whole grade tries to reserve Raider Time rooms in the same
+minute:
+
+1. Claiming a Seat:
+   - A single conditional UPDATE:
+         UPDATE ... SET current_enrollment = current_enrollment + 1
+         WHERE id = %s AND current_enrollment < capacity
+   - The database re-checks the condition under the row lock, so two
+     requests can never both take the last seat
+   - The Reservation row is inserted in the same transaction; the
+     unique (student, period) constraint stops double bookings and
+     rolls the increment back
+   - Second period is refused: its seats come from the roster
+     (enrollment.py), so a reservation would count a student twice
+
+2. Releasing a Seat:
+   - Deletes the Reservation and decrements the counter in one
+     transaction, never below zero
+   - If students are waiting (waitlist.py), the freed seat goes to the
+     head of the line in the same transaction, so nobody polling
+     class_period_list can take it first
+   - Seats freed any other way (a recount after a student is deleted,
+     a capacity increase) are handed out by fill_from_waitlists()
+
+   Holding a seat removes the student from any other waitlists for
+   the same period.
+
+3. Notifications:
+   - seat_count_changed is sent after the transaction commits with the
+     class period id, the new enrollment and the capacity
+
+Related:
+   - models.py: Reservation and ClassPeriod models
+   - views.py: class_period_reservation endpoint
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef
+from django.db.models.functions import Now
+from django.dispatch import Signal
+
+from .models import ClassPeriod, Reservation, WaitlistEntry
+
+# Head of the line first; matches WaitlistEntry's waitlist_order_idx
+WAITLIST_ORDERING = ('-priority', 'id')
+
+# Sent with class_period_id, current_enrollment and capacity
+seat_count_changed = Signal()
+
+
+class ReservationError(Exception):
+    """Base class for reservation failures"""
+
+
+class PeriodFull(ReservationError):
+    pass
+
+
+class AlreadyReserved(ReservationError):
+    pass
+
+
+class NotReserved(ReservationError):
+    pass
+
+
+class RosterManaged(ReservationError):
+    pass
+
+
+def reserve_seat(student, class_period_id):
+    """
+    Claim a seat for ``student``. Returns the new Reservation.
+
+    Raises ClassPeriod.DoesNotExist, PeriodFull, AlreadyReserved or
+    RosterManaged.
+    """
+    with transaction.atomic():
+        claimed = ClassPeriod.objects.filter(
+            pk=class_period_id,
+            current_enrollment__lt=F('capacity')
+        ).exclude(
+            period=ClassPeriod.ROSTER_PERIOD
+        ).update(
+            current_enrollment=F('current_enrollment') + 1,
+            updated_at=Now()
+        )
+        period, enrollment, capacity = _get_counts(class_period_id)
+        if not claimed:
+            if period == ClassPeriod.ROSTER_PERIOD:
+                raise RosterManaged('Seats in this period come from the class roster.')
+            raise PeriodFull('This class period is full.')
+
+        try:
+            reservation = Reservation.objects.create(
+                student=student,
+                class_period_id=class_period_id,
+                period=period
+            )
+        except IntegrityError:
+            # Leaving the atomic block with an exception undoes the increment
+            raise AlreadyReserved(
+                'Student already has a reservation for this period.'
+            )
+
+        WaitlistEntry.objects.filter(student=student, period=period).delete()
+        _notify(class_period_id, enrollment, capacity)
+    return reservation
+
+
+def release_seat(student, class_period_id):
+    """
+    Give up ``student``'s seat. Returns the class period's new enrollment.
+
+    Raises NotReserved if the student holds no seat in the period.
+    """
+    with transaction.atomic():
+        deleted, _ = Reservation.objects.filter(
+            student=student,
+            class_period_id=class_period_id
+        ).delete()
+        if not deleted:
+            raise NotReserved('Student has no reservation for this class period.')
+
+        ClassPeriod.objects.filter(
+            pk=class_period_id,
+            current_enrollment__gt=0
+        ).update(
+            current_enrollment=F('current_enrollment') - 1,
+            updated_at=Now()
+        )
+        promote_waitlisted(class_period_id)
+        _, enrollment, capacity = _get_counts(class_period_id)
+        _notify(class_period_id, enrollment, capacity)
+    return enrollment
+
+
+def promote_waitlisted(class_period_id):
+    """
+    Give free seats to the students at the head of the waitlist.
+
+    Must run inside the transaction that freed the seat. Returns the
+    promoted students' Reservations.
+    """
+    promoted = []
+    while True:
+        # skip_locked lets two releases in the same room promote different
+        # students instead of queueing on the same head row
+        entry = WaitlistEntry.objects.select_for_update(skip_locked=True).filter(
+            class_period_id=class_period_id
+        ).select_related('student').order_by(*WAITLIST_ORDERING).first()
+        if entry is None:
+            return promoted
+
+        try:
+            with transaction.atomic():
+                # Also clears the student's waitlist entries for the period
+                promoted.append(reserve_seat(entry.student, class_period_id))
+        except (PeriodFull, RosterManaged):
+            # No seat after all (e.g. capacity was lowered); they stay first
+            return promoted
+        except AlreadyReserved:
+            # Took a seat elsewhere in this period meanwhile; skip them
+            entry.delete()
+
+
+def fill_from_waitlists(class_periods):
+    """
+    Promote waiting students into any of ``class_periods`` that have
+    free seats. Returns the promoted students' Reservations.
+    """
+    open_ids = list(class_periods.filter(
+        current_enrollment__lt=F('capacity')
+    ).filter(
+        Exists(WaitlistEntry.objects.filter(class_period_id=OuterRef('pk')))
+    ).values_list('pk', flat=True))
+    promoted = []
+    with transaction.atomic():
+        for class_period_id in open_ids:
+            promoted.extend(promote_waitlisted(class_period_id))
+    return promoted
+
+
+def _get_counts(class_period_id):
+    return ClassPeriod.objects.values_list(
+        'period', 'current_enrollment', 'capacity'
+    ).get(pk=class_period_id)
+
+
+def _notify(class_period_id, enrollment, capacity):
+    transaction.on_commit(lambda: seat_count_changed.send(
+        sender=ClassPeriod,
+        class_period_id=class_period_id,
+        current_enrollment=enrollment,
+        capacity=capacity
+    ))
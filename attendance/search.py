@@ -0,0 +1,72 @@
+"""
+Student Search
+
+Implements the ?search= filter for the student list. Matches the term
+against the student's name, HCPSS email and account email and ranks
+the results:
+
+1. PostgreSQL:
+   - Substring matching with icontains, which Django compiles to
+     UPPER(column::text) LIKE UPPER('%term%'). Served by the pg_trgm GIN
+     indexes on UPPER(column::text) from migration
+     0008_student_search_upper_indexes; an index on the bare column
+     can't match that expression
+   - Ranked by the best trigram similarity across the three columns
+
+2. Other databases (SQLite for local development and tests):
+   - Substring matching with icontains
+   - Ranked by exact name match, then name prefix, then anything else
+
+Related:
+   - views.py: student_list uses search_students
+   - management/commands/benchmark_student_search.py: Benchmark
+"""
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+
+SEARCH_FIELDS = ('name', 'hcpss_email', 'account_email')
+
+
+def search_students(queryset, term, ranked=True):
+    """
+    Filter students matching ``term``.
+
+    With ``ranked`` the results carry a ``search_rank`` annotation and
+    are ordered best match first; otherwise the queryset's ordering is
+    left alone (e.g. for cursor pagination).
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+
+    matches = Q()
+    for field in SEARCH_FIELDS:
+        matches |= Q(**{f'{field}__icontains': term})
+    queryset = queryset.filter(matches)
+
+    if not ranked:
+        return queryset
+    if connections[queryset.db].vendor == 'postgresql':
+        rank = _trigram_rank(term)
+    else:
+        rank = _fallback_rank(term)
+    return queryset.annotate(search_rank=rank).order_by('-search_rank', 'name', 'id')
+
+
+def _trigram_rank(term):
+    # Imported lazily so SQLite setups don't need the postgres extras
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    return Greatest(*[TrigramSimilarity(field, term) for field in SEARCH_FIELDS])
+
+
+def _fallback_rank(term):
+    return Case(
+        When(name__iexact=term, then=Value(3)),
+        When(name__istartswith=term, then=Value(2)),
+        When(hcpss_email__istartswith=term, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
@@ -0,0 +1,186 @@
+"""
+Synthetic School Data
+
+Builds a made-up but realistically shaped school for scale and load
+testing, so it doesn't depend on a real period 2 CSV or test.sql:
+
+1. What it creates:
+   - Teachers (User, role TEACHER) spread over DEPARTMENTS, each with
+     one room
+   - A ClassPeriod per teacher for every period (1, 2, RT, 3, 4), with
+     a subject from the teacher's department
+   - Students per grade (9-12), each with a Raider Time teacher and a
+     period 2 teacher
+   - Announcements from random teachers and school-wide notifications
+   - Optionally login accounts (User, role STUDENT) for the first
+     students, for loadgen.py
+
+2. Speed:
+   - Every table is written with bulk_create in large batches, so no
+     per-row signals or queries; 50k students take seconds
+   - Every account shares one password hash, computed once
+   - Period 2 enrollment is counted afterwards in one UPDATE
+     (enrollment.reconcile_enrollment)
+
+3. Determinism:
+   - All choices come from random.Random(seed), and names and emails
+     are derived from row numbers, so the same arguments always build
+     the same school
+
+Seeded rows are recognisable by SEED_DOMAIN in their emails (and
+SEED_MARKER on notifications), so clear_school() can remove them without
+touching real data.
+
+Related:
+   - management/commands/seed_school.py
+   - enrollment.py: Enrollment counts
+"""
+
+import random
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from .enrollment import reconcile_enrollment
+from .models import Student, ClassPeriod, Announcement, Notification
+
+User = get_user_model()
+
+SEED_DOMAIN = 'seed.hcpss.org'
+SEED_MARKER = '[seed] '
+
+PERIODS = [str(value) for value, _ in ClassPeriod.PERIOD_CHOICES]
+GRADES = [9, 10, 11, 12]
+
+DEPARTMENTS = {
+    'English': ['English 9', 'English 10', 'AP Literature', 'Journalism', 'Creative Writing'],
+    'Math': ['Algebra I', 'Geometry', 'Algebra II', 'Precalculus', 'AP Calculus'],
+    'Science': ['Biology', 'Chemistry', 'Physics', 'AP Environmental Science', 'Anatomy'],
+    'Social Studies': ['US History', 'World History', 'Government', 'AP Psychology', 'Economics'],
+    'World Languages': ['Spanish I', 'Spanish III', 'French II', 'Chinese I', 'Latin'],
+    'Fine Arts': ['Band', 'Chorus', 'Studio Art', 'Theatre', 'Orchestra'],
+    'Physical Education': ['Physical Education', 'Health', 'Weight Training', 'Dance'],
+    'Technology': ['Computer Science', 'AP Computer Science A', 'Engineering', 'Web Design'],
+}
+
+FIRST_NAMES = [
+    'Aaliyah', 'Aiden', 'Amara', 'Ben', 'Camila', 'Daniel', 'Elena', 'Ethan',
+    'Fatima', 'Gabriel', 'Hana', 'Isaac', 'Jada', 'Jin', 'Kai', 'Leah', 'Lucas',
+    'Maya', 'Mohammed', 'Nia', 'Noah', 'Olivia', 'Priya', 'Rafael', 'Sofia',
+    'Tariq', 'Uma', 'Victor', 'Wei', 'Yusuf', 'Zoe',
+]
+LAST_NAMES = [
+    'Adams', 'Brown', 'Chen', 'Davis', 'Evans', 'Garcia', 'Hernandez', 'Ibrahim',
+    'Johnson', 'Kim', 'Lee', 'Martinez', 'Nguyen', 'Okafor', 'Patel', 'Quinn',
+    'Robinson', 'Singh', 'Thomas', 'Usman', 'Vasquez', 'Williams', 'Xu', 'Young',
+    'Zhang',
+]
+ANNOUNCEMENT_TITLES = [
+    'Quiz tomorrow', 'Bring your laptop', 'Room change', 'Test corrections',
+    'Club meeting', 'Study session', 'Project due Friday', 'No Raider Time today',
+]
+
+
+def _name(rng):
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+
+def seed_school(teachers=120, students_per_grade=500, announcements=None,
+                notifications=100, student_accounts=0, password='raidertime',
+                seed=0, batch_size=5000):
+    """
+    Create a synthetic school. Returns the number of rows created per model.
+
+    ``announcements`` defaults to two per teacher. ``student_accounts``
+    creates logins (username = the student's email name) for that many
+    students, all with ``password``, as do the teachers.
+    """
+    rng = random.Random(seed)
+    password_hash = make_password(password)
+    if announcements is None:
+        announcements = teachers * 2
+    department_names = list(DEPARTMENTS)
+
+    with transaction.atomic():
+        teacher_rows = []
+        for i in range(teachers):
+            first, last = _name(rng)
+            username = f'{first}.{last}.t{i}'.lower()
+            teacher_rows.append(User(
+                username=username, email=f'{username}@{SEED_DOMAIN}',
+                first_name=first, last_name=last, password=password_hash,
+                role=User.Role.TEACHER, department=department_names[i % len(department_names)]
+            ))
+        User.objects.bulk_create(teacher_rows, batch_size=batch_size)
+        teacher_list = list(
+            User.objects.filter(role=User.Role.TEACHER, email__endswith=f'@{SEED_DOMAIN}')
+            .only('pk', 'department').order_by('pk')
+        )
+
+        ClassPeriod.objects.bulk_create([
+            ClassPeriod(
+                teacher=teacher, period=period, room_number=f'{100 + i}',
+                subject=rng.choice(DEPARTMENTS[teacher.department]),
+                capacity=rng.randint(24, 35)
+            )
+            for i, teacher in enumerate(teacher_list)
+            for period in PERIODS
+        ], batch_size=batch_size)
+
+        student_rows = []
+        for grade in GRADES:
+            for i in range(students_per_grade):
+                first, last = _name(rng)
+                number = len(student_rows)
+                student_rows.append(Student(
+                    name=f'{first} {last}', grade=grade,
+                    hcpss_email=f'{first}.{last}.s{number}@{SEED_DOMAIN}'.lower(),
+                    receive_notif=rng.random() < 0.3,
+                    teacher=rng.choice(teacher_list),
+                    teacher_period2=rng.choice(teacher_list)
+                ))
+        Student.objects.bulk_create(student_rows, batch_size=batch_size)
+
+        User.objects.bulk_create([
+            User(
+                username=student.hcpss_email.split('@')[0], email=student.hcpss_email,
+                first_name=student.name.split()[0], last_name=student.name.split()[-1],
+                password=password_hash, role=User.Role.STUDENT
+            )
+            for student in student_rows[:student_accounts]
+        ], batch_size=batch_size)
+
+        Announcement.objects.bulk_create([
+            Announcement(
+                title=rng.choice(ANNOUNCEMENT_TITLES),
+                body=f'Announcement {i} for my students. ' * rng.randint(1, 8),
+                teacher=rng.choice(teacher_list)
+            )
+            for i in range(announcements)
+        ], batch_size=batch_size)
+
+        Notification.objects.bulk_create([
+            Notification(message=f'{SEED_MARKER}School notice {i}')
+            for i in range(notifications)
+        ], batch_size=batch_size)
+
+        reconcile_enrollment(ClassPeriod.objects.filter(teacher__email__endswith=f'@{SEED_DOMAIN}'))
+
+    return {
+        'teachers': teachers,
+        'class periods': teachers * len(PERIODS),
+        'students': len(student_rows),
+        'student accounts': min(student_accounts, len(student_rows)),
+        'announcements': announcements,
+        'notifications': notifications,
+    }
+
+
+def clear_school():
+    """Delete everything seed_school() created. Returns the rows deleted."""
+    with transaction.atomic():
+        # Teachers first: cascades to their class periods and announcements,
+        # so the per-student delete signals have no counts left to fix
+        deleted = User.objects.filter(email__endswith=f'@{SEED_DOMAIN}').delete()[0]
+        deleted += Student.objects.filter(hcpss_email__endswith=f'@{SEED_DOMAIN}').delete()[0]
+        deleted += Notification.objects.filter(message__startswith=SEED_MARKER).delete()[0]
+    return deleted
@@ -26,7 +26,7 @@ content types. It provides:
 
 4. Features:
    - Calculated fields (e.g., available_seats)
-   - Conditional field inclusion
+   - Conditional field inclusion (sparse fieldsets, see DynamicFieldsMixin)
    - Related object handling
    - Many-to-many relationship support
 
@@ -42,12 +42,57 @@ from .models import Student, Announcement, Notification, ClassPeriod
 
 User = get_user_model()
 
+class DynamicFieldsMixin:
+    """
+    Lets a request trim a serializer to the fields it actually uses.
+
+        StudentSerializer(students, many=True, fields=['id', 'name'])
+        StudentSerializer(student, fields=['id', 'teacher'], expand=['teacher'])
+
+    With no fields or expand given the serializer is unchanged. Once
+    either is given, nested objects are only rendered in full when named
+    in expand; otherwise they collapse to their primary key, which needs
+    no join. Pass the same instance to optimize_queryset() so the query
+    is narrowed to match.
+    """
+    
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None and expand is None:
+            return
+        
+        fields = set(fields) if fields is not None else set(self.fields)
+        expand = set(expand or ())
+        unknown = (fields | expand) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                {'fields': f"Unknown field(s): {', '.join(sorted(unknown))}"}
+            )
+        not_nested = {
+            name for name in expand
+            if not isinstance(self.fields[name], serializers.BaseSerializer)
+        }
+        if not_nested:
+            raise serializers.ValidationError(
+                {'expand': f"Can't expand: {', '.join(sorted(not_nested))}"}
+            )
+        
+        for name in list(self.fields):
+            field = self.fields[name]
+            if name not in fields | expand:
+                self.fields.pop(name)
+            elif isinstance(field, serializers.BaseSerializer) and name not in expand:
+                options = {'source': field.source} if field.source != name else {}
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True, **options
+                )
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'first_name', 'last_name', 'email')
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     teacher = UserSerializer(read_only=True)
     teacher_period2 = UserSerializer(read_only=True)
     
@@ -59,7 +104,7 @@ class StudentSerializer(serializers.ModelSerializer):
             'theme', 'temp_teacher'
         )
 
-class ClassPeriodSerializer(serializers.ModelSerializer):
+class ClassPeriodSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     teacher = UserSerializer(read_only=True)
     available_seats = serializers.SerializerMethodField()
     
@@ -69,11 +114,15 @@ class ClassPeriodSerializer(serializers.ModelSerializer):
             'id', 'period', 'teacher', 'room_number', 'subject',
             'capacity', 'current_enrollment', 'available_seats'
         )
+        # Columns read by method fields, used by query_planner.py
+        method_field_dependencies = {
+            'available_seats': ('capacity', 'current_enrollment'),
+        }
         
     def get_available_seats(self, obj):
         return obj.capacity - obj.current_enrollment
 
-class AnnouncementSerializer(serializers.ModelSerializer):
+class AnnouncementSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     teacher = UserSerializer(read_only=True)
     
     class Meta:
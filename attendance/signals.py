@@ -0,0 +1,128 @@
+"""
+Signals
+
+Model signal receivers for the attendance app. Connected when the app
+is ready (see apps.py).
+
+1. Announcement Cache:
+   - Invalidates the cached feed and the teacher's list whenever an
+     announcement is created, edited or deleted
+   - Captures the previous teacher on edit so reassigning an
+     announcement clears both teachers' lists
+
+2. Real-Time Push:
+   - Publishes seat-count changes from reservations.py
+   - Publishes new announcements once their transaction commits
+
+3. Enrollment Counts:
+   - Recomputes the second period counts a student leaves and joins
+     when their teacher_period2 changes
+   - Recomputes the periods a deleted student was counted in, since
+     their reservations are removed by cascade without release_seat()
+   - Counts a new class period's existing roster
+   - Promotes waiting students when a saved class period has free
+     seats (e.g. its capacity was raised)
+
+Related:
+   - cache.py: Announcement cache
+   - broker.py: Push broker
+   - enrollment.py: Enrollment recomputation
+"""
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .broker import get_broker
+from .cache import invalidate_announcements
+from .enrollment import reconcile_enrollment, reconcile_teachers
+from .models import Announcement, ClassPeriod, Student
+from .reservations import fill_from_waitlists, seat_count_changed
+from .serializers import AnnouncementSerializer
+
+
+@receiver(pre_save, sender=Announcement)
+def remember_previous_teacher(sender, instance, **kwargs):
+    instance._previous_teacher_id = None
+    if instance.pk:
+        instance._previous_teacher_id = sender.objects.filter(
+            pk=instance.pk
+        ).values_list('teacher_id', flat=True).first()
+
+
+@receiver(post_save, sender=Announcement)
+def announcement_saved(sender, instance, created, **kwargs):
+    teacher_ids = [instance.teacher_id]
+    previous = getattr(instance, '_previous_teacher_id', None)
+    if previous is not None:
+        teacher_ids.append(previous)
+    invalidate_announcements(*teacher_ids)
+
+    if created:
+        transaction.on_commit(lambda: publish_announcement(instance))
+
+
+def publish_announcement(announcement):
+    broker = get_broker()
+    # Skip serializing when nobody is listening
+    if broker.subscriber_count:
+        broker.publish('announcements', AnnouncementSerializer(announcement).data)
+
+
+@receiver(post_delete, sender=Announcement)
+def announcement_deleted(sender, instance, **kwargs):
+    invalidate_announcements(instance.teacher_id)
+
+
+@receiver(seat_count_changed)
+def publish_seat_count(sender, class_period_id, current_enrollment, capacity, **kwargs):
+    get_broker().publish('seats', {
+        'class_period_id': class_period_id,
+        'current_enrollment': current_enrollment,
+        'capacity': capacity,
+        'available_seats': capacity - current_enrollment,
+    })
+
+
+@receiver(pre_save, sender=Student)
+def remember_previous_period2_teacher(sender, instance, **kwargs):
+    instance._previous_teacher_period2_id = None
+    if instance.pk:
+        instance._previous_teacher_period2_id = sender.objects.filter(
+            pk=instance.pk
+        ).values_list('teacher_period2_id', flat=True).first()
+
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_teacher_period2_id', None)
+    if previous != instance.teacher_period2_id:
+        reconcile_teachers(previous, instance.teacher_period2_id)
+
+
+@receiver(pre_delete, sender=Student)
+def remember_reserved_periods(sender, instance, **kwargs):
+    instance._reserved_class_period_ids = list(
+        instance.reservations.values_list('class_period_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    reserved = getattr(instance, '_reserved_class_period_ids', [])
+    if not reserved and instance.teacher_period2_id is None:
+        # Counted nowhere; skip building the recount (bulk deletes)
+        return
+    affected = Q(pk__in=reserved)
+    if instance.teacher_period2_id is not None:
+        affected |= Q(period=ClassPeriod.ROSTER_PERIOD, teacher_id=instance.teacher_period2_id)
+    reconcile_enrollment(ClassPeriod.objects.filter(affected))
+
+
+@receiver(post_save, sender=ClassPeriod)
+def class_period_saved(sender, instance, created, **kwargs):
+    if created and instance.period == ClassPeriod.ROSTER_PERIOD:
+        reconcile_enrollment(ClassPeriod.objects.filter(pk=instance.pk))
+    elif not created and instance.current_enrollment < instance.capacity:
+        fill_from_waitlists(ClassPeriod.objects.filter(pk=instance.pk))
@@ -0,0 +1,158 @@
+import importlib.util
+import json
+from unittest import skipUnless
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase, TransactionTestCase, AsyncRequestFactory
+from django.urls import reverse
+from rest_framework.test import APIClient
+from attendance import async_views, views
+from attendance.models import Student, Announcement, ClassPeriod
+
+User = get_user_model()
+
+def make_request(path, user, method='get', headers=None):
+    """Build an async request the way AuthenticationMiddleware would"""
+    request = getattr(AsyncRequestFactory(), method)(path, headers=headers)
+
+    async def auser():
+        return user
+    request.auser = auser
+    request.user = user
+    return request
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='asyncuser',
+            email='asyncuser@inst.hcpss.org',
+            password='testpass123'
+        )
+        self.teacher = User.objects.create_user(
+            username='asyncteacher',
+            email='asyncteacher@inst.hcpss.org',
+            first_name='Async',
+            password='testpass123'
+        )
+        self.student = Student.objects.create(
+            name='Async Student', grade=10, hcpss_email='async@inst.hcpss.org',
+            teacher=self.teacher, teacher_period2=self.teacher
+        )
+        self.room = ClassPeriod.objects.create(
+            teacher=self.teacher, period='2', room_number='F1', subject='Physics'
+        )
+        Announcement.objects.create(title='Async', body='Body', teacher=self.teacher)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    async def _get(self, view, path, *args, user=None, headers=None):
+        request = make_request(path, user or self.user, headers=headers)
+        return await view(request, *args)
+
+    async def test_same_body_as_sync_views(self):
+        """Test each async view returns exactly what its sync twin does"""
+        detail = reverse('attendance:student_detail_api', kwargs={'student_id': self.student.id})
+        room = reverse('attendance:class_period_detail_api', kwargs={'class_id': self.room.id})
+        cases = [
+            (async_views.student_list, reverse('attendance:student_list_api') + '?fields=id,name', ()),
+            (async_views.student_list, reverse('attendance:student_list_api') + '?search=async', ()),
+            (async_views.student_detail, detail, (self.student.id,)),
+            (async_views.announcement_list, reverse('attendance:announcement_list_api'), ()),
+            (async_views.class_period_list, reverse('attendance:class_period_list_api') + '?cursor=', ()),
+            (async_views.class_period_detail, room, (self.room.id,)),
+        ]
+        for view, path, args in cases:
+            with self.subTest(path=path):
+                response = await self._get(view, path, *args)
+                expected = await sync_to_async(self.client.get)(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(json.loads(response.content), expected.json())
+
+    async def test_conditional_get(self):
+        """Test async views send ETags and honour If-None-Match"""
+        path = reverse('attendance:announcement_list_api')
+        response = await self._get(async_views.announcement_list, path)
+        etag = response['ETag']
+
+        response = await self._get(
+            async_views.announcement_list, path, headers={'If-None-Match': etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_errors(self):
+        """Test auth, method, 404 and validation errors match the sync views"""
+        path = reverse('attendance:student_list_api')
+        response = await self._get(async_views.student_list, path, user=AnonymousUser())
+        self.assertEqual(response.status_code, 403)
+
+        request = make_request(path, self.user, method='post')
+        self.assertEqual((await async_views.student_list(request)).status_code, 405)
+
+        response = await self._get(async_views.student_detail, '/api/students/999999/', 999999)
+        self.assertEqual(response.status_code, 404)
+
+        response = await self._get(async_views.student_list, path + '?cursor=bogus')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cursor', json.loads(response.content))
+
+    async def test_content_negotiation(self):
+        """Test async views render with the renderer DRF negotiates"""
+        path = reverse('attendance:announcement_list_api')
+        response = await self._get(
+            async_views.announcement_list, path, headers={'Accept': 'application/json'}
+        )
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('Accept', response['Vary'])
+
+        response = await self._get(
+            async_views.announcement_list, path, headers={'Accept': 'text/html'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+
+        response = await self._get(
+            async_views.announcement_list, path, headers={'Accept': 'application/xml'}
+        )
+        self.assertEqual(response.status_code, 406)
+
+    @skipUnless(importlib.util.find_spec('msgpack'), 'msgpack is not installed')
+    async def test_msgpack(self):
+        """Test MessagePack is served when it is a configured renderer"""
+        import msgpack
+        renderers = {**settings.REST_FRAMEWORK, 'DEFAULT_RENDERER_CLASSES': [
+            'backend.renderers.FastJSONRenderer',
+            'backend.renderers.MessagePackRenderer',
+        ]}
+        path = reverse('attendance:announcement_list_api')
+        with self.settings(REST_FRAMEWORK=renderers):
+            response = await self._get(
+                async_views.announcement_list, path,
+                headers={'Accept': 'application/msgpack'}
+            )
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertIn('results', msgpack.unpackb(response.content))
+
+    def test_sync_twin(self):
+        """Test async views point at their sync twin for the batch endpoint"""
+        self.assertIs(async_views.student_list.sync_view, views.student_list)
+        self.assertIs(async_views.student_detail.sync_view, views.student_detail)
+
+class ConcurrentQueryTests(TransactionTestCase):
+    def test_student_detail_queries_run_concurrently(self):
+        """Test student_detail outside a transaction loads both halves on worker threads"""
+        teacher = User.objects.create_user(
+            username='concurrentteacher', email='concurrentteacher@inst.hcpss.org'
+        )
+        student = Student.objects.create(
+            name='Concurrent Student', grade=9,
+            hcpss_email='concurrent@inst.hcpss.org', teacher=teacher
+        )
+        Announcement.objects.create(title='Parallel', body='Body', teacher=teacher)
+
+        request = make_request(f'/api/students/{student.id}/', teacher)
+        response = async_to_sync(async_views.student_detail)(request, student.id)
+        body = json.loads(response.content)
+        self.assertEqual(body['student']['name'], 'Concurrent Student')
+        self.assertEqual(body['announcements'][0]['title'], 'Parallel')
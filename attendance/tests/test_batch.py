@@ -0,0 +1,76 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from attendance.models import Student, Announcement, ClassPeriod
+
+User = get_user_model()
+
+class BatchAPITests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='batchuser',
+            email='batchuser@inst.hcpss.org',
+            password='testpass123',
+            role=User.Role.TEACHER
+        )
+        self.student = Student.objects.create(
+            name='Batch Student', grade=9,
+            hcpss_email='batch@inst.hcpss.org', teacher=self.user
+        )
+        ClassPeriod.objects.create(
+            teacher=self.user, period='RT', room_number='D4', subject='Robotics'
+        )
+        Announcement.objects.create(title='Batched', body='Body', teacher=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('attendance:batch_api')
+
+    def test_batch_returns_results_in_order(self):
+        """Test the teacher home page reads collapse into one request"""
+        response = self.client.post(self.url, {'requests': [
+            {'path': '/api/class-periods/?available=true'},
+            {'path': '/api/students/?grade=9'},
+            {'path': '/api/announcements/'},
+            {'path': f'/api/students/{self.student.id}/'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        class_periods, students, announcements, detail = response.data['responses']
+        self.assertEqual(class_periods['body']['results'][0]['room_number'], 'D4')
+        self.assertEqual(students['body']['results'][0]['name'], 'Batch Student')
+        self.assertEqual(announcements['body']['results'][0]['title'], 'Batched')
+        self.assertEqual(detail['body']['student']['id'], self.student.id)
+        self.assertIn('etag', detail)
+
+    def test_rejected_sub_requests(self):
+        """Test writes, unknown paths, streaming endpoints and malformed entries are refused per entry"""
+        response = self.client.post(self.url, {'requests': [
+            {'path': '/api/class-periods/1/reservation/', 'method': 'POST'},
+            {'path': '/api/nowhere/'},
+            {'path': '/api/students/export/'},
+            {'path': '/admin/'},
+            {'path': '/api/students/999999/'},
+            {'path': '/api/announcements/', 'method': None},
+            {'path': '/api/announcements/', 'method': 1},
+            {'path': None},
+            'not an object',
+        ]}, format='json')
+        statuses = [r['status'] for r in response.data['responses']]
+        self.assertEqual(statuses, [405, 404, 400, 400, 404, 400, 400, 400, 400])
+
+    def test_batch_size_limit(self):
+        """Test oversized and malformed batches are rejected"""
+        response = self.client.post(self.url, {'requests': [
+            {'path': '/api/announcements/'}
+        ] * 21}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.url, {'requests': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        """Test the batch itself needs an authenticated session"""
+        response = APIClient().post(self.url, {'requests': []}, format='json')
+        self.assertIn(response.status_code, (401, 403))
@@ -3,7 +3,10 @@ from django.core.management import call_command
 from django.core.management.base import CommandError
 from io import StringIO
 import os
-from attendance.models import Student
+from django.contrib.auth import get_user_model
+from attendance.models import Student, ClassPeriod, Announcement, Notification
+
+User = get_user_model()
 
 class ImportLegacyDataTest(TestCase):
     def setUp(self):
@@ -41,3 +44,64 @@ class ImportLegacyDataTest(TestCase):
         out = StringIO()
         call_command('import_legacy_data', 'nonexistent.sql', stderr=out)
         self.assertIn('File not found', out.getvalue())
+
+class SeedSchoolTest(TestCase):
+    def seed(self, *args):
+        call_command(
+            'seed_school', '--teachers', '10', '--students-per-grade', '5',
+            '--announcements', '7', '--notifications', '3', *args, stdout=StringIO()
+        )
+
+    def test_builds_school(self):
+        """Test seed_school creates every period for every teacher and counts period 2"""
+        self.seed('--student-accounts', '2')
+        self.assertEqual(User.objects.filter(role='TEACHER').count(), 10)
+        self.assertEqual(ClassPeriod.objects.count(), 50)
+        self.assertEqual(
+            set(ClassPeriod.objects.values_list('period', flat=True)),
+            {'1', '2', 'RT', '3', '4'}
+        )
+        self.assertEqual(Student.objects.count(), 20)
+        self.assertEqual(
+            sorted(Student.objects.values_list('grade', flat=True).distinct()), [9, 10, 11, 12]
+        )
+        self.assertEqual(User.objects.filter(role='STUDENT').count(), 2)
+        self.assertEqual(Announcement.objects.count(), 7)
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(
+            sum(ClassPeriod.objects.filter(period='2').values_list('current_enrollment', flat=True)),
+            20
+        )
+
+    def test_same_seed_same_school(self):
+        """Test the same seed builds the same students and rooms"""
+        def snapshot():
+            return (
+                list(Student.objects.order_by('hcpss_email').values_list(
+                    'name', 'grade', 'hcpss_email', 'teacher__username'
+                )),
+                list(ClassPeriod.objects.order_by('teacher__username', 'period').values_list(
+                    'teacher__username', 'period', 'subject', 'capacity'
+                )),
+            )
+
+        self.seed('--seed', '7')
+        first = snapshot()
+        self.seed('--seed', '7', '--flush')
+        self.assertEqual(snapshot(), first)
+        self.seed('--seed', '8', '--flush')
+        self.assertNotEqual(snapshot(), first)
+
+    def test_flush_keeps_real_data(self):
+        """Test --flush only removes seeded rows"""
+        teacher = User.objects.create_user(
+            username='real.teacher', email='real.teacher@inst.hcpss.org', password='pw'
+        )
+        Student.objects.create(name='Real Student', grade=9, hcpss_email='real@inst.hcpss.org')
+        Notification.objects.create(message='Real notice')
+        self.seed()
+        self.seed('--flush', '--teachers', '0', '--students-per-grade', '0',
+                  '--announcements', '0', '--notifications', '0')
+        self.assertEqual(list(User.objects.all()), [teacher])
+        self.assertEqual(Student.objects.get().name, 'Real Student')
+        self.assertEqual(Notification.objects.get().message, 'Real notice')
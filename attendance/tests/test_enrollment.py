@@ -0,0 +1,130 @@
+import csv
+import os
+import tempfile
+from io import StringIO
+from django.test import TestCase
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from attendance.models import Student, ClassPeriod, Reservation
+from attendance.enrollment import reconcile_enrollment
+from attendance.reservations import reserve_seat, RosterManaged
+from attendance.waitlist import join_waitlist
+
+User = get_user_model()
+
+class EnrollmentReconciliationTests(TestCase):
+    def setUp(self):
+        self.teachers = [
+            User.objects.create_user(
+                username=f'enrollteacher{i}',
+                email=f'enrollteacher{i}@inst.hcpss.org',
+                role=User.Role.TEACHER
+            )
+            for i in range(3)
+        ]
+        self.periods = [
+            ClassPeriod.objects.create(
+                teacher=teacher, period='2', room_number=f'G{i}', subject='English'
+            )
+            for i, teacher in enumerate(self.teachers)
+        ]
+        self.rt_room = ClassPeriod.objects.create(
+            teacher=self.teachers[0], period='RT', room_number='G0', subject='Study Hall'
+        )
+        self.students = [
+            Student.objects.create(
+                name=f'Enroll Student {i}', grade=10,
+                hcpss_email=f'enroll{i}@inst.hcpss.org',
+                teacher_period2=self.teachers[i % 2]
+            )
+            for i in range(5)
+        ]
+
+    def _counts(self):
+        return {
+            cp.room_number + cp.period: cp.current_enrollment
+            for cp in ClassPeriod.objects.all()
+        }
+
+    def test_signals_keep_counts_current(self):
+        """Test roster changes and deletes recount the periods involved"""
+        reserve_seat(self.students[0], self.rt_room.id)
+        self.assertEqual(self._counts(), {'G02': 3, 'G12': 2, 'G22': 0, 'G0RT': 1})
+
+        student = self.students[0]
+        student.teacher_period2 = self.teachers[2]
+        student.save()
+        self.assertEqual(self._counts(), {'G02': 2, 'G12': 2, 'G22': 1, 'G0RT': 1})
+
+        student.delete()
+        self.assertEqual(self._counts(), {'G02': 2, 'G12': 2, 'G22': 0, 'G0RT': 0})
+
+    def test_roster_period_not_reservable(self):
+        """Test second period seats can't be reserved, so nobody counts twice"""
+        own_room, other_room = self.periods[0], self.periods[2]
+        for class_period in (own_room, other_room):
+            with self.assertRaises(RosterManaged):
+                reserve_seat(self.students[0], class_period.id)
+            with self.assertRaises(RosterManaged):
+                join_waitlist(self.students[0], class_period.id)
+        self.assertEqual(self._counts(), {'G02': 3, 'G12': 2, 'G22': 0, 'G0RT': 0})
+
+        # Rows from before the check still don't count
+        Reservation.objects.create(student=self.students[0], class_period=own_room, period='2')
+        reconcile_enrollment()
+        self.assertEqual(self._counts(), {'G02': 3, 'G12': 2, 'G22': 0, 'G0RT': 0})
+
+    def test_reconcile_fixes_drift_in_one_statement(self):
+        """Test every period is recounted by one UPDATE, touching only wrong rows"""
+        reserve_seat(self.students[1], self.rt_room.id)
+        ClassPeriod.objects.update(current_enrollment=17)
+        untouched = ClassPeriod.objects.get(pk=self.periods[2].pk)
+        untouched.current_enrollment = 0
+        untouched.save()
+        before = ClassPeriod.objects.get(pk=untouched.pk).updated_at
+
+        with CaptureQueriesContext(connection) as queries:
+            corrected = reconcile_enrollment()
+        # Plus the check for waiting students to promote
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE')]), 1)
+        self.assertEqual(corrected, 3)
+        self.assertEqual(self._counts(), {'G02': 3, 'G12': 2, 'G22': 0, 'G0RT': 1})
+        self.assertEqual(ClassPeriod.objects.get(pk=untouched.pk).updated_at, before)
+
+    def test_command(self):
+        """Test reconcile_enrollment reports what it corrected"""
+        ClassPeriod.objects.update(current_enrollment=0)
+        out = StringIO()
+        call_command('reconcile_enrollment', stdout=out)
+        self.assertIn('Corrected 2 of 4 class periods', out.getvalue())
+
+        out = StringIO()
+        call_command('reconcile_enrollment', '--period', 'RT', stdout=out)
+        self.assertIn('Corrected 0 of 1 class periods', out.getvalue())
+
+class ImportPeriod2EnrollmentTest(TestCase):
+    def setUp(self):
+        handle, self.csv_file = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=[
+                'Teacher', 'Room Number', 'Class/Subject Name', 'Class ID',
+                'Last Name, First Time Middle I.', 'Grade'
+            ])
+            writer.writeheader()
+            for i in range(3):
+                writer.writerow({
+                    'Teacher': 'Moore, Jane', 'Room Number': 'H1',
+                    'Class/Subject Name': 'Biology', 'Class ID': '42',
+                    'Last Name, First Time Middle I.': f'Doe{i}, Sam A.', 'Grade': '11',
+                })
+        self.addCleanup(os.remove, self.csv_file)
+
+    def test_import_counts_roster_once(self):
+        """Test the import sets enrollment from the roster, even when rerun"""
+        call_command('import_period2_data', self.csv_file, stdout=StringIO())
+        call_command('import_period2_data', self.csv_file, stdout=StringIO())
+
+        class_period = ClassPeriod.objects.get(room_number='H1', period='2')
+        self.assertEqual(class_period.current_enrollment, 3)
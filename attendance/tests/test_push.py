@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from unittest import mock
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from attendance.broker import InProcessBroker, get_broker
+from attendance.models import ClassPeriod, Student, Announcement
+from attendance.reservations import reserve_seat
+
+User = get_user_model()
+
+class InProcessBrokerTests(TestCase):
+    async def test_fan_out_to_matching_topics(self):
+        """Test one publish reaches every subscriber of the topic"""
+        broker = InProcessBroker()
+        seats_a = broker.subscribe({'seats'})
+        seats_b = broker.subscribe({'seats', 'announcements'})
+        news = broker.subscribe({'announcements'})
+
+        # Publishing from another thread, like a WSGI request or signal would
+        thread = threading.Thread(target=broker.publish, args=('seats', {'id': 1}))
+        thread.start()
+        thread.join()
+
+        frame_a = await asyncio.wait_for(seats_a.queue.get(), 1)
+        frame_b = await asyncio.wait_for(seats_b.queue.get(), 1)
+        self.assertIs(frame_a, frame_b)  # Encoded once, shared by all clients
+        self.assertIn(b'event: seats\n', frame_a)
+        self.assertTrue(news.queue.empty())
+
+    async def test_slow_subscriber_is_dropped(self):
+        """Test a full queue ends the stream instead of growing"""
+        broker = InProcessBroker(max_queue=2)
+        subscription = broker.subscribe({'seats'})
+        for i in range(3):
+            broker.publish('seats', {'id': i})
+        await asyncio.sleep(0)
+
+        self.assertIsNone(await subscription.queue.get())
+
+
+class EventStreamTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            username='streamteacher',
+            email='streamteacher@inst.hcpss.org',
+            role=User.Role.TEACHER
+        )
+        self.room = ClassPeriod.objects.create(
+            teacher=self.teacher, period='RT', room_number='C3',
+            subject='Chess', capacity=10
+        )
+        self.student = Student.objects.create(
+            name='Stream Student', grade=12, hcpss_email='stream@inst.hcpss.org'
+        )
+
+    def test_requires_authentication(self):
+        """Test anonymous clients can't subscribe"""
+        response = self.client.get(reverse('attendance:event_stream_api'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_refused_under_wsgi(self):
+        """Test a WSGI request gets 501 and the URLs to poll, not a stuck worker"""
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse('attendance:event_stream_api'))
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual(
+            response.json()['poll']['seats'], reverse('attendance:class_period_list_api')
+        )
+
+    async def test_streams_under_asgi(self):
+        """Test an ASGI request gets the event stream"""
+        client = AsyncClient()
+        await client.aforce_login(self.teacher)
+        response = await client.get(reverse('attendance:event_stream_api'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = aiter(response.streaming_content)
+        self.assertEqual(await anext(content), b'retry: 5000\n\n')
+        await content.aclose()
+
+    def test_signals_publish_events(self):
+        """Test reservations and new announcements reach the broker"""
+        broker = get_broker()
+        # Pretend a client is connected so announcements get serialized
+        with mock.patch.object(broker, 'publish') as publish, \
+                mock.patch.object(InProcessBroker, 'subscriber_count', 1):
+            with self.captureOnCommitCallbacks(execute=True):
+                reserve_seat(self.student, self.room.id)
+                Announcement.objects.create(title='Live', body='Body', teacher=self.teacher)
+
+        (seats_topic, seats), (news_topic, news) = [c.args for c in publish.call_args_list]
+        self.assertEqual(seats_topic, 'seats')
+        self.assertEqual(seats['available_seats'], 9)
+        self.assertEqual(news_topic, 'announcements')
+        self.assertEqual(news['title'], 'Live')
@@ -0,0 +1,130 @@
+"""
+Query Plan Tests
+
+Runs EXPLAIN on the list endpoints' hot queries against a seeded school
+and fails if any of them reads a whole table instead of using an index
+(e.g. after an index is dropped or a filter stops matching one).
+
+Works on SQLite ("SCAN <table>" without an index) and PostgreSQL
+("Seq Scan on <table>"). Statistics are refreshed with ANALYZE after
+seeding so the planner sees realistic table sizes.
+"""
+
+import re
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from attendance.models import Student, ClassPeriod, Announcement, WaitlistEntry
+from attendance.reservations import WAITLIST_ORDERING
+from attendance.seeding import seed_school
+from attendance.views import (
+    filter_students, filter_class_periods,
+    STUDENT_ORDERING, CLASS_PERIOD_ORDERING, ANNOUNCEMENT_ORDERING
+)
+
+FULL_SCAN_PATTERNS = {
+    'sqlite': r'\bSCAN (?:TABLE )?"?{table}"?(?! USING)',
+    'postgresql': r'Seq Scan on "?{table}"?\b',
+}
+
+
+def explain(queryset):
+    """The database's plan for ``queryset``, as text"""
+    return queryset.explain()
+
+
+def full_scans(plan, tables):
+    """Tables in ``tables`` that ``plan`` reads without an index"""
+    pattern = FULL_SCAN_PATTERNS[connection.vendor]
+    return [
+        table for table in tables
+        if re.search(pattern.format(table=re.escape(table)), plan)
+    ]
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        if connection.vendor not in FULL_SCAN_PATTERNS:
+            return
+        seed_school(teachers=150, students_per_grade=500, announcements=1500, seed=1)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        cls.teacher_id = ClassPeriod.objects.values_list('teacher_id', flat=True).first()
+
+    def setUp(self):
+        if connection.vendor not in FULL_SCAN_PATTERNS:
+            self.skipTest(f'No plan parser for {connection.vendor}')
+        self.factory = RequestFactory()
+
+    def assertUsesIndexes(self, queryset, *models):
+        """Assert ``queryset`` doesn't read any of ``models``' tables in full"""
+        plan = explain(queryset)
+        scanned = full_scans(plan, [model._meta.db_table for model in models])
+        self.assertEqual(scanned, [], f'Full table scan in plan:\n{plan}\n\nfor:\n{queryset.query}')
+
+    def students(self, **params):
+        request = self.factory.get('/api/students/', params)
+        return filter_students(request, Student.objects.all()).order_by(*STUDENT_ORDERING)[:25]
+
+    def class_periods(self, **params):
+        request = self.factory.get('/api/class-periods/', params)
+        return filter_class_periods(
+            request, ClassPeriod.objects.all()
+        ).order_by(*CLASS_PERIOD_ORDERING)[:25]
+
+    def test_student_list_filters(self):
+        """Test student_list's grade and teacher filters use an index"""
+        for params in [{'grade': 10}, {'teacher': self.teacher_id},
+                       {'grade': 11, 'teacher': self.teacher_id}]:
+            with self.subTest(**params):
+                self.assertUsesIndexes(self.students(**params), Student)
+
+    def test_student_search(self):
+        """Test ?search= uses the trigram indexes (PostgreSQL only)"""
+        if connection.vendor != 'postgresql':
+            self.skipTest("SQLite can't index LIKE '%term%'")
+        email = Student.objects.values_list('hcpss_email', flat=True).first()
+        term = email.split('@')[0]
+        for ranked in (True, False):
+            with self.subTest(ranked=ranked):
+                request = self.factory.get('/api/students/', {'search': term})
+                self.assertUsesIndexes(
+                    filter_students(request, Student.objects.all(), ranked=ranked)[:25], Student
+                )
+
+    def test_period2_roster(self):
+        """Test class_period_detail's roster lookup uses an index"""
+        self.assertUsesIndexes(
+            Student.objects.filter(teacher_period2_id=self.teacher_id), Student
+        )
+
+    def test_class_period_list(self):
+        """Test class_period_list's ordering and filters use an index"""
+        for params in [{}, {'period': 'RT'}, {'teacher': self.teacher_id},
+                       {'available': 'true'}, {'period': '2', 'available': 'true'}]:
+            with self.subTest(**params):
+                self.assertUsesIndexes(self.class_periods(**params), ClassPeriod)
+
+    def test_announcement_feed(self):
+        """Test announcement_list's newest-first page and version use an index"""
+        self.assertUsesIndexes(
+            Announcement.objects.order_by(*ANNOUNCEMENT_ORDERING)[:10], Announcement
+        )
+        self.assertUsesIndexes(
+            Announcement.objects.order_by('-timestamp').values('timestamp')[:1], Announcement
+        )
+
+    def test_waitlist_head(self):
+        """Test promotion's head-of-line lookup uses the waitlist index"""
+        class_period_id = ClassPeriod.objects.values_list('pk', flat=True).first()
+        self.assertUsesIndexes(
+            WaitlistEntry.objects.filter(
+                class_period_id=class_period_id
+            ).order_by(*WAITLIST_ORDERING)[:1],
+            WaitlistEntry
+        )
+
+    def test_detects_full_scan(self):
+        """Test the checker itself flags an unindexed filter"""
+        plan = explain(Student.objects.filter(phone_num='4105550100'))
+        self.assertEqual(full_scans(plan, ['students']), ['students'])
@@ -0,0 +1,357 @@
+import threading
+from unittest import mock
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from attendance import admission
+from attendance.admission import AdmissionQueue, Overloaded
+from attendance.models import Student, ClassPeriod, Reservation, WaitlistEntry
+from attendance.reservations import (
+    reserve_seat, release_seat, seat_count_changed,
+    PeriodFull, AlreadyReserved, NotReserved
+)
+from attendance.waitlist import (
+    join_waitlist, leave_waitlist, waitlist_position,
+    SeatsAvailable, AlreadyWaiting, NotWaiting
+)
+
+User = get_user_model()
+
+class ReservationServiceTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            username='rtteacher',
+            email='rtteacher@inst.hcpss.org',
+            role=User.Role.TEACHER
+        )
+        self.other_teacher = User.objects.create_user(
+            username='rtteacher2',
+            email='rtteacher2@inst.hcpss.org',
+            role=User.Role.TEACHER
+        )
+        self.room = ClassPeriod.objects.create(
+            teacher=self.teacher, period='RT', room_number='A1',
+            subject='Study Hall', capacity=2
+        )
+        self.other_room = ClassPeriod.objects.create(
+            teacher=self.other_teacher, period='RT', room_number='A2',
+            subject='Math Help', capacity=2
+        )
+        self.students = [
+            Student.objects.create(
+                name=f'RT Student {i}', grade=10,
+                hcpss_email=f'rt{i}@inst.hcpss.org'
+            )
+            for i in range(3)
+        ]
+
+    def test_never_oversells(self):
+        """Test the last seat can only be claimed once"""
+        reserve_seat(self.students[0], self.room.id)
+        reserve_seat(self.students[1], self.room.id)
+        with self.assertRaises(PeriodFull):
+            reserve_seat(self.students[2], self.room.id)
+
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.current_enrollment, 2)
+        self.assertEqual(Reservation.objects.filter(class_period=self.room).count(), 2)
+
+    def test_one_seat_per_period(self):
+        """Test double booking rolls back the claimed seat"""
+        reserve_seat(self.students[0], self.room.id)
+        with self.assertRaises(AlreadyReserved):
+            reserve_seat(self.students[0], self.other_room.id)
+
+        self.other_room.refresh_from_db()
+        self.assertEqual(self.other_room.current_enrollment, 0)
+
+    def test_release(self):
+        """Test releasing frees the seat and rejects unknown reservations"""
+        reserve_seat(self.students[0], self.room.id)
+        self.assertEqual(release_seat(self.students[0], self.room.id), 0)
+        with self.assertRaises(NotReserved):
+            release_seat(self.students[0], self.room.id)
+
+    def test_signal_sent_on_commit(self):
+        """Test seat_count_changed fires once the transaction commits"""
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs)
+
+        seat_count_changed.connect(receiver)
+        self.addCleanup(seat_count_changed.disconnect, receiver)
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_seat(self.students[0], self.room.id)
+
+        self.assertEqual(received[0]['class_period_id'], self.room.id)
+        self.assertEqual(received[0]['current_enrollment'], 1)
+        self.assertEqual(received[0]['capacity'], 2)
+
+
+class ReservationAPITests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            username='apiteacher',
+            email='apiteacher@inst.hcpss.org',
+            role=User.Role.TEACHER
+        )
+        self.student_user = User.objects.create_user(
+            username='apistudent',
+            email='apistudent@inst.hcpss.org',
+            role=User.Role.STUDENT,
+            student_id='123456'
+        )
+        self.student = Student.objects.create(
+            name='API Student', grade=11, hcpss_email='apistudent@inst.hcpss.org'
+        )
+        self.room = ClassPeriod.objects.create(
+            teacher=self.teacher, period='RT', room_number='B1',
+            subject='Art', capacity=1
+        )
+        self.url = reverse(
+            'attendance:class_period_reservation_api', kwargs={'class_id': self.room.id}
+        )
+        self.client = APIClient()
+
+    def test_student_reserves_own_seat(self):
+        """Test students reserve for themselves and get a 409 when full"""
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['available_seats'], 0)
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['available_seats'], 1)
+
+    def test_teacher_reserves_for_student(self):
+        """Test teachers must name the student they reserve for"""
+        self.client.force_authenticate(user=self.teacher)
+        self.assertEqual(
+            self.client.post(self.url).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        response = self.client.post(self.url, {'student_id': self.student.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['student_id'], self.student.id)
+
+    def test_unknown_class_period(self):
+        """Test reserving a missing class period returns 404"""
+        self.client.force_authenticate(user=self.student_user)
+        url = reverse('attendance:class_period_reservation_api', kwargs={'class_id': 999999})
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class WaitlistTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            username='wlteacher',
+            email='wlteacher@inst.hcpss.org',
+            role=User.Role.TEACHER
+        )
+        self.other_teacher = User.objects.create_user(
+            username='wlteacher2',
+            email='wlteacher2@inst.hcpss.org',
+            role=User.Role.TEACHER
+        )
+        self.room = ClassPeriod.objects.create(
+            teacher=self.teacher, period='RT', room_number='W1',
+            subject='Robotics', capacity=1
+        )
+        self.other_room = ClassPeriod.objects.create(
+            teacher=self.other_teacher, period='RT', room_number='W2',
+            subject='Yearbook', capacity=1
+        )
+        self.students = [
+            Student.objects.create(
+                name=f'WL Student {i}', grade=9 + i,
+                hcpss_email=f'wl{i}@inst.hcpss.org'
+            )
+            for i in range(4)
+        ]
+        reserve_seat(self.students[0], self.room.id)
+
+    def test_fifo_promotion(self):
+        """Test a freed seat goes to the first student in line"""
+        join_waitlist(self.students[1], self.room.id)
+        second = join_waitlist(self.students[2], self.room.id)
+        self.assertEqual(waitlist_position(second), 2)
+
+        release_seat(self.students[0], self.room.id)
+
+        self.assertTrue(Reservation.objects.filter(
+            student=self.students[1], class_period=self.room
+        ).exists())
+        self.assertEqual(waitlist_position(second), 1)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.current_enrollment, 1)
+
+    def test_priority_policy(self):
+        """Test the priority policy serves higher grades first, then join order"""
+        ClassPeriod.objects.filter(pk=self.room.pk).update(
+            waitlist_policy=ClassPeriod.WAITLIST_PRIORITY
+        )
+        join_waitlist(self.students[1], self.room.id)  # grade 10
+        senior = join_waitlist(self.students[3], self.room.id)  # grade 12
+        self.assertEqual(waitlist_position(senior), 1)
+
+        release_seat(self.students[0], self.room.id)
+        self.assertTrue(Reservation.objects.filter(student=self.students[3]).exists())
+
+    def test_taking_a_seat_leaves_other_waitlists(self):
+        """Test promotion skips students who already hold a seat in the period"""
+        reserve_seat(self.students[3], self.other_room.id)
+        join_waitlist(self.students[1], self.room.id)
+        join_waitlist(self.students[1], self.other_room.id)
+        join_waitlist(self.students[2], self.room.id)
+
+        # Student 1 gets the other room, so they leave this line too
+        release_seat(self.students[3], self.other_room.id)
+        self.assertFalse(WaitlistEntry.objects.filter(student=self.students[1]).exists())
+
+        release_seat(self.students[0], self.room.id)
+        self.assertTrue(Reservation.objects.filter(
+            student=self.students[2], class_period=self.room
+        ).exists())
+
+    def test_seats_freed_without_release_promote(self):
+        """Test deleting the holder or raising capacity promotes the next in line"""
+        join_waitlist(self.students[1], self.room.id)
+        self.students[0].delete()
+        self.assertTrue(Reservation.objects.filter(
+            student=self.students[1], class_period=self.room
+        ).exists())
+
+        join_waitlist(self.students[2], self.room.id)
+        room = ClassPeriod.objects.get(pk=self.room.pk)
+        room.capacity = 2
+        room.save()
+        self.assertTrue(Reservation.objects.filter(
+            student=self.students[2], class_period=self.room
+        ).exists())
+        room.refresh_from_db()
+        self.assertEqual(room.current_enrollment, 2)
+
+    def test_join_rules(self):
+        """Test only full rooms can be joined, once, by students without a seat"""
+        with self.assertRaises(SeatsAvailable):
+            join_waitlist(self.students[1], self.other_room.id)
+        with self.assertRaises(AlreadyReserved):
+            join_waitlist(self.students[0], self.room.id)
+        join_waitlist(self.students[1], self.room.id)
+        with self.assertRaises(AlreadyWaiting):
+            join_waitlist(self.students[1], self.room.id)
+        leave_waitlist(self.students[1], self.room.id)
+        with self.assertRaises(NotWaiting):
+            leave_waitlist(self.students[1], self.room.id)
+
+
+class WaitlistAPITests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            username='wlapiteacher',
+            email='wlapiteacher@inst.hcpss.org',
+            role=User.Role.TEACHER
+        )
+        self.student_user = User.objects.create_user(
+            username='wlapistudent',
+            email='wlapistudent@inst.hcpss.org',
+            role=User.Role.STUDENT,
+            student_id='654321'
+        )
+        self.student = Student.objects.create(
+            name='WL API Student', grade=11, hcpss_email='wlapistudent@inst.hcpss.org'
+        )
+        holder = Student.objects.create(
+            name='Seat Holder', grade=11, hcpss_email='holder@inst.hcpss.org'
+        )
+        self.room = ClassPeriod.objects.create(
+            teacher=self.teacher, period='RT', room_number='W3',
+            subject='Drama', capacity=1
+        )
+        reserve_seat(holder, self.room.id)
+        self.url = reverse(
+            'attendance:class_period_waitlist_api', kwargs={'class_id': self.room.id}
+        )
+        self.client = APIClient()
+
+    def test_join_status_and_leave(self):
+        """Test students can join, see their position and leave"""
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['position'], 1)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['state'], 'waiting')
+        self.assertEqual(response.data['waiting'], 1)
+
+        self.assertEqual(self.client.post(self.url).status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.client.delete(self.url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.url).data['state'], 'none')
+
+    def test_overloaded_queue_returns_retry_after(self):
+        """Test a full admission queue turns sign-ups away with 503 and Retry-After"""
+        self.client.force_authenticate(user=self.student_user)
+        queue = AdmissionQueue(max_active=1, max_waiting=0, timeout=0)
+        with mock.patch.object(admission, 'get_signup_queue', return_value=queue):
+            with queue.admit():
+                response = self.client.post(self.url)
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response['Retry-After'], '1')
+
+            # Reads skip the queue
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+
+class AdmissionQueueTests(TestCase):
+    def test_bounds_active_and_waiting(self):
+        """Test at most max_active run, max_waiting wait, and the rest are refused"""
+        queue = AdmissionQueue(max_active=1, max_waiting=1, timeout=5)
+        release = threading.Event()
+        entered = threading.Event()
+        results = []
+
+        def hold():
+            with queue.admit():
+                entered.set()
+                release.wait(5)
+
+        def wait_turn():
+            try:
+                with queue.admit():
+                    results.append('admitted')
+            except Overloaded:
+                results.append('refused')
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        entered.wait(5)
+        waiter = threading.Thread(target=wait_turn)
+        waiter.start()
+        while queue.waiting == 0:
+            pass
+
+        # The line is full, so a third request is refused immediately
+        with self.assertRaises(Overloaded):
+            with queue.admit():
+                pass
+
+        release.set()
+        holder.join()
+        waiter.join()
+        self.assertEqual(results, ['admitted'])
+
+    def test_timeout(self):
+        """Test waiting longer than the timeout raises Overloaded"""
+        queue = AdmissionQueue(max_active=1, max_waiting=5, timeout=0.01)
+        with queue.admit():
+            with self.assertRaises(Overloaded) as cm:
+                with queue.admit():
+                    pass
+        self.assertGreaterEqual(cm.exception.retry_after, 1)
@@ -1,9 +1,14 @@
+import json
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework import status
-from attendance.models import Student, Announcement
+from attendance.models import Student, Announcement, ClassPeriod
+from attendance.cache import cache_stats
 
 User = get_user_model()
 
@@ -95,3 +100,464 @@ class AttendanceAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(response.data['results'][0]['title'], 'Test Announcement')
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cursoruser',
+            email='cursoruser@inst.hcpss.org',
+            password='testpass123'
+        )
+        self.teacher = User.objects.create_user(
+            username='cursorteacher',
+            email='cursorteacher@inst.hcpss.org',
+            password='testpass123'
+        )
+        for i in range(7):
+            Student.objects.create(
+                name=f'Student {i}',
+                grade=9 + i % 4,
+                hcpss_email=f'student{i}@inst.hcpss.org',
+                teacher=self.teacher
+            )
+            Announcement.objects.create(
+                title=f'Announcement {i}',
+                body='Body',
+                teacher=self.teacher
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _walk(self, url, params):
+        """Follow next_cursor until the last page, collecting results"""
+        seen = []
+        cursor = ''
+        while True:
+            response = self.client.get(url, {**params, 'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(response.data['results'])
+            if not response.data['has_next']:
+                self.assertIsNone(response.data['next_cursor'])
+                return seen
+            cursor = response.data['next_cursor']
+
+    def test_student_cursor_walk(self):
+        """Test that cursor pages cover every student exactly once"""
+        url = reverse('attendance:student_list_api')
+        seen = self._walk(url, {'page_size': 3})
+        ids = [s['id'] for s in seen]
+        self.assertEqual(ids, sorted(Student.objects.values_list('id', flat=True)))
+
+    def test_announcement_cursor_walk(self):
+        """Test that announcement cursors follow -timestamp, id ordering"""
+        url = reverse('attendance:announcement_list_api')
+        seen = self._walk(url, {'page_size': 2})
+        expected = list(
+            Announcement.objects.order_by('-timestamp', 'id').values_list('id', flat=True)
+        )
+        self.assertEqual([a['id'] for a in seen], expected)
+
+    def test_cursor_count_is_optional(self):
+        """Test that the total count is only returned on request"""
+        url = reverse('attendance:student_list_api')
+        response = self.client.get(url, {'cursor': '', 'grade': 9})
+        self.assertNotIn('count', response.data)
+        self.assertNotIn('total_pages', response.data)
+
+        response = self.client.get(url, {'cursor': '', 'grade': 9, 'count': 'true'})
+        self.assertEqual(response.data['count'], 2)
+
+    def test_invalid_cursor(self):
+        """Test that a tampered cursor is rejected"""
+        url = reverse('attendance:student_list_api')
+        response = self.client.get(url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_page_number_mode_unchanged(self):
+        """Test that page-number responses keep their existing keys"""
+        url = reverse('attendance:student_list_api')
+        response = self.client.get(url, {'page': 2, 'page_size': 5})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['total_pages'], 2)
+        self.assertTrue(response.data['has_previous'])
+        self.assertFalse(response.data['has_next'])
+
+
+class QueryCountTests(TestCase):
+    """Views should run the same number of queries whatever the page size"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='queryuser',
+            email='queryuser@inst.hcpss.org',
+            password='testpass123'
+        )
+        self.teachers = [
+            User.objects.create_user(
+                username=f'queryteacher{i}',
+                email=f'queryteacher{i}@inst.hcpss.org',
+                password='testpass123'
+            )
+            for i in range(10)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _create_rows(self, count):
+        start = Student.objects.count()
+        for i in range(start, start + count):
+            teacher = self.teachers[i % len(self.teachers)]
+            Student.objects.create(
+                name=f'Student {i}',
+                grade=9,
+                hcpss_email=f'query{i}@inst.hcpss.org',
+                teacher=teacher,
+                teacher_period2=self.teachers[(i + 1) % len(self.teachers)]
+            )
+            Announcement.objects.create(title=f'A{i}', body='Body', teacher=teacher)
+        for teacher in self.teachers:
+            ClassPeriod.objects.get_or_create(
+                teacher=teacher, period='2',
+                defaults={'room_number': '101', 'subject': 'Math'}
+            )
+
+    def test_list_views_constant_queries(self):
+        """Test list views don't issue a query per nested teacher"""
+        urls = [
+            reverse('attendance:student_list_api'),
+            reverse('attendance:announcement_list_api'),
+            reverse('attendance:class_period_list_api'),
+        ]
+        self._create_rows(3)
+        small = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url, {'page_size': 50})
+            small[url] = len(queries)
+
+        self._create_rows(30)
+        for url in urls:
+            with self.assertNumQueries(small[url]):
+                self.client.get(url, {'page_size': 50})
+
+    def test_detail_views_constant_queries(self):
+        """Test detail views load students and announcements in bulk"""
+        self._create_rows(20)
+        student = Student.objects.first()
+        class_period = ClassPeriod.objects.get(teacher=student.teacher_period2)
+
+        # Two version queries for the ETag, then the student and announcements
+        with self.assertNumQueries(4):
+            self.client.get(reverse(
+                'attendance:student_detail_api', kwargs={'student_id': student.id}
+            ))
+        with self.assertNumQueries(2):
+            self.client.get(reverse(
+                'attendance:class_period_detail_api', kwargs={'class_id': class_period.id}
+            ))
+
+
+class StudentSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='searchuser',
+            email='searchuser@inst.hcpss.org',
+            password='testpass123'
+        )
+        Student.objects.create(name='Ann Lee', grade=9, hcpss_email='alee1@inst.hcpss.org')
+        Student.objects.create(name='Joanna Ann', grade=9, hcpss_email='jann@inst.hcpss.org')
+        Student.objects.create(
+            name='Mark Ruiz', grade=9, hcpss_email='mruiz@inst.hcpss.org',
+            account_email='annual.mark@example.com'
+        )
+        Student.objects.create(name='Zed Park', grade=9, hcpss_email='zpark@inst.hcpss.org')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_search_matches_all_fields_ranked(self):
+        """Test search covers names and emails with name prefixes first"""
+        url = reverse('attendance:student_list_api')
+        response = self.client.get(url, {'search': 'ann'})
+        names = [s['name'] for s in response.data['results']]
+        self.assertEqual(names[0], 'Ann Lee')
+        self.assertCountEqual(names, ['Ann Lee', 'Joanna Ann', 'Mark Ruiz'])
+
+    def test_search_with_cursor(self):
+        """Test cursor mode keeps id ordering while searching"""
+        url = reverse('attendance:student_list_api')
+        response = self.client.get(url, {'search': 'ann', 'cursor': ''})
+        ids = [s['id'] for s in response.data['results']]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 3)
+
+
+class StudentExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='exportuser',
+            email='exportuser@inst.hcpss.org',
+            password='testpass123'
+        )
+        self.teacher = User.objects.create_user(
+            username='exportteacher',
+            email='exportteacher@inst.hcpss.org',
+            password='testpass123'
+        )
+        for i in range(5):
+            Student.objects.create(
+                name=f'Export {i}',
+                grade=9 if i < 3 else 10,
+                hcpss_email=f'export{i}@inst.hcpss.org',
+                teacher=self.teacher
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('attendance:student_export_api')
+
+    def test_csv_export(self):
+        """Test the CSV export streams a header and every filtered row"""
+        response = self.client.get(self.url, {'grade': 9})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('id,name,grade'))
+        self.assertEqual(len(lines), 4)
+        self.assertIn('exportteacher', lines[1])
+
+    def test_ndjson_export(self):
+        """Test the NDJSON export writes one object per line"""
+        response = self.client.get(self.url, {'output': 'ndjson', 'search': 'Export 4'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['name'], 'Export 4')
+
+    def test_unknown_output(self):
+        """Test unsupported export formats are rejected"""
+        response = self.client.get(self.url, {'output': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='etaguser',
+            email='etaguser@inst.hcpss.org',
+            password='testpass123'
+        )
+        self.teacher = User.objects.create_user(
+            username='etagteacher',
+            email='etagteacher@inst.hcpss.org',
+            password='testpass123'
+        )
+        self.student = Student.objects.create(
+            name='Etag Student', grade=9,
+            hcpss_email='etag@inst.hcpss.org', teacher=self.teacher
+        )
+        self.class_period = ClassPeriod.objects.create(
+            teacher=self.teacher, period='RT', room_number='B12', subject='Study Hall'
+        )
+        Announcement.objects.create(title='First', body='Body', teacher=self.teacher)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _assert_revalidates(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        # Only the version lookup runs for an unchanged poll
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertLessEqual(len(queries), 2)
+        return etag
+
+    def test_announcement_list_304(self):
+        """Test announcement polls revalidate until a new announcement arrives"""
+        url = reverse('attendance:announcement_list_api')
+        etag = self._assert_revalidates(url)
+
+        Announcement.objects.create(title='Second', body='Body', teacher=self.teacher)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_class_period_list_304(self):
+        """Test enrollment changes invalidate the class period ETag"""
+        url = reverse('attendance:class_period_list_api')
+        etag = self._assert_revalidates(url, {'available': 'true'})
+
+        self.class_period.current_enrollment = 5
+        self.class_period.save()
+        response = self.client.get(url, {'available': 'true'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_student_detail_304(self):
+        """Test student detail revalidates and 404s for missing students"""
+        url = reverse('attendance:student_detail_api', kwargs={'student_id': self.student.id})
+        self._assert_revalidates(url)
+
+        url = reverse('attendance:student_detail_api', kwargs={'student_id': 999999})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_etag_varies_by_query(self):
+        """Test different pages never share an ETag"""
+        url = reverse('attendance:announcement_list_api')
+        first = self.client.get(url, {'page': 1})['ETag']
+        second = self.client.get(url, {'page': 2})['ETag']
+        self.assertNotEqual(first, second)
+
+
+class AnnouncementCacheTests(TestCase):
+    def setUp(self):
+        caches['announcements'].clear()
+        self.user = User.objects.create_user(
+            username='cacheuser',
+            email='cacheuser@inst.hcpss.org',
+            password='testpass123'
+        )
+        self.teacher = User.objects.create_user(
+            username='cacheteacher',
+            email='cacheteacher@inst.hcpss.org',
+            password='testpass123'
+        )
+        self.other_teacher = User.objects.create_user(
+            username='cacheteacher2',
+            email='cacheteacher2@inst.hcpss.org',
+            password='testpass123'
+        )
+        self.student = Student.objects.create(
+            name='Cache Student', grade=9,
+            hcpss_email='cache@inst.hcpss.org', teacher=self.teacher
+        )
+        self.announcement = Announcement.objects.create(
+            title='Cached', body='Body', teacher=self.teacher
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_feed_hits_cache(self):
+        """Test repeat feed reads are served from the cache"""
+        url = reverse('attendance:announcement_list_api')
+        self.client.get(url)
+        with self.assertNumQueries(1):  # Only the ETag version query
+            response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['title'], 'Cached')
+        stats = cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_save_and_delete_invalidate(self):
+        """Test signals invalidate the feed and teacher lists"""
+        list_url = reverse('attendance:announcement_list_api')
+        detail_url = reverse(
+            'attendance:student_detail_api', kwargs={'student_id': self.student.id}
+        )
+        self.client.get(list_url)
+        self.client.get(detail_url)
+
+        self.announcement.title = 'Edited'
+        self.announcement.save()
+        self.assertEqual(self.client.get(list_url).data['results'][0]['title'], 'Edited')
+        self.assertEqual(self.client.get(detail_url).data['announcements'][0]['title'], 'Edited')
+
+        self.announcement.delete()
+        self.assertEqual(self.client.get(list_url).data['results'], [])
+        self.assertEqual(self.client.get(detail_url).data['announcements'], [])
+
+    def test_reassigning_teacher_invalidates_both(self):
+        """Test moving an announcement clears the previous teacher's list"""
+        detail_url = reverse(
+            'attendance:student_detail_api', kwargs={'student_id': self.student.id}
+        )
+        self.assertEqual(len(self.client.get(detail_url).data['announcements']), 1)
+
+        self.announcement.teacher = self.other_teacher
+        self.announcement.save()
+        self.assertEqual(self.client.get(detail_url).data['announcements'], [])
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='sparseuser',
+            email='sparseuser@inst.hcpss.org',
+            password='testpass123'
+        )
+        self.teacher = User.objects.create_user(
+            username='sparseteacher',
+            email='sparseteacher@inst.hcpss.org',
+            first_name='Sparse',
+            password='testpass123'
+        )
+        self.student = Student.objects.create(
+            name='Sparse Student', grade=11,
+            hcpss_email='sparse@inst.hcpss.org', teacher=self.teacher
+        )
+        ClassPeriod.objects.create(
+            teacher=self.teacher, period='RT', room_number='E1', subject='Band'
+        )
+        Announcement.objects.create(title='Sparse', body='Body', teacher=self.teacher)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_fields_trims_payload_and_columns(self):
+        """Test ?fields= returns only those keys and selects only those columns"""
+        url = reverse('attendance:student_list_api')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,name'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['results'], [{'id': self.student.id, 'name': 'Sparse Student'}]
+        )
+
+        select = [q['sql'] for q in queries.captured_queries if 'FROM "students"' in q['sql']][-1]
+        self.assertNotIn('phone_num', select)
+        self.assertNotIn('JOIN', select)
+
+    def test_relations_collapse_unless_expanded(self):
+        """Test nested teachers become ids unless named in ?expand="""
+        url = reverse('attendance:student_list_api')
+        response = self.client.get(url, {'fields': 'id,teacher'})
+        self.assertEqual(response.data['results'][0]['teacher'], self.teacher.id)
+
+        response = self.client.get(url, {'fields': 'id', 'expand': 'teacher'})
+        self.assertEqual(response.data['results'][0]['teacher']['first_name'], 'Sparse')
+
+        # Without either parameter the full nested payload is unchanged
+        response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['teacher']['id'], self.teacher.id)
+        self.assertIn('phone_num', response.data['results'][0])
+
+    def test_other_endpoints(self):
+        """Test class periods, announcements and student detail accept fieldsets"""
+        response = self.client.get(
+            reverse('attendance:class_period_list_api'),
+            {'fields': 'room_number,available_seats', 'cursor': ''}
+        )
+        self.assertEqual(response.data['results'], [{'room_number': 'E1', 'available_seats': 30}])
+
+        response = self.client.get(
+            reverse('attendance:announcement_list_api'), {'fields': 'title'}
+        )
+        self.assertEqual(response.data['results'], [{'title': 'Sparse'}])
+
+        response = self.client.get(
+            reverse('attendance:student_detail_api', kwargs={'student_id': self.student.id}),
+            {'fields': 'name'}
+        )
+        self.assertEqual(response.data['student'], {'name': 'Sparse Student'})
+        self.assertEqual(response.data['announcements'][0]['title'], 'Sparse')
+
+    def test_unknown_fields_rejected(self):
+        """Test unknown or non-expandable fields return 400"""
+        url = reverse('attendance:student_list_api')
+        self.assertEqual(
+            self.client.get(url, {'fields': 'id,password'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.get(url, {'expand': 'name'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
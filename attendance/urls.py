@@ -1,13 +1,22 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views, batch
 
 app_name = 'attendance'
 
+# Async read views only pay off under ASGI (backend/asgi.py)
+read_views = async_views if settings.ASYNC_READ_VIEWS else views
+
 urlpatterns = [
     # API endpoints
-    path('api/students/', views.student_list, name='student_list_api'),
-    path('api/students/<int:student_id>/', views.student_detail, name='student_detail_api'),
-    path('api/announcements/', views.announcement_list, name='announcement_list_api'),
-    path('api/class-periods/', views.class_period_list, name='class_period_list_api'),
-    path('api/class-periods/<int:class_id>/', views.class_period_detail, name='class_period_detail_api'),
+    path('api/students/', read_views.student_list, name='student_list_api'),
+    path('api/students/export/', views.student_export, name='student_export_api'),
+    path('api/students/<int:student_id>/', read_views.student_detail, name='student_detail_api'),
+    path('api/announcements/', read_views.announcement_list, name='announcement_list_api'),
+    path('api/class-periods/', read_views.class_period_list, name='class_period_list_api'),
+    path('api/class-periods/<int:class_id>/', read_views.class_period_detail, name='class_period_detail_api'),
+    path('api/class-periods/<int:class_id>/reservation/', views.class_period_reservation, name='class_period_reservation_api'),
+    path('api/class-periods/<int:class_id>/waitlist/', views.class_period_waitlist, name='class_period_waitlist_api'),
+    path('api/batch/', batch.batch, name='batch_api'),
+    path('api/stream/', async_views.event_stream, name='event_stream_api'),
 ]
@@ -7,6 +7,7 @@ class periods, and announcements. The views provide:
 1. Student Management:
    - List and filter students
    - Student detail views
+   - Streaming roster export (CSV and NDJSON)
    - Period assignments
    - Theme preferences
    - Communication settings
@@ -17,6 +18,9 @@ class periods, and announcements. The views provide:
    - Teacher assignments
    - Enrollment management
    - Availability checking
+   - Atomic seat reservations (reservations.py)
+   - Waitlists for full rooms (waitlist.py)
+   - Sign-up writes admitted through a bounded queue (admission.py)
 
 3. Announcement System:
    - Create and list announcements
@@ -25,8 +29,15 @@ class periods, and announcements. The views provide:
    - Timestamp tracking
 
 4. Features:
-   - Pagination for all list views
-   - Filtering and search
+   - Pagination for all list views (page numbers or keyset cursors)
+   - Sparse fieldsets: ?fields=id,name trims the payload and the columns
+     fetched; nested teachers become ids unless named in ?expand=
+   - Serializer-driven joins and column lists (query_planner.py), so
+     each view runs a constant number of queries
+   - Filtering and ranked search (search.py)
+   - ETag/Last-Modified support so unchanged polls get a 304
+     (conditional.py)
+   - Cached announcement pages and teacher lists (cache.py)
    - Role-based access control
    - Error handling
    - Response formatting
@@ -44,99 +55,184 @@ Related:
 """
 
 from django.shortcuts import get_object_or_404
-from django.core.paginator import Paginator
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework import status
 from .models import Student, Announcement, Notification, ClassPeriod
 from .serializers import (
     StudentSerializer, AnnouncementSerializer, 
     NotificationSerializer, ClassPeriodSerializer
 )
-from django.db.models import F
+from .pagination import paginate, is_cursor_request
+from .query_planner import optimize_queryset, with_columns
+from .search import search_students
+from .exports import stream_students, CONTENT_TYPES
+from .conditional import conditional
+from .cache import cached_feed_page, cached_teacher_announcements
+from .reservations import (
+    reserve_seat, release_seat, PeriodFull, AlreadyReserved, NotReserved, RosterManaged
+)
+from .waitlist import (
+    join_waitlist, leave_waitlist, waitlist_status,
+    SeatsAvailable, AlreadyWaiting, NotWaiting
+)
+from .admission import admission_controlled
+from django.db.models import F, Max, Count
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def student_list(request):
-    """API endpoint for listing students"""
+# Stable sort keys used for cursor pagination
+STUDENT_ORDERING = ('id',)
+CLASS_PERIOD_ORDERING = ('room_number', 'id')
+ANNOUNCEMENT_ORDERING = ('-timestamp', 'id')
+
+def get_fieldset(request):
+    """Read ?fields= and ?expand= into serializer keyword arguments"""
+    fieldset = {}
+    for param in ('fields', 'expand'):
+        value = request.GET.get(param)
+        if value:
+            fieldset[param] = [name.strip() for name in value.split(',') if name.strip()]
+    return fieldset
+
+def filter_students(request, students, ranked=True):
+    """Apply the grade/teacher/search query params to a student queryset"""
     # Get filters from query params
     grade = request.GET.get('grade')
     teacher = request.GET.get('teacher')
     search = request.GET.get('search')
     
-    # Start with all students
-    students = Student.objects.all()
-    
     # Apply filters
     if grade:
         students = students.filter(grade=grade)
     if teacher:
         students = students.filter(teacher=teacher)
     if search:
-        students = students.filter(name__icontains=search)
+        students = search_students(students, search, ranked=ranked)
+    return students
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def student_list(request):
+    """API endpoint for listing students"""
+    # Start with all students, fetching only what the fieldset needs
+    fieldset = get_fieldset(request)
+    students = optimize_queryset(
+        Student.objects.all(), StudentSerializer(**fieldset)
+    )
+    
+    # Apply filters. Ranked search results only make sense with page
+    # numbers; cursors need the stable id ordering
+    students = filter_students(
+        request, students, ranked=not is_cursor_request(request)
+    )
     
     # Paginate results
-    page_size = int(request.GET.get('page_size', 25))
-    paginator = Paginator(students, page_size)
-    page = request.GET.get('page', 1)
-    students = paginator.get_page(page)
+    students, pagination = paginate(request, students, STUDENT_ORDERING, 25)
     
     # Serialize data
     data = {
-        'results': StudentSerializer(students, many=True).data,
-        'total_pages': paginator.num_pages,
-        'current_page': page,
-        'has_next': students.has_next(),
-        'has_previous': students.has_previous()
+        'results': StudentSerializer(students, many=True, **fieldset).data,
+        **pagination
     }
     return Response(data)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+def student_export(request):
+    """API endpoint for streaming the full (filtered) roster"""
+    # 'format' is reserved by DRF content negotiation
+    output = request.GET.get('output', 'csv').lower()
+    if output not in CONTENT_TYPES:
+        return Response(
+            {'error': f"Unsupported output '{output}'. Use csv or ndjson."},
+            status=400
+        )
+    
+    students = filter_students(request, Student.objects.all(), ranked=False)
+    return stream_students(students, output)
+
+def teacher_announcements(teacher_id):
+    """Serialized announcements for one teacher, cached until they change"""
+    def build():
+        announcements = optimize_queryset(
+            Announcement.objects.filter(teacher_id=teacher_id),
+            AnnouncementSerializer
+        )
+        return AnnouncementSerializer(announcements, many=True).data
+    
+    return cached_teacher_announcements(teacher_id, build)
+
+def student_detail_version(request, student_id):
+    """Data version for student_detail: the student row and their teacher's announcements"""
+    student = Student.objects.filter(pk=student_id).values(
+        'updated_at', 'teacher_id'
+    ).first()
+    if student is None:
+        return None
+    stats = Announcement.objects.filter(
+        teacher_id=student['teacher_id']
+    ).aggregate(latest=Max('timestamp'), count=Count('id'))
+    
+    last_modified = max(filter(None, [student['updated_at'], stats['latest']]))
+    return last_modified, (student, stats)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional(student_detail_version)
 def student_detail(request, student_id):
     """API endpoint for student details"""
-    student = get_object_or_404(Student, pk=student_id)
-    announcements = Announcement.objects.filter(teacher=student.teacher)
+    fieldset = get_fieldset(request)
+    # The teacher id is always needed to look up their announcements
+    students = with_columns(
+        optimize_queryset(Student.objects.all(), StudentSerializer(**fieldset)),
+        'teacher'
+    )
+    student = get_object_or_404(students, pk=student_id)
     
     data = {
-        'student': StudentSerializer(student).data,
-        'announcements': AnnouncementSerializer(announcements, many=True).data
+        'student': StudentSerializer(student, **fieldset).data,
+        'announcements': teacher_announcements(student.teacher_id)
     }
     return Response(data)
 
+def announcement_list_version(request):
+    """Data version for announcement_list"""
+    stats = Announcement.objects.aggregate(latest=Max('timestamp'), count=Count('id'))
+    return stats['latest'], stats
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional(announcement_list_version)
 def announcement_list(request):
     """API endpoint for listing announcements"""
-    announcements = Announcement.objects.all().order_by('-timestamp')
-    
-    # Paginate results
-    page_size = int(request.GET.get('page_size', 10))
-    paginator = Paginator(announcements, page_size)
-    page = request.GET.get('page', 1)
-    announcements = paginator.get_page(page)
+    return Response(announcement_page(request, get_fieldset(request)))
+
+def announcement_page(request, fieldset):
+    """Body of one announcement_list page, cached until announcements change"""
+    def build():
+        announcements = optimize_queryset(
+            Announcement.objects.all(), AnnouncementSerializer(**fieldset)
+        ).order_by('-timestamp')
+        
+        # Paginate results
+        announcements, pagination = paginate(
+            request, announcements, ANNOUNCEMENT_ORDERING, 10
+        )
+        
+        return {
+            'results': AnnouncementSerializer(announcements, many=True, **fieldset).data,
+            **pagination
+        }
     
-    data = {
-        'results': AnnouncementSerializer(announcements, many=True).data,
-        'total_pages': paginator.num_pages,
-        'current_page': page,
-        'has_next': announcements.has_next(),
-        'has_previous': announcements.has_previous()
-    }
-    return Response(data)
+    return cached_feed_page(request, build)
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def class_period_list(request):
-    """API endpoint for listing class periods"""
+def filter_class_periods(request, class_periods):
+    """Apply the period/teacher/available query params to a class period queryset"""
     # Get filters from query params
     period = request.GET.get('period')
     teacher = request.GET.get('teacher')
     available_only = request.GET.get('available', '').lower() == 'true'
     
-    # Start with all class periods
-    class_periods = ClassPeriod.objects.all()
-    
     # Apply filters
     if period:
         class_periods = class_periods.filter(period=period)
@@ -144,23 +240,41 @@ def class_period_list(request):
         class_periods = class_periods.filter(teacher=teacher)
     if available_only:
         class_periods = class_periods.filter(current_enrollment__lt=F('capacity'))
+    return class_periods
+
+def class_period_list_version(request):
+    """Data version for class_period_list, over the filtered rows"""
+    stats = filter_class_periods(request, ClassPeriod.objects.all()).aggregate(
+        latest=Max('updated_at'), count=Count('id')
+    )
+    return stats['latest'], stats
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional(class_period_list_version)
+def class_period_list(request):
+    """API endpoint for listing class periods"""
+    # Start with all class periods, fetching only what the fieldset needs
+    fieldset = get_fieldset(request)
+    class_periods = optimize_queryset(
+        ClassPeriod.objects.all(), ClassPeriodSerializer(**fieldset)
+    )
+    
+    # Apply filters
+    class_periods = filter_class_periods(request, class_periods)
         
     # Order by room number
     class_periods = class_periods.order_by('room_number')
     
     # Paginate results
-    page_size = int(request.GET.get('page_size', 25))
-    paginator = Paginator(class_periods, page_size)
-    page = request.GET.get('page', 1)
-    class_periods = paginator.get_page(page)
+    class_periods, pagination = paginate(
+        request, class_periods, CLASS_PERIOD_ORDERING, 25
+    )
     
     # Serialize data
     data = {
-        'results': ClassPeriodSerializer(class_periods, many=True).data,
-        'total_pages': paginator.num_pages,
-        'current_page': page,
-        'has_next': class_periods.has_next(),
-        'has_previous': class_periods.has_previous()
+        'results': ClassPeriodSerializer(class_periods, many=True, **fieldset).data,
+        **pagination
     }
     return Response(data)
 
@@ -168,8 +282,14 @@ def class_period_list(request):
 @permission_classes([IsAuthenticated])
 def class_period_detail(request, class_id):
     """API endpoint for class period details"""
-    class_period = get_object_or_404(ClassPeriod, pk=class_id)
-    students = Student.objects.filter(teacher_period2=class_period.teacher)
+    class_period = get_object_or_404(
+        optimize_queryset(ClassPeriod.objects.all(), ClassPeriodSerializer),
+        pk=class_id
+    )
+    students = optimize_queryset(
+        Student.objects.filter(teacher_period2_id=class_period.teacher_id),
+        StudentSerializer
+    )
     
     data = {
         'class_period': ClassPeriodSerializer(class_period).data,
@@ -177,3 +297,105 @@ def class_period_detail(request, class_id):
         'available_seats': class_period.capacity - class_period.current_enrollment
     }
     return Response(data)
+
+def get_reserving_student(request):
+    """
+    Resolve the student a reservation request is for.
+
+    Students always act for themselves (matched on their HCPSS email);
+    teachers and admins pass a student_id in the request body (or the
+    query string for GET).
+    """
+    user = request.user
+    if getattr(user, 'is_student', lambda: False)():
+        return get_object_or_404(Student, hcpss_email__iexact=user.email)
+    
+    student_id = request.data.get('student_id') or request.query_params.get('student_id')
+    if not student_id:
+        return None
+    return get_object_or_404(Student, pk=student_id)
+
+@api_view(['POST', 'DELETE'])
+@permission_classes([IsAuthenticated])
+@admission_controlled
+def class_period_reservation(request, class_id):
+    """API endpoint for reserving (POST) or releasing (DELETE) a seat"""
+    student = get_reserving_student(request)
+    if student is None:
+        return Response(
+            {'error': 'student_id is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        if request.method == 'POST':
+            reserve_seat(student, class_id)
+            message, response_status = 'Seat reserved', status.HTTP_201_CREATED
+        else:
+            release_seat(student, class_id)
+            message, response_status = 'Reservation released', status.HTTP_200_OK
+    except ClassPeriod.DoesNotExist:
+        return Response(
+            {'error': 'Class period not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except (PeriodFull, AlreadyReserved, RosterManaged) as e:
+        return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+    except NotReserved as e:
+        return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+    
+    class_period = ClassPeriod.objects.only('capacity', 'current_enrollment').get(pk=class_id)
+    return Response({
+        'message': message,
+        'class_period_id': class_id,
+        'student_id': student.id,
+        'current_enrollment': class_period.current_enrollment,
+        'available_seats': class_period.capacity - class_period.current_enrollment
+    }, status=response_status)
+
+@api_view(['GET', 'POST', 'DELETE'])
+@permission_classes([IsAuthenticated])
+@admission_controlled
+def class_period_waitlist(request, class_id):
+    """API endpoint for a class period's waitlist: status (GET), join (POST), leave (DELETE)"""
+    student = get_reserving_student(request)
+    if request.method == 'GET':
+        get_object_or_404(ClassPeriod.objects.only('id'), pk=class_id)
+        return Response(waitlist_status(student, class_id))
+    
+    if student is None:
+        return Response(
+            {'error': 'student_id is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Only staff can choose a priority; students get the default
+    priority = None
+    if not getattr(request.user, 'is_student', lambda: False)():
+        priority = request.data.get('priority')
+        try:
+            priority = int(priority) if priority not in (None, '') else None
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'priority must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    try:
+        if request.method == 'POST':
+            join_waitlist(student, class_id, priority=priority)
+            response_status = status.HTTP_201_CREATED
+        else:
+            leave_waitlist(student, class_id)
+            response_status = status.HTTP_200_OK
+    except ClassPeriod.DoesNotExist:
+        return Response(
+            {'error': 'Class period not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except (RosterManaged, SeatsAvailable, AlreadyReserved, AlreadyWaiting) as e:
+        return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+    except NotWaiting as e:
+        return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response(waitlist_status(student, class_id), status=response_status)
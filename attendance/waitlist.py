@@ -0,0 +1,128 @@
+"""
+Waitlists
+
+Lets students line up for a full class period instead of polling
+class_period_list?available=true until a seat shows up. Freed seats are
+handed out by reservations.release_seat(), head of the line first.
+
+1. Policies (ClassPeriod.waitlist_policy):
+   - fifo: first come, first served
+   - priority: higher priority first, then first come. Students joining
+     themselves get their grade as priority (seniors first); staff can
+     set it explicitly
+
+2. Positions:
+   - Entries are ordered by (-priority, id) and indexed that way
+     (waitlist_order_idx), so the head of the line is one index probe
+     and a position is one index range count of the entries ahead
+   - The position is computed rather than stored: storing it would
+     mean rewriting every entry behind one that leaves or is promoted
+
+3. Rules:
+   - Only full class periods can be joined, and never second period,
+     whose seats come from the roster
+   - The class period row is locked from the "full" check to the
+     insert, so a seat released in between promotes the new entry
+     instead of leaving it next to a free seat
+   - A student holding a seat in the period can't join its waitlists
+   - A student can wait for several rooms in the same period; taking
+     any seat in the period removes the others
+
+Related:
+   - reservations.py: Seat claims and promotion
+   - admission.py: Bounded queue in front of the sign-up endpoints
+   - models.py: WaitlistEntry model
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .models import ClassPeriod, Reservation, WaitlistEntry
+from .reservations import AlreadyReserved, ReservationError, RosterManaged
+
+
+class SeatsAvailable(ReservationError):
+    pass
+
+
+class AlreadyWaiting(ReservationError):
+    pass
+
+
+class NotWaiting(ReservationError):
+    pass
+
+
+def join_waitlist(student, class_period_id, priority=None):
+    """
+    Put ``student`` in line for a full class period. Returns the WaitlistEntry.
+
+    ``priority`` is only used under the priority policy; it defaults to
+    the student's grade. Raises ClassPeriod.DoesNotExist, RosterManaged,
+    SeatsAvailable, AlreadyReserved or AlreadyWaiting.
+    """
+    with transaction.atomic():
+        # release_seat() updates this row first, so it waits for the entry
+        class_period = ClassPeriod.objects.select_for_update().only(
+            'period', 'capacity', 'current_enrollment', 'waitlist_policy'
+        ).get(pk=class_period_id)
+        if class_period.period == ClassPeriod.ROSTER_PERIOD:
+            raise RosterManaged('Seats in this period come from the class roster.')
+        if class_period.current_enrollment < class_period.capacity:
+            raise SeatsAvailable('This class period has seats available.')
+        if Reservation.objects.filter(student=student, period=class_period.period).exists():
+            raise AlreadyReserved('Student already has a reservation for this period.')
+
+        if class_period.waitlist_policy == ClassPeriod.WAITLIST_FIFO:
+            priority = 0
+        elif priority is None:
+            priority = student.grade
+
+        try:
+            with transaction.atomic():
+                return WaitlistEntry.objects.create(
+                    student=student,
+                    class_period_id=class_period_id,
+                    period=class_period.period,
+                    priority=priority
+                )
+        except IntegrityError:
+            raise AlreadyWaiting('Student is already on the waitlist for this class period.')
+
+
+def leave_waitlist(student, class_period_id):
+    """Take ``student`` out of line. Raises NotWaiting if they weren't in it."""
+    deleted, _ = WaitlistEntry.objects.filter(
+        student=student, class_period_id=class_period_id
+    ).delete()
+    if not deleted:
+        raise NotWaiting('Student is not on the waitlist for this class period.')
+
+
+def waitlist_position(entry):
+    """1-based place in line: one index range count of the entries ahead"""
+    ahead = WaitlistEntry.objects.filter(class_period_id=entry.class_period_id).filter(
+        Q(priority__gt=entry.priority) | Q(priority=entry.priority, id__lt=entry.id)
+    ).count()
+    return ahead + 1
+
+
+def waitlist_status(student, class_period_id):
+    """Where ``student`` stands for a class period, for the waitlist endpoint"""
+    status = {
+        'class_period_id': class_period_id,
+        'waiting': WaitlistEntry.objects.filter(class_period_id=class_period_id).count(),
+    }
+    if student is None:
+        return status
+
+    entry = WaitlistEntry.objects.filter(
+        student=student, class_period_id=class_period_id
+    ).first()
+    if entry is not None:
+        status.update(state='waiting', position=waitlist_position(entry))
+    elif Reservation.objects.filter(student=student, class_period_id=class_period_id).exists():
+        status['state'] = 'reserved'
+    else:
+        status['state'] = 'none'
+    return status
@@ -2,7 +2,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.conf import settings
-from ..models import User
+from accounts.email_filter import known_emails
+from accounts.models import User
 from django.utils import timezone
 import logging
 
@@ -35,11 +36,15 @@ def verify_user(request):
         }, status=400)
 
     try:
+        if not known_emails.might_exist(email):
+            # Definitely not a user; skip the query
+            raise User.DoesNotExist
         user = User.objects.get(email=email)
         log_context.update({
             'user_id': user.id,
             'role': user.role,
-            'name': user.get_full_name()
+            # 'name' is reserved on LogRecord
+            'full_name': user.get_full_name()
         })
         
         # Log successful verification
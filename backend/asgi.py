@@ -3,6 +3,19 @@ ASGI config for backend project
 
 Exposes the ASGI callable as a module-level variable named ``application``
 
+Serve through this module (rather than wsgi.py) to use the real-time
+event stream at /api/stream/, e.g.:
+
+    gunicorn backend.asgi:application -k uvicorn.workers.UvicornWorker
+
+Set ASYNC_READ_VIEWS=True when serving through this module so the
+attendance read endpoints use the async views (attendance/async_views.py)
+and slow queries don't hold a worker; loadtest_asgi.py compares the two.
+
+The default in-process push broker only reaches clients connected to
+the same process, so single-node deployments should run one ASGI worker
+for the stream (see attendance/broker.py).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -0,0 +1,39 @@
+"""
+Benchmark Helpers
+
+Shared by the benchmark_* management commands of every app:
+
+1. rolled_back():
+   - Runs a block in a transaction that is always rolled back, so the
+     rows a benchmark creates never reach the database
+
+2. counting_queries():
+   - Counts the SQL statements run on a connection, without the
+     9000-query cap of CaptureQueriesContext
+
+Related:
+   - attendance/management/commands/benchmark_*.py
+   - accounts/management/commands/benchmark_*.py
+"""
+
+from contextlib import contextmanager
+from django.db import connections, transaction
+
+
+@contextmanager
+def rolled_back(using=None):
+    """Run the block in a transaction that is rolled back at the end"""
+    with transaction.atomic(using=using):
+        yield
+        transaction.set_rollback(True, using=using)
+
+
+@contextmanager
+def counting_queries(queries, using='default'):
+    """Append each statement run on ``using`` inside the block to ``queries``"""
+    def wrapper(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connections[using].execute_wrapper(wrapper):
+        yield queries
@@ -0,0 +1,199 @@
+"""
+Database Connection Metrics
+
+Reports how each worker process is using its database connections, to
+size the pool against the number of gunicorn workers. Two modes,
+chosen in settings.py:
+
+1. Pool (DB_POOL=True):
+   - psycopg 3's ConnectionPool (Django's OPTIONS['pool']), shared by
+     the threads of one process
+   - Stats come from the pool itself: size, in use, idle, requests
+     waiting, average wait for a connection, connect time
+
+2. Persistent connections (default):
+   - One connection per thread, kept for DB_CONN_MAX_AGE seconds and
+     checked before reuse when DB_CONN_HEALTH_CHECKS is on
+   - Counted per alias: a request checks out an alias's connection at
+     its first query there and holds it until the request ends.
+     Requests that never query an alias don't count for it, and one
+     request using the primary and a replica counts once for each
+   - The connection_created signal counts new connections, so the
+     reuse rate shows whether connections are actually being kept
+   - ConnectionMetricsMiddleware marks where requests start and end;
+     it works under WSGI and ASGI without forcing async requests onto
+     a thread
+
+Both report checkouts per second since the previous stats call. Every
+number is per process: sample each worker (the pid is included) and
+keep pool max size x workers under PostgreSQL's max_connections.
+
+Usage:
+    GET /api/db-pool/   (staff only)
+
+Related:
+   - settings.py: DATABASES, DB_POOL* and DB_CONN_* settings
+   - urls.py: Routes /api/db-pool/
+"""
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+_lock = threading.Lock()
+# alias -> {'checkouts': requests that queried it, 'in_use': of those, still running}
+_counters = {}
+# alias -> connections opened
+_opened = {}
+# alias -> (time, checkouts) at the previous stats() call
+_previous = {}
+
+# Aliases the current request has queried. A mutable set so queries run
+# in copied contexts (sync_to_async threads) still reach the middleware
+_request_aliases = ContextVar('db_request_aliases', default=None)
+
+
+def _alias_counters(alias):
+    return _counters.setdefault(alias, {'checkouts': 0, 'in_use': 0})
+
+
+def _track_query(alias):
+    def wrapper(execute, sql, params, many, context):
+        used = _request_aliases.get()
+        if used is not None and alias not in used:
+            used.add(alias)
+            with _lock:
+                counters = _alias_counters(alias)
+                counters['checkouts'] += 1
+                counters['in_use'] += 1
+        return execute(sql, params, many, context)
+    wrapper.db_pool_tracker = True
+    return wrapper
+
+
+def _install_tracker(connection):
+    # Kept across reconnects, since execute_wrappers outlives the
+    # connection. Inserted first so execute_wrapper() blocks opened
+    # earlier still pop their own wrapper
+    if not any(getattr(w, 'db_pool_tracker', False) for w in connection.execute_wrappers):
+        connection.execute_wrappers.insert(0, _track_query(connection.alias))
+
+
+def _connection_created(sender, connection, **kwargs):
+    with _lock:
+        _opened[connection.alias] = _opened.get(connection.alias, 0) + 1
+    _install_tracker(connection)
+
+
+connection_created.connect(_connection_created)
+
+
+def _release(used):
+    with _lock:
+        for alias in used:
+            _alias_counters(alias)['in_use'] -= 1
+
+
+class ConnectionMetricsMiddleware:
+    """Count per-alias connection checkouts for the persistent-connection stats"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Connections this thread opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            _install_tracker(connection)
+        used = set()
+        token = _request_aliases.set(used)
+        try:
+            return self.get_response(request)
+        finally:
+            _request_aliases.reset(token)
+            _release(used)
+
+    async def __acall__(self, request):
+        used = set()
+        token = _request_aliases.set(used)
+        try:
+            return await self.get_response(request)
+        finally:
+            _request_aliases.reset(token)
+            _release(used)
+
+
+def _rate(alias, checkouts):
+    """Checkouts per second since the previous call for ``alias``"""
+    now = time.monotonic()
+    with _lock:
+        previous = _previous.get(alias)
+        _previous[alias] = (now, checkouts)
+    if previous is None or now <= previous[0]:
+        return None
+    return (checkouts - previous[1]) / (now - previous[0])
+
+
+def pool_stats(alias='default'):
+    """Connection stats for one database in this process"""
+    connection = connections[alias]
+    settings_dict = connection.settings_dict
+    stats = {'alias': alias, 'pid': os.getpid(), 'vendor': connection.vendor}
+
+    pool = getattr(connection, 'pool', None) if settings_dict['OPTIONS'].get('pool') else None
+    if pool is not None:
+        raw = pool.get_stats()
+        requests = raw.get('requests_num', 0)
+        stats.update(
+            mode='pool',
+            min_size=raw.get('pool_min'),
+            max_size=raw.get('pool_max'),
+            size=raw.get('pool_size', 0),
+            in_use=raw.get('pool_size', 0) - raw.get('pool_available', 0),
+            idle=raw.get('pool_available', 0),
+            waiting=raw.get('requests_waiting', 0),
+            checkouts=requests,
+            avg_wait_ms=raw.get('requests_wait_ms', 0) / requests if requests else 0.0,
+            connections_opened=raw.get('connections_num', 0),
+            avg_connect_ms=(
+                raw.get('connections_ms', 0) / raw['connections_num']
+                if raw.get('connections_num') else 0.0
+            ),
+            errors=raw.get('requests_errors', 0) + raw.get('connections_errors', 0),
+        )
+    else:
+        with _lock:
+            counters = dict(_alias_counters(alias), opened=_opened.get(alias, 0))
+        checkouts = counters['checkouts']
+        stats.update(
+            mode='persistent' if settings_dict['CONN_MAX_AGE'] else 'per-request',
+            conn_max_age=settings_dict['CONN_MAX_AGE'],
+            health_checks=settings_dict['CONN_HEALTH_CHECKS'],
+            in_use=counters['in_use'],
+            checkouts=checkouts,
+            connections_opened=counters['opened'],
+            reuse_rate=max(0.0, 1 - counters['opened'] / checkouts) if checkouts else 0.0,
+        )
+
+    stats['checkouts_per_second'] = _rate(alias, stats['checkouts'])
+    return stats
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def pool_stats_view(request):
+    """API endpoint for this worker's database connection stats"""
+    return Response({alias: pool_stats(alias) for alias in connections})
@@ -0,0 +1,183 @@
+"""
+Read Replica Routing
+
+Sends reads from the attendance and accounts apps to read replicas and
+everything else to the primary ('default'):
+
+1. Routing (ReplicaRouter):
+   - Writes always go to the primary
+   - Reads go to a replica, picked at random per query, unless the
+     request is pinned (below), a transaction is open on the primary,
+     or no replica is healthy
+   - Other apps (sessions, admin, contenttypes) stay on the primary
+
+2. Read-your-writes (ReplicaPinningMiddleware):
+   - Unsafe requests (POST, PUT, PATCH, DELETE) read from the primary
+     for the whole request
+   - A request that writes to a routed app sets a short-lived cookie;
+     the same client's reads use the primary until it expires
+     (REPLICA_PIN_SECONDS), long enough for replication to catch up
+   - Works under WSGI and ASGI; async requests aren't moved to a thread
+
+3. Lag fallback:
+   - Each replica's replay lag is measured at most every
+     REPLICA_LAG_CHECK_INTERVAL seconds per process
+   - A replica more than REPLICA_MAX_LAG seconds behind, or one that
+     can't be reached, is skipped until the next check
+   - Lag is only measured on PostgreSQL; other backends (e.g. a SQLite
+     file copied from the primary for local testing) count as current
+
+Replicas are the aliases in settings.DATABASE_REPLICAS. With none
+configured the router sends everything to the primary.
+
+Related:
+   - settings.py: DB_REPLICA_HOSTS and the REPLICA_* settings
+   - db_pool.py: Connection stats (per alias)
+"""
+
+import random
+import threading
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+PRIMARY = 'default'
+ROUTED_APPS = {'attendance', 'accounts'}
+PIN_COOKIE = 'db_pin_until'
+
+# Per request: {'pinned': read from the primary, 'wrote': a routed write
+# happened}. A mutable dict so writes made in copied contexts (batch
+# sub-requests, sync_to_async threads) still reach the middleware
+_request_state = ContextVar('db_request_state', default=None)
+
+# alias -> (checked at, healthy), per process
+_health = {}
+_health_lock = threading.Lock()
+
+LAG_QUERIES = {
+    'postgresql': (
+        'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+        'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+    ),
+}
+
+
+def measure_lag(alias):
+    """Seconds ``alias`` is behind the primary (0 where it can't be measured)"""
+    connection = connections[alias]
+    query = LAG_QUERIES.get(connection.vendor)
+    if query is None:
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(query)
+        return float(cursor.fetchone()[0] or 0)
+
+
+def replica_is_healthy(alias):
+    """Whether ``alias`` is reachable and within REPLICA_MAX_LAG, checked at most every interval"""
+    now = time.monotonic()
+    with _health_lock:
+        checked = _health.get(alias)
+    if checked is not None and now - checked[0] < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return checked[1]
+
+    try:
+        healthy = measure_lag(alias) <= settings.REPLICA_MAX_LAG
+    except DatabaseError:
+        healthy = False
+    with _health_lock:
+        _health[alias] = (now, healthy)
+    return healthy
+
+
+def healthy_replicas():
+    return [alias for alias in settings.DATABASE_REPLICAS if replica_is_healthy(alias)]
+
+
+class ReplicaRouter:
+    """Route routed apps' reads to healthy replicas and all writes to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in ROUTED_APPS or not settings.DATABASE_REPLICAS:
+            return None
+        state = _request_state.get()
+        if (state and state['pinned']) or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        replicas = healthy_replicas()
+        return random.choice(replicas) if replicas else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None and model._meta.app_label in ROUTED_APPS:
+            state['wrote'] = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """Read from the primary during unsafe requests and for a while after a write"""
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self._state(request)
+        token = _request_state.set(state)
+        try:
+            return self._pin(request, self.get_response(request), state)
+        finally:
+            _request_state.reset(token)
+
+    async def __acall__(self, request):
+        # Queries run in sync_to_async threads, which copy this context
+        # and so share the state dict
+        state = self._state(request)
+        token = _request_state.set(state)
+        try:
+            return self._pin(request, await self.get_response(request), state)
+        finally:
+            _request_state.reset(token)
+
+    def _state(self, request):
+        return {
+            'pinned': request.method not in self.SAFE_METHODS or self._pin_active(request),
+            'wrote': False,
+        }
+
+    @staticmethod
+    def _pin(request, response, state):
+        if state['wrote']:
+            response.set_cookie(
+                PIN_COOKIE, f'{time.time() + settings.REPLICA_PIN_SECONDS:.3f}',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                samesite='Lax', secure=request.is_secure()
+            )
+        return response
+
+    @staticmethod
+    def _pin_active(request):
+        try:
+            until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            return False
+        now = time.time()
+        # Ignore pins further out than we ever set (forged or clock skew);
+        # the second allows for the cookie value being rounded
+        return now < until <= now + settings.REPLICA_PIN_SECONDS + 1
@@ -0,0 +1,77 @@
+"""
+API Renderers
+
+Faster drop-in renderers for the REST API, enabled with
+API_FAST_RENDERERS=True (see settings.py). Without it DRF's stock
+JSONRenderer is used as before.
+
+1. FastJSONRenderer:
+   - Same application/json output as JSONRenderer, encoded with orjson
+     when it is installed
+   - Falls back to the stock encoder when orjson is missing or the
+     client asks for indented output (e.g. the browsable API)
+
+2. MessagePackRenderer:
+   - application/msgpack, selected through normal content negotiation
+     (Accept: application/msgpack or ?format=msgpack)
+   - Only registered when the msgpack package is installed
+
+Values neither encoder knows natively (Decimal, lazy translation
+strings, querysets, ...) are converted the same way DRF's JSONEncoder
+converts them, so every renderer produces the same data.
+
+Related:
+   - settings.py: REST_FRAMEWORK renderer classes
+   - attendance/management/commands/benchmark_renderers.py: Render
+     time and payload size comparison
+"""
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    """Convert a value the fast encoders can't handle natively"""
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is available"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data, default=_default,
+            # Match JSONEncoder: 'Z' for UTC datetimes, non-string keys allowed
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render responses as MessagePack"""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
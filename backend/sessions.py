@@ -0,0 +1,197 @@
+"""
+Cached Sessions with Write-Behind
+
+Session engine (SESSION_ENGINE = 'backend.sessions') built on Django's
+cached_db store. The plain db engine reads django_session on every
+authenticated request and writes it whenever the session changes.
+
+1. Reads:
+   - Served from the SESSION_CACHE_ALIAS cache; the database is only
+     read on a cache miss. Entries live for the session's remaining
+     lifetime or the cache's TIMEOUT, whichever is shorter
+
+2. Writes:
+   - The cache is always updated at once
+   - Anything that changes who the session belongs to goes to the
+     database at once: creating or cycling the key (login), changing
+     the authenticated user, deleting or flushing (logout)
+   - Other changes to an authenticated session that is still cached
+     (extra data, refreshed expiry) are written behind: buffered per
+     process and flushed every
+     SESSION_WRITE_BEHIND_SECONDS as one batched UPDATE, so repeated
+     saves of the same session collapse into one write
+   - The flush only updates rows that still exist, so a session deleted
+     by another worker (logout) is never brought back
+   - SESSION_WRITE_BEHIND_SECONDS = 0 writes everything through
+
+settings.py only selects this engine when SESSION_CACHE_URL is a shared
+backend. With a per-worker local-memory cache a logout on one worker
+would reach the others only when their entry expired, so the default
+configuration uses Django's db engine instead.
+
+Expired rows are removed by the purge_sessions command.
+
+Related:
+   - settings.py: SESSION_* settings
+   - accounts/management/commands/purge_sessions.py
+   - accounts/management/commands/benchmark_sessions.py
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.contrib.sessions.models import Session
+from django.db import DatabaseError, close_old_connections
+
+logger = logging.getLogger(__name__)
+
+AUTH_KEYS = (SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY)
+
+
+class WriteBehindBuffer:
+    """Pending session updates for this process, flushed in batches"""
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def add(self, session_key, session_data, expire_date):
+        with self._lock:
+            self._pending[session_key] = (session_data, expire_date)
+            # Start lazily, and again after a fork (gunicorn --preload)
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name='session-write-behind', daemon=True).start()
+
+    def discard(self, session_key):
+        with self._lock:
+            self._pending.pop(session_key, None)
+
+    def flush(self):
+        """Write all pending updates in one batch. Returns the number written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        Session.objects.bulk_update(
+            [
+                Session(session_key=key, session_data=data, expire_date=expire_date)
+                for key, (data, expire_date) in pending.items()
+            ],
+            ['session_data', 'expire_date']
+        )
+        return len(pending)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _run(self):
+        while True:
+            time.sleep(settings.SESSION_WRITE_BEHIND_SECONDS)
+            try:
+                self.flush()
+            except DatabaseError:
+                logger.exception('Failed to flush buffered session writes')
+            finally:
+                close_old_connections()
+
+
+buffer = WriteBehindBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        buffer.flush()
+    except DatabaseError:
+        logger.exception('Failed to flush buffered session writes on exit')
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = 'backend.sessions'
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # Auth keys as last written to the database, or None if unknown
+        self._stored_auth = None
+
+    def _cache_timeout(self, expiry=None):
+        """The session's remaining lifetime, capped at the cache's own timeout"""
+        age = self.get_expiry_age(expiry=expiry)
+        if self._cache.default_timeout is None:
+            return age
+        return min(age, self._cache.default_timeout)
+
+    def load(self):
+        try:
+            data = self._cache.get(self.cache_key)
+        except Exception:
+            # Invalid keys raise on some backends; treat as a miss
+            data = None
+
+        if data is None:
+            stored = self._get_session_from_db()
+            if stored:
+                data = self.decode(stored.session_data)
+                self._cache.set(
+                    self.cache_key, data, self._cache_timeout(expiry=stored.expire_date)
+                )
+            else:
+                data = {}
+        self._stored_auth = self._auth(data)
+        return data
+
+    @staticmethod
+    def _auth(data):
+        return tuple(data.get(key) for key in AUTH_KEYS)
+
+    def _can_write_behind(self, must_create):
+        return (
+            settings.SESSION_WRITE_BEHIND_SECONDS > 0
+            and not must_create
+            and self.session_key is not None
+            and self._stored_auth is not None
+            # Only authenticated sessions whose user is already stored
+            and self._stored_auth[0] is not None
+            and self._auth(self._get_session()) == self._stored_auth
+        )
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        if self._can_write_behind(must_create) and self._cache_set(data, only_if_cached=True):
+            buffer.add(self.session_key, self.encode(data), self.get_expiry_date())
+            return
+
+        # Not cached_db's save, which caches for the whole session age
+        DBStore.save(self, must_create)
+        self._stored_auth = self._auth(data)
+        buffer.discard(self.session_key)
+        self._cache_set(data)
+
+    def _cache_set(self, data, only_if_cached=False):
+        """
+        Cache the session data. With ``only_if_cached``, only if it is
+        still cached, so a concurrent logout elsewhere isn't undone.
+        """
+        timeout = self._cache_timeout()
+        try:
+            if only_if_cached and not self._cache.touch(self.cache_key, timeout):
+                return False
+            self._cache.set(self.cache_key, data, timeout)
+            return True
+        except Exception:
+            logger.exception('Error saving to cache (%s)', self._cache)
+            return False
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        if key is not None:
+            buffer.discard(key)
+        super().delete(session_key)
@@ -39,6 +39,28 @@ Environment Variables:
     DEBUG: Boolean for debug mode
     ALLOWED_HOSTS: List of allowed hosts
     CORS_ALLOWED_ORIGINS: List of allowed CORS origins
+    ANNOUNCEMENT_CACHE_URL: Cache backend for announcements (locmem default)
+    ANNOUNCEMENT_CACHE_TIMEOUT: Seconds before cached announcements expire
+    API_FAST_RENDERERS: Use orjson/MessagePack API renderers (backend/renderers.py)
+    ASYNC_READ_VIEWS: Serve attendance reads from async views (for ASGI)
+    DB_CONN_MAX_AGE / DB_CONN_HEALTH_CHECKS: Persistent connection reuse
+    DB_POOL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT: psycopg 3
+        connection pool instead of persistent connections (backend/db_pool.py)
+    DB_REPLICA_HOSTS: Read replica hosts for attendance/accounts reads
+        (backend/db_routers.py); REPLICA_PIN_SECONDS, REPLICA_MAX_LAG tune it
+    SESSION_CACHE_URL: Shared cache backend for sessions (the locmem
+        default keeps the plain database session engine)
+    SESSION_WRITE_BEHIND_SECONDS: Batch non-auth session writes (0 disables)
+    USER_CACHE_URL: Shared cache backend for authenticated users
+        (accounts/middleware.py; the locmem default turns the cache off)
+    THROTTLE_CACHE_URL: Cache backend for failed login counters (accounts/throttling.py)
+    LOGIN_IP_MAX_ATTEMPTS: Failed logins per IP before it is refused (0, the
+        default, turns the per-IP limit off)
+    TRUSTED_PROXIES: Reverse proxy addresses or networks whose
+        X-Forwarded-For is trusted for the client IP
+    PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE: Password hashing pool
+        limits (accounts/hashing.py); PASSWORD_HASH_ITERATIONS: PBKDF2 count
+        above Django's default (lower values are ignored)
 
 Related:
     wsgi.py: Web server configuration
@@ -49,7 +71,9 @@ Related:
 from pathlib import Path
 from .logging_config import LOGGING
 import os
+import importlib.util
 from datetime import timedelta
+from django.core.exceptions import ImproperlyConfigured
 import environ
 
 # Initialize environ
@@ -62,6 +86,28 @@ env = environ.Env(
     EMAIL_USE_TLS=(bool, True),
     SESSION_COOKIE_SECURE=(bool, True),
     CSRF_COOKIE_SECURE=(bool, True),
+    ANNOUNCEMENT_CACHE_URL=(str, 'locmemcache://announcements'),
+    ANNOUNCEMENT_CACHE_TIMEOUT=(int, 300),
+    API_FAST_RENDERERS=(bool, False),
+    ASYNC_READ_VIEWS=(bool, False),
+    DB_CONN_MAX_AGE=(int, 60),
+    DB_CONN_HEALTH_CHECKS=(bool, True),
+    DB_POOL=(bool, False),
+    DB_POOL_MIN_SIZE=(int, 2),
+    DB_POOL_MAX_SIZE=(int, 10),
+    DB_POOL_TIMEOUT=(float, 10.0),
+    DB_REPLICA_HOSTS=(list, []),
+    REPLICA_PIN_SECONDS=(int, 5),
+    REPLICA_MAX_LAG=(float, 2.0),
+    SESSION_CACHE_URL=(str, 'locmemcache://sessions?timeout=60'),
+    SESSION_WRITE_BEHIND_SECONDS=(int, 5),
+    USER_CACHE_URL=(str, 'locmemcache://users?timeout=60'),
+    THROTTLE_CACHE_URL=(str, 'locmemcache://throttle'),
+    LOGIN_IP_MAX_ATTEMPTS=(int, 0),
+    TRUSTED_PROXIES=(list, []),
+    PASSWORD_HASH_WORKERS=(int, 2),
+    PASSWORD_HASH_QUEUE_SIZE=(int, 64),
+    PASSWORD_HASH_ITERATIONS=(int, 0),
 )
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -101,6 +147,37 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'accounts.User'
 MAX_LOGIN_ATTEMPTS = 5
 LOCKOUT_DURATION = 300  # 5 minutes in seconds
+# Failed logins from one IP (any usernames) before it is refused with 429.
+# Counted in the 'throttle' cache (accounts/throttling.py). Off (0) by
+# default: students behind the school's NAT share one address, so any
+# limit must allow for a whole building mistyping passwords at the bell
+LOGIN_IP_MAX_ATTEMPTS = env('LOGIN_IP_MAX_ATTEMPTS')
+# Reverse proxies (addresses or CIDR networks) in front of the app. When
+# REMOTE_ADDR is one of them the client IP is read from X-Forwarded-For,
+# skipping trusted hops from the right. Leave empty without a proxy, or
+# clients can pick their own address
+TRUSTED_PROXIES = env('TRUSTED_PROXIES')
+
+# Password hashing runs on a bounded thread pool (accounts/hashing.py).
+# The pooled hasher replaces Django's PBKDF2PasswordHasher (same
+# pbkdf2_sha256 format); the rest are Django's defaults.
+# PASSWORD_HASH_ITERATIONS can raise Django's iteration count, never
+# lower it; see `manage.py benchmark_hasher` for what it costs
+PASSWORD_HASHERS = [
+    'accounts.hashing.PooledPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_WORKERS = env('PASSWORD_HASH_WORKERS')
+PASSWORD_HASH_QUEUE_SIZE = env('PASSWORD_HASH_QUEUE_SIZE')
+PASSWORD_HASH_ITERATIONS = env('PASSWORD_HASH_ITERATIONS')
+
+# Known email filter for verify_user (accounts/email_filter.py): seconds
+# between picking up newly created users, and between full rebuilds
+EMAIL_FILTER_REFRESH_SECONDS = 5
+EMAIL_FILTER_REBUILD_SECONDS = 300
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -111,20 +188,58 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Opt-in faster renderers; MessagePack is only offered when installed
+if env('API_FAST_RENDERERS'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ]
+    if importlib.util.find_spec('msgpack'):
+        REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append(
+            'backend.renderers.MessagePackRenderer'
+        )
+
+# Caches private to one worker process. Sessions and authenticated users
+# are only cached in a backend every worker shares, so a logout or a
+# deactivation applies everywhere at once
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
 # Session settings
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Cached sessions with write-behind (backend/sessions.py) once
+# SESSION_CACHE_URL points at a shared backend (e.g. redis://...). With
+# the local-memory default other workers would keep accepting a logged
+# out session until their copy expired, so the database engine is used.
+# Expired rows are removed by the purge_sessions command.
+if env.cache_url('SESSION_CACHE_URL')['BACKEND'] in PROCESS_LOCAL_CACHES:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+else:
+    SESSION_ENGINE = 'backend.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_WRITE_BEHIND_SECONDS = env('SESSION_WRITE_BEHIND_SECONDS')
 SESSION_COOKIE_AGE = 86400  # 24 hours in seconds
 SESSION_COOKIE_SECURE = False  # Set to True in production
 CSRF_COOKIE_SECURE = False  # Set to True in production
 SESSION_COOKIE_HTTPONLY = True
 
+# request.user is cached per session (accounts/middleware.py) only when
+# USER_CACHE_URL is shared; otherwise every request loads the user row
+CACHE_AUTHENTICATED_USERS = (
+    env.cache_url('USER_CACHE_URL')['BACKEND'] not in PROCESS_LOCAL_CACHES
+)
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'backend.db_pool.ConnectionMetricsMiddleware',
+    'backend.db_routers.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # AuthenticationMiddleware that caches request.user per session
+    'accounts.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -140,9 +255,91 @@ DATABASES = {
         'PASSWORD': env('DB_PASSWORD'),
         'HOST': env('DB_HOST'),
         'PORT': env('DB_PORT'),
+        # Keep each thread's connection between requests instead of
+        # reconnecting every time; check it's alive before reusing it
+        'CONN_MAX_AGE': env('DB_CONN_MAX_AGE'),
+        'CONN_HEALTH_CHECKS': env('DB_CONN_HEALTH_CHECKS'),
+        'OPTIONS': {},
     }
 }
 
+# Or share a psycopg 3 pool between a worker's threads. Needs
+# psycopg[binary,pool], which is left out of requirements.txt because
+# installing it moves every connection from psycopg2 to psycopg 3. Pool
+# max size x gunicorn workers must stay under the server's
+# max_connections; see backend/db_pool.py for the stats to size it with.
+# Django requires CONN_MAX_AGE = 0 with a pool.
+if env('DB_POOL'):
+    try:
+        from psycopg_pool import ConnectionPool
+    except ImportError:
+        raise ImproperlyConfigured(
+            'DB_POOL needs psycopg 3 with its pool: pip install "psycopg[binary,pool]>=3.2"'
+        )
+
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': env('DB_POOL_MIN_SIZE'),
+        'max_size': env('DB_POOL_MAX_SIZE'),
+        'timeout': env('DB_POOL_TIMEOUT'),
+        'check': ConnectionPool.check_connection,
+    }
+
+# Read replicas (backend/db_routers.py): same database and credentials as
+# the primary on other hosts. Reads from attendance/accounts go to a
+# replica unless the client wrote within REPLICA_PIN_SECONDS or the
+# replica is more than REPLICA_MAX_LAG seconds behind. Tests mirror the
+# replicas onto the primary.
+DATABASE_REPLICAS = []
+for number, host in enumerate(env('DB_REPLICA_HOSTS'), start=1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['backend.db_routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = env('REPLICA_PIN_SECONDS')
+REPLICA_MAX_LAG = env('REPLICA_MAX_LAG')
+REPLICA_LAG_CHECK_INTERVAL = 5
+
+# Caches
+# The announcement cache is local-memory by default; point
+# ANNOUNCEMENT_CACHE_URL at a shared backend (e.g. redis://...) when
+# running more than one worker so invalidation reaches every process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'announcements': env.cache_url('ANNOUNCEMENT_CACHE_URL'),
+    'sessions': env.cache_url('SESSION_CACHE_URL'),
+    'users': env.cache_url('USER_CACHE_URL'),
+    'throttle': env.cache_url('THROTTLE_CACHE_URL'),
+}
+ANNOUNCEMENT_CACHE_TIMEOUT = env('ANNOUNCEMENT_CACHE_TIMEOUT')
+
+# Serve attendance read endpoints from attendance/async_views.py. Only
+# worth enabling when running under ASGI (backend/asgi.py)
+ASYNC_READ_VIEWS = env('ASYNC_READ_VIEWS')
+
+# Sign-up admission queue (attendance/admission.py), per worker process:
+# concurrent reservation/waitlist writes, how many more may wait, and
+# for how long (seconds) before getting a 503 with Retry-After
+SIGNUP_MAX_ACTIVE = 8
+SIGNUP_MAX_WAITING = 200
+SIGNUP_QUEUE_TIMEOUT = 10
+
+# Batch endpoint (attendance/batch.py): threads used to run independent
+# sub-requests concurrently
+BATCH_MAX_WORKERS = 4
+
+# Real-time push (attendance/broker.py). The in-process broker only
+# reaches clients connected to the same ASGI process.
+PUSH_BROKER = 'attendance.broker.InProcessBroker'
+PUSH_HEARTBEAT_SECONDS = 15
+
 # Email configuration - Development only, prints to console
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend' if DEBUG else 'django.core.mail.backends.dummy.EmailBackend'
 
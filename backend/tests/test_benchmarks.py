@@ -0,0 +1,303 @@
+"""
+Performance Benchmarks
+
+Times the hot paths of the backend at several data sizes and compares
+each timing with a stored baseline, so a change that makes them slower
+fails instead of going unnoticed:
+
+   - StudentSerializer(many=True)
+   - Every view in attendance/views.py
+   - login_view and verify_user
+   - The import_legacy_data and import_period2_data commands
+
+These are slow and machine-dependent, so they are skipped unless
+RUN_BENCHMARKS is set:
+
+    RUN_BENCHMARKS=1 python manage.py test backend.tests.test_benchmarks
+
+Settings (environment variables):
+   - BENCHMARK_SIZES: comma-separated row counts (default 10,100,1000)
+   - BENCHMARK_REPEAT: runs per timing; the fastest is kept (default 5)
+   - BENCHMARK_TOLERANCE: allowed slowdown over the baseline as a
+     fraction (default 0.3, i.e. 30% slower fails)
+   - BENCHMARK_BASELINES: baseline file (default
+     backend/tests/benchmark_baselines.json, not committed since
+     timings only compare on the same machine)
+   - BENCHMARK_UPDATE: rewrite the baselines with this run's timings
+
+Timings with no baseline yet are recorded and pass, so the first run
+on a machine sets them.
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from io import StringIO
+from pathlib import Path
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from accounts import views as account_views
+from accounts.email_filter import known_emails
+from attendance import views
+from attendance.models import Student, ClassPeriod, Announcement
+from attendance.query_planner import optimize_queryset
+from attendance.serializers import StudentSerializer
+from backend.accounts.api.views import verify_user
+
+User = get_user_model()
+
+RUN_BENCHMARKS = bool(os.environ.get('RUN_BENCHMARKS'))
+SIZES = [int(size) for size in os.environ.get('BENCHMARK_SIZES', '10,100,1000').split(',')]
+REPEAT = int(os.environ.get('BENCHMARK_REPEAT', 5))
+TOLERANCE = float(os.environ.get('BENCHMARK_TOLERANCE', 0.3))
+BASELINES = Path(os.environ.get(
+    'BENCHMARK_BASELINES', Path(__file__).with_name('benchmark_baselines.json')
+))
+UPDATE = bool(os.environ.get('BENCHMARK_UPDATE'))
+
+# Timings under this are mostly noise; they are compared against it instead
+FLOOR = 0.0005
+
+
+def populate(size):
+    """Create ``size`` teachers, students, class periods and announcements"""
+    User.objects.bulk_create([
+        User(
+            username=f'bench.teacher{i}', email=f'bench.teacher{i}@example.com',
+            first_name='Bench', last_name=f'Teacher {i}', role='TEACHER'
+        )
+        for i in range(size)
+    ], batch_size=1000)
+    teachers = list(User.objects.filter(username__startswith='bench.teacher').order_by('pk'))
+    Student.objects.bulk_create([
+        Student(
+            name=f'Bench Student {i}', grade=9 + i % 4,
+            hcpss_email=f'bench.student{i}@inst.hcpss.org',
+            teacher=teachers[i % len(teachers)],
+            teacher_period2=teachers[(i + 1) % len(teachers)]
+        )
+        for i in range(size)
+    ], batch_size=1000)
+    ClassPeriod.objects.bulk_create([
+        ClassPeriod(
+            teacher=teachers[i], period='RT', room_number=f'B{i:04d}',
+            subject='Raider Time', capacity=30
+        )
+        for i in range(size)
+    ], batch_size=1000)
+    Announcement.objects.bulk_create([
+        Announcement(
+            title=f'Announcement {i}', body='Bring your laptop. ' * 10,
+            teacher=teachers[i % len(teachers)]
+        )
+        for i in range(size)
+    ], batch_size=1000)
+    return teachers
+
+
+def render(response):
+    """Finish a response the way the handler would, including streaming ones"""
+    if hasattr(response, 'render'):
+        response.render()
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, 'set RUN_BENCHMARKS=1 to run benchmarks')
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+        cls.results = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        recorded = dict(cls.baselines)
+        for name, seconds in cls.results.items():
+            if UPDATE or name not in recorded:
+                recorded[name] = seconds
+        BASELINES.write_text(json.dumps(recorded, indent=2, sort_keys=True) + '\n')
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='bench.admin', email='bench.admin@inst.hcpss.org',
+            password='benchpass123', role='ADMIN'
+        )
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        caches['announcements'].clear()
+
+    def measure(self, name, func, setup=None):
+        """Time ``func`` (fastest of REPEAT runs) and check it against the baseline"""
+        best = None
+        for _ in range(REPEAT):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        self.results[name] = best
+        baseline = self.baselines.get(name)
+        if baseline is not None and not UPDATE:
+            limit = max(baseline, FLOOR) * (1 + TOLERANCE)
+            with self.subTest(benchmark=name):
+                self.assertLessEqual(
+                    best, limit,
+                    f'{name} took {best * 1000:.2f} ms, baseline {baseline * 1000:.2f} ms '
+                    f'(+{TOLERANCE:.0%} allowed)'
+                )
+
+    def for_each_size(self, benchmark):
+        """Run ``benchmark(size)`` against each data size, rolling the rows back after"""
+        for size in SIZES:
+            with transaction.atomic():
+                benchmark(size, populate(size))
+                transaction.set_rollback(True)
+
+    def get(self, view, path, **kwargs):
+        request = self.factory.get(path)
+        force_authenticate(request, user=self.admin)
+        return render(view(request, **kwargs))
+
+    def test_student_serializer(self):
+        """Benchmark StudentSerializer(many=True) over a loaded queryset"""
+        def benchmark(size, teachers):
+            students = list(optimize_queryset(Student.objects.all(), StudentSerializer))
+            self.measure(
+                f'student_serializer[{size}]',
+                lambda: StudentSerializer(students, many=True).data
+            )
+        self.for_each_size(benchmark)
+
+    def test_read_views(self):
+        """Benchmark each attendance read view"""
+        def benchmark(size, teachers):
+            student = Student.objects.first()
+            class_period = ClassPeriod.objects.first()
+            cases = [
+                ('student_list', views.student_list, '/api/students/', {}),
+                ('student_list_search', views.student_list, '/api/students/?search=student', {}),
+                ('student_export_csv', views.student_export, '/api/students/export/', {}),
+                ('student_export_ndjson', views.student_export,
+                 '/api/students/export/?output=ndjson', {}),
+                ('student_detail', views.student_detail,
+                 f'/api/students/{student.pk}/', {'student_id': student.pk}),
+                ('announcement_list', views.announcement_list, '/api/announcements/', {}),
+                ('class_period_list', views.class_period_list, '/api/class-periods/', {}),
+                ('class_period_list_available', views.class_period_list,
+                 '/api/class-periods/?available=true', {}),
+                ('class_period_detail', views.class_period_detail,
+                 f'/api/class-periods/{class_period.pk}/', {'class_id': class_period.pk}),
+                ('class_period_waitlist', views.class_period_waitlist,
+                 f'/api/class-periods/{class_period.pk}/waitlist/?student_id={student.pk}',
+                 {'class_id': class_period.pk}),
+            ]
+            for name, view, path, kwargs in cases:
+                self.measure(
+                    f'{name}[{size}]',
+                    lambda: self.get(view, path, **kwargs),
+                    setup=caches['announcements'].clear
+                )
+        self.for_each_size(benchmark)
+
+    def test_class_period_reservation(self):
+        """Benchmark reserving and releasing a seat"""
+        def benchmark(size, teachers):
+            student = Student.objects.first()
+            class_period = ClassPeriod.objects.first()
+            path = f'/api/class-periods/{class_period.pk}/reservation/'
+
+            def reserve_and_release():
+                for method in ('post', 'delete'):
+                    request = getattr(self.factory, method)(
+                        path, {'student_id': student.pk}, format='json'
+                    )
+                    force_authenticate(request, user=self.admin)
+                    render(views.class_period_reservation(request, class_id=class_period.pk))
+
+            self.measure(f'class_period_reservation[{size}]', reserve_and_release)
+        self.for_each_size(benchmark)
+
+    def test_login_view(self):
+        """Benchmark a successful login (dominated by password hashing)"""
+        def benchmark(size, teachers):
+            def login():
+                request = self.factory.post(
+                    '/api/accounts/login/',
+                    {'username': 'bench.admin', 'password': 'benchpass123'},
+                    format='json'
+                )
+                request.session = self.client.session
+                render(account_views.login_view(request))
+            self.measure(f'login_view[{size}]', login)
+        self.for_each_size(benchmark)
+
+    def test_verify_user(self):
+        """Benchmark verify_user for a known and an unknown email"""
+        def benchmark(size, teachers):
+            # Rebuild the email filter to include this size's teachers
+            known_emails.clear()
+            for name, email in [
+                ('verify_user_known', f'bench.teacher{size - 1}@example.com'),
+                ('verify_user_unknown', 'nobody@inst.hcpss.org'),
+            ]:
+                call = lambda: render(verify_user(
+                    self.factory.post('/api/accounts/verify/', {'email': email}, format='json')
+                ))
+                self.measure(f'{name}[{size}]', call)
+        self.for_each_size(benchmark)
+
+    def test_import_period2_data(self):
+        """Benchmark import_period2_data on a generated roster CSV"""
+        for size in SIZES:
+            teachers = max(1, size // 25)
+            rows = ['"Last Name, First Time Middle I.",Grade,Teacher,Room Number,'
+                    'Class/Subject Name,Class ID']
+            rows += [
+                f'"Student{i}, Bench A.",{9 + i % 4},"Teacher{i % teachers}, Bench",'
+                f'{100 + i % teachers},"Homeroom",{i % teachers}'
+                for i in range(size)
+            ]
+            self._benchmark_import(
+                f'import_period2_data[{size}]', 'import_period2_data', '.csv', rows
+            )
+
+    def test_import_legacy_data(self):
+        """Benchmark import_legacy_data on a generated SQL dump"""
+        for size in SIZES:
+            rows = [
+                "INSERT INTO `students` (`ID`, `name`, `grade`, `hcpssEmail`, `accountEmail`, "
+                "`password`, `phoneNum`, `receiveNotif`, `teacherID`, `teacherPeriod2`, "
+                "`theme`, `tempTeacher`) VALUES "
+                f"({i}, 'Legacy Student {i}', {9 + i % 4}, 'legacy{i}@inst.hcpss.org', "
+                f"'', '', '', 0, 87, 0, '', 'Test, T.');"
+                for i in range(size)
+            ]
+            self._benchmark_import(
+                f'import_legacy_data[{size}]', 'import_legacy_data', '.sql', rows
+            )
+
+    def _benchmark_import(self, name, command, suffix, lines):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False) as f:
+            f.write('\n'.join(lines) + '\n')
+        try:
+            def run():
+                with transaction.atomic():
+                    call_command(command, f.name, stdout=StringIO(), stderr=StringIO())
+                    transaction.set_rollback(True)
+            self.measure(name, run)
+        finally:
+            os.remove(f.name)
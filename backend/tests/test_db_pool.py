@@ -0,0 +1,114 @@
+"""
+Database Connection Metrics Tests
+
+Checks the per-process connection stats in backend/db_pool.py and the
+staff-only endpoint that reports them.
+"""
+
+from unittest import mock
+from asgiref.sync import iscoroutinefunction
+from django.db import connections
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+from backend import db_pool
+
+
+class PoolStatsTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='poolstaff', email='poolstaff@inst.hcpss.org',
+            password='testpass123', is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff)
+        self.url = reverse('db_pool_stats')
+
+    def test_counts_requests_that_query(self):
+        """Test a request counts as one checkout once it queries, and not at all otherwise"""
+        seen = []
+
+        def view(request):
+            User.objects.count()
+            User.objects.count()
+            seen.append(db_pool.pool_stats()['in_use'])
+            return HttpResponse()
+
+        before = db_pool.pool_stats()
+        middleware = db_pool.ConnectionMetricsMiddleware(view)
+        middleware(RequestFactory().get('/'))
+        middleware(RequestFactory().get('/'))
+        db_pool.ConnectionMetricsMiddleware(lambda request: HttpResponse())(RequestFactory().get('/'))
+
+        stats = db_pool.pool_stats()
+        self.assertEqual(stats['checkouts'], before['checkouts'] + 2)
+        # Held while the view ran, released when the request ended
+        self.assertEqual(seen, [before['in_use'] + 1] * 2)
+        self.assertEqual(stats['in_use'], before['in_use'])
+        self.assertIn(stats['mode'], ('persistent', 'per-request'))
+
+    def test_counted_per_alias(self):
+        """Test a request using two aliases counts once on each"""
+        middleware = db_pool.ConnectionMetricsMiddleware(self._query_aliases('default', 'replica'))
+        before = {alias: db_pool._alias_counters(alias)['checkouts'] for alias in ('default', 'replica')}
+        middleware(RequestFactory().get('/'))
+        self.assertEqual(db_pool._alias_counters('default')['checkouts'], before['default'] + 1)
+        self.assertEqual(db_pool._alias_counters('replica')['checkouts'], before['replica'] + 1)
+        self.assertEqual(db_pool._alias_counters('replica')['in_use'], 0)
+
+    async def test_async_requests_stay_async(self):
+        """Test the middleware doesn't push async requests onto a thread"""
+        async def view(request):
+            await User.objects.acount()
+            return HttpResponse()
+
+        middleware = db_pool.ConnectionMetricsMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        before = db_pool.pool_stats()['checkouts']
+        await middleware(AsyncRequestFactory().get('/'))
+        self.assertEqual(db_pool.pool_stats()['checkouts'], before + 1)
+
+    def test_checkouts_per_second(self):
+        """Test the rate is measured between consecutive calls"""
+        db_pool.pool_stats()
+        db_pool.ConnectionMetricsMiddleware(self._query_aliases('default'))(RequestFactory().get('/'))
+        self.assertGreater(db_pool.pool_stats()['checkouts_per_second'], 0)
+
+    @staticmethod
+    def _query_aliases(*aliases):
+        """A view whose queries reach the tracker as if run on ``aliases``"""
+        def view(request):
+            for alias in aliases:
+                for _ in range(2):
+                    db_pool._track_query(alias)(lambda *args: None, 'SELECT 1', (), False, {})
+            return HttpResponse()
+        return view
+
+    def test_pool_mode(self):
+        """Test pool stats are read from the psycopg pool when one is configured"""
+        pool = mock.Mock()
+        pool.get_stats.return_value = {
+            'pool_min': 2, 'pool_max': 10, 'pool_size': 4, 'pool_available': 1,
+            'requests_waiting': 3, 'requests_num': 200, 'requests_wait_ms': 400,
+            'connections_num': 4, 'connections_ms': 80,
+        }
+        connection = connections['default']
+        options = dict(connection.settings_dict['OPTIONS'], pool={'max_size': 10})
+        with mock.patch.dict(connection.settings_dict, OPTIONS=options), \
+                mock.patch.object(connection, 'pool', pool, create=True):
+            stats = db_pool.pool_stats()
+
+        self.assertEqual(stats['mode'], 'pool')
+        self.assertEqual((stats['in_use'], stats['idle'], stats['waiting']), (3, 1, 3))
+        self.assertEqual(stats['avg_wait_ms'], 2.0)
+        self.assertEqual(stats['avg_connect_ms'], 20.0)
+
+    def test_staff_only(self):
+        """Test non-staff users can't read the stats"""
+        user = User.objects.create_user(
+            username='poolteacher', email='poolteacher@inst.hcpss.org', password='testpass123'
+        )
+        self.client.force_authenticate(user=user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
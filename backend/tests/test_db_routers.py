@@ -0,0 +1,125 @@
+"""
+Read Replica Routing Tests
+
+Checks where ReplicaRouter sends reads and writes, that clients are
+pinned to the primary after writing, and that lagging replicas are
+skipped. Replica aliases are only routed to, never connected to; the
+lag check is mocked.
+"""
+
+import time
+from unittest import mock
+from django.db import DatabaseError, connections
+from django.http import HttpResponse
+from asgiref.sync import iscoroutinefunction
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+from django.contrib.sessions.models import Session
+from accounts.models import User
+from attendance.models import Student
+from backend import db_routers
+from backend.db_routers import PIN_COOKIE, ReplicaPinningMiddleware, ReplicaRouter
+
+
+@override_settings(
+    DATABASE_REPLICAS=['replica1'], REPLICA_PIN_SECONDS=5,
+    REPLICA_MAX_LAG=2.0, REPLICA_LAG_CHECK_INTERVAL=5
+)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        db_routers._health.clear()
+        lag = mock.patch.object(db_routers, 'measure_lag', return_value=0.0)
+        self.measure_lag = lag.start()
+        self.addCleanup(lag.stop)
+
+    def route(self, request, reads=(), writes=()):
+        """Run ``request`` through the middleware, routing models as a view would"""
+        routed = {}
+
+        def view(request):
+            routed['reads'] = [self.router.db_for_read(model) for model in reads]
+            routed['writes'] = [self.router.db_for_write(model) for model in writes]
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(view)(request)
+        return routed, response
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        """Test routed apps read from the replica and write to the primary"""
+        routed, _ = self.route(
+            self.factory.get('/api/students/'), reads=[Student, User], writes=[Student]
+        )
+        self.assertEqual(routed['reads'], ['replica1', 'replica1'])
+        self.assertEqual(routed['writes'], ['default'])
+
+    def test_other_apps_stay_on_primary(self):
+        """Test apps outside attendance/accounts get no replica"""
+        self.assertIsNone(self.router.db_for_read(Session))
+
+    def test_unsafe_request_reads_primary(self):
+        """Test reads inside a POST use the primary"""
+        routed, _ = self.route(self.factory.post('/api/class-periods/1/reservation/'),
+                               reads=[Student])
+        self.assertEqual(routed['reads'], ['default'])
+
+    def test_write_pins_client(self):
+        """Test a write sets the pin cookie and the next read uses the primary"""
+        _, response = self.route(self.factory.post('/x/'), writes=[Student])
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        request = self.factory.get('/api/students/')
+        request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        routed, _ = self.route(request, reads=[Student])
+        self.assertEqual(routed['reads'], ['default'])
+
+    def test_expired_or_forged_pin_ignored(self):
+        """Test pins in the past or beyond REPLICA_PIN_SECONDS are ignored"""
+        for until in (time.time() - 1, time.time() + 3600, 'nonsense'):
+            with self.subTest(until=until):
+                request = self.factory.get('/api/students/')
+                request.COOKIES[PIN_COOKIE] = str(until)
+                routed, _ = self.route(request, reads=[Student])
+                self.assertEqual(routed['reads'], ['replica1'])
+
+    async def test_async_requests_stay_async(self):
+        """Test the middleware runs async views without a thread and still pins"""
+        async def view(request):
+            self.router.db_for_write(Student)
+            return HttpResponse()
+
+        middleware = ReplicaPinningMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(AsyncRequestFactory().post('/x/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_session_write_does_not_pin(self):
+        """Test writes outside the routed apps (e.g. sessions) don't pin"""
+        _, response = self.route(self.factory.get('/x/'), writes=[Session])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_lagging_replica_falls_back(self):
+        """Test a replica behind by more than REPLICA_MAX_LAG isn't used"""
+        self.measure_lag.return_value = 10.0
+        self.assertEqual(self.router.db_for_read(Student), 'default')
+
+    def test_unreachable_replica_falls_back(self):
+        """Test a replica that errors on the lag check isn't used"""
+        self.measure_lag.side_effect = DatabaseError('connection refused')
+        self.assertEqual(self.router.db_for_read(Student), 'default')
+
+    def test_lag_checked_once_per_interval(self):
+        """Test lag is cached between checks"""
+        for _ in range(3):
+            self.router.db_for_read(Student)
+        self.assertEqual(self.measure_lag.call_count, 1)
+
+    def test_transaction_reads_primary(self):
+        """Test reads inside a transaction on the primary stay there"""
+        with mock.patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(Student), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test nothing is routed when no replicas are configured"""
+        self.assertIsNone(self.router.db_for_read(Student))
@@ -0,0 +1,53 @@
+"""
+API Renderer Tests
+
+Checks the fast renderers produce the same data as DRF's stock
+JSONRenderer.
+"""
+
+import datetime
+import json
+import unittest
+import uuid
+from decimal import Decimal
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from backend import renderers
+from backend.renderers import FastJSONRenderer, MessagePackRenderer
+
+DATA = {
+    'results': [{
+        'id': 1,
+        'name': 'José Ramírez',
+        'timestamp': datetime.datetime(2025, 3, 4, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        'date': datetime.date(2025, 3, 4),
+        'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'capacity': Decimal('30.5'),
+        'teacher': None,
+    }],
+    'has_next': False,
+}
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_matches_stock_renderer(self):
+        """Test orjson output decodes to the same data as JSONRenderer"""
+        stock = JSONRenderer().render(DATA, 'application/json', {})
+        fast = FastJSONRenderer().render(DATA, 'application/json', {})
+        self.assertEqual(json.loads(fast), json.loads(stock))
+
+    def test_indent_falls_back(self):
+        """Test indented output still goes through the stock encoder"""
+        body = FastJSONRenderer().render(DATA, 'application/json; indent=4', {})
+        self.assertIn(b'\n    ', body)
+
+    def test_empty_body(self):
+        """Test None renders as an empty body"""
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+@unittest.skipIf(renderers.msgpack is None, 'msgpack is not installed')
+class MessagePackRendererTests(SimpleTestCase):
+    def test_round_trip(self):
+        """Test MessagePack output decodes to the same data as JSONRenderer"""
+        stock = JSONRenderer().render(DATA, 'application/json', {})
+        packed = MessagePackRenderer().render(DATA, 'application/msgpack', {})
+        self.assertEqual(renderers.msgpack.unpackb(packed), json.loads(stock))
@@ -0,0 +1,152 @@
+"""
+Session Store Tests
+
+Checks the cached write-behind session engine (backend/sessions.py) and
+the purge_sessions command. The write-behind thread never fires during
+a test (the interval is an hour); buffered writes are flushed by hand.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from backend.sessions import SessionStore, buffer
+
+
+@override_settings(SESSION_ENGINE='backend.sessions', SESSION_WRITE_BEHIND_SECONDS=3600)
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        caches['sessions'].clear()
+        buffer.flush()
+        self.user = User.objects.create_user(
+            username='sessionuser', email='sessionuser@inst.hcpss.org', password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_login(self.user)
+        self.key = self.client.session.session_key
+
+    def stored(self):
+        return SessionStore().decode(Session.objects.get(session_key=self.key).session_data)
+
+    def test_read_from_cache(self):
+        """Test a cached session is loaded without a query"""
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(SessionStore(self.key)[SESSION_KEY], str(self.user.pk))
+        self.assertEqual(len(queries), 0)
+
+    def test_cache_miss_reads_database(self):
+        """Test a session missing from the cache is loaded from the database"""
+        caches['sessions'].clear()
+        self.assertEqual(SessionStore(self.key)[SESSION_KEY], str(self.user.pk))
+
+    def test_login_written_through(self):
+        """Test logging in stores the session in the database at once"""
+        self.assertEqual(self.stored()[SESSION_KEY], str(self.user.pk))
+        self.assertEqual(len(buffer), 0)
+
+    def test_data_change_written_behind(self):
+        """Test other changes are buffered and flushed in one UPDATE"""
+        for value in range(3):
+            session = SessionStore(self.key)
+            session['theme'] = value
+            with CaptureQueriesContext(connection) as queries:
+                session.save()
+            self.assertEqual(len(queries), 0)
+
+        self.assertNotIn('theme', self.stored())
+        self.assertEqual(SessionStore(self.key)['theme'], 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(
+            len([q for q in queries if q['sql'].startswith('UPDATE')]), 1
+        )
+        self.assertEqual(self.stored()['theme'], 2)
+
+    def test_auth_change_written_through(self):
+        """Test changing the session's user skips the buffer"""
+        other = User.objects.create_user(
+            username='sessionother', email='sessionother@inst.hcpss.org', password='testpass123'
+        )
+        session = SessionStore(self.key)
+        session[SESSION_KEY] = str(other.pk)
+        session.save()
+        self.assertEqual(self.stored()[SESSION_KEY], str(other.pk))
+        self.assertEqual(len(buffer), 0)
+
+    def test_anonymous_session_written_through(self):
+        """Test sessions without a user aren't buffered"""
+        session = SessionStore()
+        session['cart'] = 1
+        session.save()
+        session['cart'] = 2
+        session.save()
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(
+            SessionStore().decode(
+                Session.objects.get(session_key=session.session_key).session_data
+            )['cart'], 2
+        )
+
+    def test_logout_not_resurrected(self):
+        """Test a flush after logout doesn't bring the session back"""
+        session = SessionStore(self.key)
+        session['theme'] = 'dark'
+        session.save()
+        SessionStore(self.key).delete()
+
+        buffer.flush()
+        self.assertFalse(Session.objects.filter(session_key=self.key).exists())
+        self.assertNotIn(SESSION_KEY, SessionStore(self.key).load())
+
+    def test_concurrent_logout_not_recached(self):
+        """Test a save racing a logout elsewhere writes through and fails"""
+        session = SessionStore(self.key)
+        session['theme'] = 'dark'
+        SessionStore(self.key).delete()
+
+        with self.assertRaises(UpdateError):
+            session.save()
+        self.assertIsNone(caches['sessions'].get(session.cache_key))
+
+    @override_settings(SESSION_WRITE_BEHIND_SECONDS=0)
+    def test_write_behind_disabled(self):
+        """Test SESSION_WRITE_BEHIND_SECONDS = 0 writes every change through"""
+        session = SessionStore(self.key)
+        session['theme'] = 'dark'
+        session.save()
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(self.stored()['theme'], 'dark')
+
+    def test_authenticated_request(self):
+        """Test the API authenticates from the cached session"""
+        response = self.client.get('/api/announcements/')
+        self.assertEqual(response.status_code, 200)
+
+
+class PurgeSessionsTests(TestCase):
+    def create(self, key, expires_in):
+        Session.objects.create(
+            session_key=key, session_data='',
+            expire_date=timezone.now() + timedelta(seconds=expires_in)
+        )
+
+    def test_deletes_only_expired(self):
+        """Test expired sessions are deleted in batches and live ones kept"""
+        for i in range(5):
+            self.create(f'expired{i}', -60)
+        self.create('live', 3600)
+
+        out = StringIO()
+        call_command('purge_sessions', batch_size=2, stdout=out)
+
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+        self.assertIn('Deleted 5 expired sessions in 3 batches', out.getvalue())
@@ -9,6 +9,8 @@ to their corresponding views. It serves as the main routing configuration for:
    - /api/students/: Student management
    - /api/class-periods/: Class period information
    - /api/announcements/: School announcements
+   - /api/db-pool/: Database connection stats for the worker (staff)
+   - /api/hash-pool/: Password hashing pool stats for the worker (staff)
 
 2. Administrative Interface:
    - /admin/: Django admin site
@@ -36,9 +38,13 @@ Related:
 
 from django.contrib import admin
 from django.urls import path, include
+from accounts import hashing
+from . import db_pool
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/accounts/', include('accounts.urls')),
+    path('api/db-pool/', db_pool.pool_stats_view, name='db_pool_stats'),
+    path('api/hash-pool/', hashing.hash_pool_stats_view, name='hash_pool_stats'),
     path('', include('attendance.urls')),  # Include attendance URLs
 ]
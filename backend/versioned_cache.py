@@ -0,0 +1,67 @@
+"""
+Versioned Cache Keys
+
+Helpers for the caches that are invalidated by bumping a version number
+embedded in their keys, rather than by deleting entries, and for the
+counters kept alongside them. Django's incr() fails on a missing key,
+and any key can be evicted at any time, so each helper copes with that.
+
+1. Versions:
+   - start_version() reads a version, creating it if it isn't cached.
+     Versions start from the clock rather than 0, so a version that is
+     evicted and restarted never matches an entry stored before the
+     eviction
+   - bump_version() moves a version on, restarting it from the clock if
+     it was evicted
+   - bump_on_commit() runs a bump now and again once the transaction
+     commits, so a concurrent request can't re-cache the pre-commit data
+     under the new version
+
+2. Counters:
+   - increment() adds one to a counter, creating it if needed
+
+Related:
+   - attendance/cache.py: Announcement cache generations and hit counters
+   - accounts/middleware.py: Cached user versions
+   - accounts/throttling.py: Login failure counters
+"""
+
+import time
+from django.db import transaction
+
+
+def start_version(cache, key):
+    """Return the version stored at ``key``, starting one if there is none"""
+    version = cache.get(key)
+    if version is None:
+        # add() is a no-op if another request started it first
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(cache, key):
+    """Move the version stored at ``key`` on"""
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Not cached (never read, or evicted)
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_on_commit(bump):
+    """Call ``bump`` now and again once the current transaction commits"""
+    bump()
+    transaction.on_commit(bump)
+
+
+def increment(cache, key, timeout=None):
+    """Add one to the counter at ``key`` and return the new count"""
+    # add() is a no-op if the key exists, so concurrent first writes are safe
+    cache.add(key, 0, timeout=timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=timeout)
+        return 1
@@ -0,0 +1,298 @@
+"""
+Load generator for the attendance API
+
+Grown out of test_api.py: instead of logging in once and printing a few
+responses, it logs in many simulated teachers and students (same CSRF
+and session cookie flow) and replays a weighted mix of attendance
+requests against a running server at a fixed concurrency, then reports
+latency percentiles, throughput and error rates per endpoint.
+
+1. Users:
+   - --users FILE: CSV with username,password,role rows (role is
+     teacher or student; a header row is optional)
+   - --teacher USER:PASS / --student USER:PASS: add users on the
+     command line, repeatable
+   Each worker thread logs in as its own session, cycling through the
+   users, so there are --concurrency sessions whatever the user count.
+
+2. Mixes (--mix):
+   - school-day: teachers browsing rosters and class periods, students
+     checking open rooms and announcements
+   - signup-rush: the bell; students mostly claiming and releasing
+     seats and checking waitlists, teachers watching class periods
+   Class period and student ids are discovered from the list endpoints
+   after login, so any seeded database works.
+
+3. Output:
+   - A table per endpoint (route, not full URL): requests, errors,
+     req/s, p50/p95/p99/max latency
+   - --json FILE also writes the numbers for comparing runs
+
+Usage:
+    python manage.py runserver --noreload   # or gunicorn backend.wsgi
+    python loadgen.py --teacher j..moore:password123 \\
+        --users load_users.csv --concurrency 50 --duration 60
+
+Note:
+    Needs only the server under test and the requests library; no
+    external services. Reservation writes are real, so point it at a
+    development database.
+"""
+
+import argparse
+import csv
+import json
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+TEACHER = 'teacher'
+STUDENT = 'student'
+
+# (weight, label, method, path); {class_id} and {student_id} are filled
+# from the ids discovered after login
+MIXES = {
+    'school-day': {
+        TEACHER: [
+            (30, 'class_period_list', 'GET', '/api/class-periods/'),
+            (20, 'student_list', 'GET', '/api/students/'),
+            (10, 'student_list_cursor', 'GET', '/api/students/?cursor='),
+            (15, 'student_detail', 'GET', '/api/students/{student_id}/'),
+            (15, 'announcement_list', 'GET', '/api/announcements/'),
+            (10, 'class_period_detail', 'GET', '/api/class-periods/{class_id}/'),
+        ],
+        STUDENT: [
+            (40, 'class_period_list', 'GET', '/api/class-periods/?available=true'),
+            (30, 'announcement_list', 'GET', '/api/announcements/'),
+            (20, 'class_period_detail', 'GET', '/api/class-periods/{class_id}/'),
+            (10, 'waitlist', 'GET', '/api/class-periods/{class_id}/waitlist/'),
+        ],
+    },
+    'signup-rush': {
+        TEACHER: [
+            (60, 'class_period_list', 'GET', '/api/class-periods/'),
+            (40, 'class_period_detail', 'GET', '/api/class-periods/{class_id}/'),
+        ],
+        STUDENT: [
+            (30, 'class_period_list', 'GET', '/api/class-periods/?available=true'),
+            (25, 'reservation_post', 'POST', '/api/class-periods/{class_id}/reservation/'),
+            (20, 'reservation_delete', 'DELETE', '/api/class-periods/{class_id}/reservation/'),
+            (15, 'waitlist', 'GET', '/api/class-periods/{class_id}/waitlist/'),
+            (10, 'waitlist_post', 'POST', '/api/class-periods/{class_id}/waitlist/'),
+        ],
+    },
+}
+
+# Statuses that are a normal answer for the request rather than a
+# failure (e.g. releasing a seat you don't hold, a full room)
+EXPECTED = {
+    'reservation_post': {201, 409},
+    'reservation_delete': {200, 204, 404},
+    'waitlist_post': {201, 404, 409},
+}
+
+
+def parse_user(value, role):
+    username, sep, password = value.partition(':')
+    if not sep:
+        raise argparse.ArgumentTypeError(f'expected USER:PASS, got {value!r}')
+    return username, password, role
+
+
+def load_users(path):
+    users = []
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0].strip().lower() == 'username':
+                continue
+            username, password, role = (field.strip() for field in row[:3])
+            if role not in (TEACHER, STUDENT):
+                raise ValueError(f'{path}: unknown role {role!r} for {username}')
+            users.append((username, password, role))
+    return users
+
+
+def login(base_url, username, password):
+    """Log in like test_api.py and return the authenticated session"""
+    session = requests.Session()
+    session.get(f'{base_url}/api/accounts/login/')
+    response = session.post(
+        f'{base_url}/api/accounts/login/',
+        json={'username': username, 'password': password},
+        headers={'X-CSRFToken': session.cookies.get('csrftoken', '')}
+    )
+    response.raise_for_status()
+    # Django rotates the CSRF token on login
+    session.headers.update({
+        'X-CSRFToken': session.cookies.get('csrftoken', ''),
+        'Accept': 'application/json',
+    })
+    return session
+
+
+def results_of(data):
+    """Rows of a list response, paginated or not"""
+    if isinstance(data, dict):
+        return data.get('results', [])
+    return data
+
+
+def discover_ids(base_url, session):
+    """Class period and student ids to fill the request paths with"""
+    class_ids = [
+        row['id'] for row in results_of(session.get(f'{base_url}/api/class-periods/').json())
+    ]
+    response = session.get(f'{base_url}/api/students/')
+    student_ids = [row['id'] for row in results_of(response.json())] if response.ok else []
+    if not class_ids:
+        raise SystemExit('No class periods found; seed the database first.')
+    return class_ids, student_ids
+
+
+class Stats:
+    """Per-endpoint latencies and error counts, shared by the workers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, label, status, latency):
+        ok = status is not None and (
+            status in EXPECTED.get(label, ()) or 200 <= status < 400
+        )
+        with self._lock:
+            self.latencies[label].append(latency)
+            self.statuses[label][status] += 1
+            if not ok:
+                self.errors[label] += 1
+
+
+def worker(base_url, user, mix, class_ids, student_ids, deadline, stats, seed):
+    username, password, role = user
+    rng = random.Random(seed)
+    try:
+        session = login(base_url, username, password)
+    except requests.RequestException:
+        stats.record('login', None, 0.0)
+        return
+
+    weights, requests_ = zip(*[(w, rest) for w, *rest in mix[role]])
+    while time.perf_counter() < deadline:
+        label, method, path = rng.choices(requests_, weights)[0]
+        if '{student_id}' in path and not student_ids:
+            continue
+        url = base_url + path.format(
+            class_id=rng.choice(class_ids),
+            student_id=rng.choice(student_ids) if student_ids else ''
+        )
+        start = time.perf_counter()
+        try:
+            status = session.request(method, url, timeout=30).status_code
+        except requests.RequestException:
+            status = None
+        stats.record(label, status, time.perf_counter() - start)
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def summarize(stats, elapsed):
+    summary = {}
+    for label, latencies in sorted(stats.latencies.items()):
+        latencies = sorted(latencies)
+        summary[label] = {
+            'requests': len(latencies),
+            'errors': stats.errors[label],
+            'error_rate': stats.errors[label] / len(latencies),
+            'rps': len(latencies) / elapsed,
+            'p50_ms': statistics.median(latencies) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': latencies[-1] * 1000,
+            'statuses': {str(k): v for k, v in stats.statuses[label].items()},
+        }
+    return summary
+
+
+def report(summary, elapsed):
+    print(f'\n{"endpoint":<22}{"reqs":>8}{"err%":>7}{"req/s":>9}'
+          f'{"p50":>9}{"p95":>9}{"p99":>9}{"max":>9}  (ms)')
+    for label, row in summary.items():
+        print(
+            f'{label:<22}{row["requests"]:>8}{row["error_rate"] * 100:>6.1f}%'
+            f'{row["rps"]:>9.1f}{row["p50_ms"]:>9.1f}{row["p95_ms"]:>9.1f}'
+            f'{row["p99_ms"]:>9.1f}{row["max_ms"]:>9.1f}'
+        )
+    total = sum(row['requests'] for row in summary.values())
+    errors = sum(row['errors'] for row in summary.values())
+    print(f'\n{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s, '
+          f'{errors} errors ({errors / max(total, 1) * 100:.1f}%)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--users', help='CSV of username,password,role')
+    parser.add_argument('--teacher', action='append', default=[],
+                        type=lambda v: parse_user(v, TEACHER), metavar='USER:PASS')
+    parser.add_argument('--student', action='append', default=[],
+                        type=lambda v: parse_user(v, STUDENT), metavar='USER:PASS')
+    parser.add_argument('--mix', choices=sorted(MIXES), default='school-day')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=30, help='seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path', help='also write results here')
+    args = parser.parse_args()
+
+    users = args.teacher + args.student
+    if args.users:
+        users += load_users(args.users)
+    if not users:
+        parser.error('give at least one user with --users, --teacher or --student')
+    if not any(role == TEACHER for _, _, role in users):
+        parser.error('at least one teacher is needed to discover class periods and students')
+
+    base_url = args.base_url.rstrip('/')
+    teacher = next(user for user in users if user[2] == TEACHER)
+    class_ids, student_ids = discover_ids(base_url, login(base_url, *teacher[:2]))
+
+    stats = Stats()
+    deadline = time.perf_counter() + args.duration
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(base_url, users[i % len(users)], MIXES[args.mix],
+                  class_ids, student_ids, deadline, stats, args.seed + i),
+            daemon=True
+        )
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(stats, elapsed)
+    print(f'{args.mix} mix, {args.concurrency} workers, {len(users)} users against {base_url}')
+    report(summary, elapsed)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                'mix': args.mix,
+                'concurrency': args.concurrency,
+                'elapsed': elapsed,
+                'endpoints': summary,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+WSGI vs ASGI load test
+
+Compares the attendance read endpoints served by the sync views under
+WSGI against the async views (ASYNC_READ_VIEWS) under ASGI, with the
+same number of concurrent keep-alive connections against each.
+
+Start both servers against the same database first, e.g.:
+
+    gunicorn backend.wsgi:application -w 4 --threads 8 -b 127.0.0.1:8000
+    ASYNC_READ_VIEWS=True gunicorn backend.asgi:application -w 4 \\
+        -k uvicorn.workers.UvicornWorker -b 127.0.0.1:8001
+
+Then run:
+
+    python loadtest_asgi.py --username j..moore --password ... \\
+        --connections 500 --duration 30
+
+Each connection logs in once (session cookie), then loops over the read
+endpoints as fast as responses come back. The client is plain asyncio
+sockets so it can hold 500 connections without becoming the
+bottleneck; raise the open file limit (ulimit -n) if connections fail.
+
+Note:
+    Requires both servers to be running (see test_api.py for the login
+    flow this reuses)
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+PATHS = [
+    '/api/students/',
+    '/api/students/?cursor=',
+    '/api/announcements/',
+    '/api/class-periods/?available=true',
+]
+
+
+def login(base_url, username, password):
+    """Log in like test_api.py and return the Cookie header to reuse"""
+    session = requests.Session()
+    session.get(f'{base_url}/api/accounts/login/')
+    response = session.post(
+        f'{base_url}/api/accounts/login/',
+        json={'username': username, 'password': password},
+        headers={'X-CSRFToken': session.cookies.get('csrftoken', '')}
+    )
+    response.raise_for_status()
+    return '; '.join(f'{name}={value}' for name, value in session.cookies.items())
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response and return its status code"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed')
+    status = int(status_line.split()[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    return status, headers.get('connection', '').lower() == 'close'
+
+
+async def worker(host, port, cookie, deadline, paths, results, offset):
+    reader = writer = None
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(
+                f'GET {path} HTTP/1.1\r\nHost: {host}\r\nCookie: {cookie}\r\n'
+                f'Accept: application/json\r\n\r\n'.encode()
+            )
+            await writer.drain()
+            status, closed = await read_response(reader)
+            results.append((status, time.perf_counter() - start))
+            if closed:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            results.append((None, time.perf_counter() - start))
+            if writer is not None:
+                writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run(base_url, cookie, connections, duration):
+    url = urlsplit(base_url)
+    results = []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(url.hostname, url.port or 80, cookie, deadline, PATHS, results, i)
+        for i in range(connections)
+    ))
+    return results, time.perf_counter() - start
+
+
+def report(label, results, elapsed):
+    latencies = sorted(latency for status, latency in results if status == 200)
+    errors = len(results) - len(latencies)
+    print(f'\n{label}')
+    print(f'  requests: {len(results)} in {elapsed:.1f}s ({len(latencies) / elapsed:.0f} ok/s)')
+    print(f'  errors/non-200: {errors}')
+    if latencies:
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+        print(
+            f'  latency ms: p50 {statistics.median(latencies) * 1000:.1f}, '
+            f'p95 {pct(0.95):.1f}, p99 {pct(0.99):.1f}, max {latencies[-1] * 1000:.1f}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--wsgi', default='http://127.0.0.1:8000')
+    parser.add_argument('--asgi', default='http://127.0.0.1:8001')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=30)
+    args = parser.parse_args()
+
+    for label, base_url in [('WSGI (sync views)', args.wsgi), ('ASGI (async views)', args.asgi)]:
+        cookie = login(base_url, args.username, args.password)
+        results, elapsed = asyncio.run(run(base_url, cookie, args.connections, args.duration))
+        report(f'{label} - {base_url}, {args.connections} connections', results, elapsed)
+
+
+if __name__ == '__main__':
+    main()